@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the time to fill in the defaults of, validate and freeze the inputs of a process with thousands of input ports.
+
+The ``flat`` spec has all its ports in its top level namespace and the ``nested`` spec has the same number of ports
+spread over namespaces. Values are passed for half of the ports, the other half are filled in with their defaults. The
+``fused`` column is :meth:`plumpy.PortNamespace.parse_inputs`, that does everything in a single traversal. The
+``two-phase`` column copies the nested dictionaries of the inputs with :func:`plumpy.ports.copy_nested_dicts` and then
+calls :meth:`~plumpy.PortNamespace.pre_process` followed by :meth:`~plumpy.PortNamespace.validate`, as processes did
+before. The ``cached`` column is :meth:`plumpy.ProcessSpec.parse_inputs` with the validation cache enabled, that is
+parsing the same inputs again::
+
+    python benchmarks/parse_inputs.py --number 20
+"""
+
+import argparse
+import timeit
+from typing import Any, Callable, Dict, Optional
+
+import plumpy
+from plumpy.ports import copy_nested_dicts
+
+NUM_PORTS = 3000
+
+NUM_NAMESPACES = 30
+
+
+def create_spec(num_namespaces: int) -> plumpy.ProcessSpec:
+    """Return a spec with ``NUM_PORTS`` input ports spread evenly over the number of namespaces, or at the top level."""
+    spec = plumpy.ProcessSpec()
+    namespaces = [f'namespace_{index}' for index in range(num_namespaces)] or [None]
+    ports_per_namespace = NUM_PORTS // len(namespaces)
+
+    for namespace in namespaces:
+        for index in range(ports_per_namespace):
+            name = f'port_{index}' if namespace is None else f'{namespace}.port_{index}'
+            spec.input(name, valid_type=int, default=index)
+
+    spec.seal()
+    return spec
+
+
+def create_inputs(namespace: plumpy.PortNamespace) -> Dict[str, Any]:
+    """Return the inputs for the namespace that pass a value for every other port of each namespace."""
+    inputs: Dict[str, Any] = {}
+
+    for index, (name, port) in enumerate(namespace.items()):
+        if isinstance(port, plumpy.PortNamespace):
+            inputs[name] = create_inputs(port)
+        elif index % 2 == 0:
+            inputs[name] = 1
+
+    return inputs
+
+
+def bench_fused(spec: plumpy.ProcessSpec, inputs: Dict[str, Any]) -> Callable[[], None]:
+    def call():
+        spec.inputs.parse_inputs(inputs)
+
+    return call
+
+
+def bench_two_phase(spec: plumpy.ProcessSpec, inputs: Dict[str, Any]) -> Callable[[], None]:
+    def call():
+        spec.inputs.validate(spec.inputs.pre_process(copy_nested_dicts(dict(inputs))))
+
+    return call
+
+
+def bench_cached(spec: plumpy.ProcessSpec, inputs: Dict[str, Any]) -> Callable[[], None]:
+    spec.enable_validation_cache()
+
+    def call():
+        spec.parse_inputs(inputs)
+
+    return call
+
+
+def measure(function: Callable[[], None], number: int) -> float:
+    """Return the best time of a call of the function in milliseconds."""
+    return min(timeit.repeat(function, number=number, repeat=15)) / number * 1e3
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=20, help='the number of times the inputs are parsed')
+    args = parser.parse_args(argv)
+
+    print(f'{"spec (ms/parse)":<18}{"fused":>12}{"two-phase":>12}{"cached":>12}')
+    for name, num_namespaces in (('flat', 0), ('nested', NUM_NAMESPACES)):
+        spec = create_spec(num_namespaces)
+        inputs = create_inputs(spec.inputs)
+        results = [measure(bench(spec, inputs), args.number) for bench in (bench_fused, bench_two_phase, bench_cached)]
+        print(f'{name:<18}' + ''.join(f'{result:>12.2f}' for result in results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the cost of entering and leaving the scope of a process at increasing depths of the process stack.
+
+Every step of a process runs in its scope, such that ``Process.current()`` returns it, and processes that run child
+processes nest their scopes. The ``linked`` column is the scope of :class:`plumpy.Process`, that pushes a node onto an
+immutable linked list. The ``list copy`` column is the previous implementation, reproduced here, that copied the list
+of all processes on the stack when entering and again when leaving a scope::
+
+    python benchmarks/process_stack.py --number 20000
+"""
+
+import argparse
+import contextlib
+import contextvars
+import timeit
+from typing import Callable, ContextManager, Iterator, List, Optional
+
+import plumpy
+
+DEPTHS = (1, 10, 100, 1000)
+
+LIST_STACK: contextvars.ContextVar[List[plumpy.Process]] = contextvars.ContextVar('list stack', default=[])
+
+
+class BenchmarkProcess(plumpy.Process):
+    """Process that does nothing when run."""
+
+
+@contextlib.contextmanager
+def list_scope(process: plumpy.Process) -> Iterator[None]:
+    """The scope of a process as it was implemented with a list."""
+    stack_copy = LIST_STACK.get().copy()
+    stack_copy.append(process)
+    LIST_STACK.set(stack_copy)
+    try:
+        yield None
+    finally:
+        assert LIST_STACK.get()[-1] is process
+        stack_copy = LIST_STACK.get().copy()
+        stack_copy.pop()
+        LIST_STACK.set(stack_copy)
+
+
+def linked_scope(process: plumpy.Process) -> ContextManager[None]:
+    return process._process_scope()
+
+
+def measure(scope: Callable[[plumpy.Process], ContextManager[None]], depth: int, number: int) -> float:
+    """Return the best time of entering and leaving a scope with ``depth - 1`` scopes below it in microseconds."""
+    process = BenchmarkProcess()
+
+    def call():
+        with scope(process):
+            plumpy.Process.current()
+
+    def run() -> float:
+        with contextlib.ExitStack() as stack:
+            for _ in range(depth - 1):
+                stack.enter_context(scope(process))
+            return min(timeit.repeat(call, number=number, repeat=15)) / number * 1e6
+
+    # Run in a copy of the context, such that the scopes do not leak into the next benchmark
+    return contextvars.copy_context().run(run)
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=20000, help='the number of scopes entered at each depth')
+    args = parser.parse_args(argv)
+
+    plumpy.set_event_loop_policy()
+
+    print(f'{"depth (us/scope)":<18}{"linked":>12}{"list copy":>12}')
+    for depth in DEPTHS:
+        results = [measure(scope, depth, args.number) for scope in (linked_scope, list_scope)]
+        print(f'{depth:<18}' + ''.join(f'{result:>12.2f}' for result in results))
+
+
+if __name__ == '__main__':
+    main()
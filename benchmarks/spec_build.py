@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the time to define a hierarchy of processes that expose the inputs of each other and to build their specs.
+
+Each process of the hierarchy defines a number of inputs and exposes all inputs of the process below it in a namespace,
+as work chains that run other work chains do. The specs are built when ``spec()`` is first called, which is typically at
+import time. The ``shared`` column uses :meth:`plumpy.PortNamespace.absorb`, that shares the exposed ports with the
+exposed process. The ``deep copy`` column is the previous implementation, reproduced here, that deep copied every
+exposed port and scanned the attributes of every namespace for its mutable properties::
+
+    python benchmarks/spec_build.py --number 5
+"""
+
+import argparse
+import copy
+import timeit
+from typing import Any, Dict, List, Optional, Sequence
+
+import plumpy
+from plumpy.utils import is_mutable_property
+
+DEPTHS = (1, 5, 10)
+
+NUM_INPUTS = 20
+
+
+class CopyingPortNamespace(plumpy.PortNamespace):
+    """Port namespace that absorbs ports as it was implemented with deep copies."""
+
+    def absorb(
+        self,
+        port_namespace: plumpy.PortNamespace,
+        exclude: Optional[Sequence[str]] = None,
+        include: Optional[Sequence[str]] = None,
+        namespace_options: Optional[Dict[str, Any]] = None,
+    ) -> List[str]:
+        # The hierarchies of this benchmark neither exclude nor include ports
+        assert exclude is None and include is None
+        namespace_options = namespace_options or {}
+
+        for attr in dir(port_namespace):
+            if is_mutable_property(plumpy.PortNamespace, attr):
+                setattr(self, attr, namespace_options.pop(attr, getattr(port_namespace, attr)))
+
+        absorbed_ports = []
+
+        for port_name, port in port_namespace.items():
+            if isinstance(port, plumpy.PortNamespace):
+                self[port_name] = copy.copy(port)
+                portnamespace = self[port_name]
+                portnamespace._ports = {}
+                portnamespace._shared_ports = set()
+                portnamespace.absorb(port)
+            else:
+                self[port_name] = copy.deepcopy(port)
+
+            absorbed_ports.append(port_name)
+
+        return absorbed_ports
+
+
+class CopyingProcessSpec(plumpy.ProcessSpec):
+    PORT_NAMESPACE_TYPE = CopyingPortNamespace
+
+
+class CopyingProcess(plumpy.Process):
+    _spec_class = CopyingProcessSpec
+
+
+def build(base: type, depth: int) -> plumpy.ProcessSpec:
+    """Define a hierarchy of processes of the given depth and return the spec of the process at the top."""
+
+    class Bottom(base):  # type: ignore[valid-type,misc]
+        @classmethod
+        def define(cls, spec):
+            super().define(spec)
+            for index in range(NUM_INPUTS):
+                spec.input(f'input_{index}', valid_type=int, default=index)
+
+    process_class = Bottom
+    for _ in range(depth):
+
+        class Exposing(base):  # type: ignore[valid-type,misc]
+            _exposed = process_class
+
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                for index in range(NUM_INPUTS):
+                    spec.input(f'input_{index}', valid_type=int, default=index)
+                spec.expose_inputs(cls._exposed, namespace='exposed')
+
+        process_class = Exposing
+
+    return process_class.spec()
+
+
+def measure(base: type, depth: int, number: int) -> float:
+    """Return the best time of defining a hierarchy and building its specs in milliseconds."""
+    return min(timeit.repeat(lambda: build(base, depth), number=number, repeat=15)) / number * 1e3
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=5, help='the number of hierarchies built at each depth')
+    args = parser.parse_args(argv)
+
+    print(f'{"depth (ms/hierarchy)":<22}{"shared":>12}{"deep copy":>12}')
+    for depth in DEPTHS:
+        results = [measure(base, depth, args.number) for base in (plumpy.Process, CopyingProcess)]
+        print(f'{depth:<22}' + ''.join(f'{result:>12.2f}' for result in results))
+
+
+if __name__ == '__main__':
+    main()
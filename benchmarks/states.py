@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the memory and creation time of the process states and commands.
+
+The memory is the memory allocated per instance as traced by :mod:`tracemalloc`, which includes the objects that the
+instance creates, such as the future of a ``Waiting`` state. The script only uses the constructors of the states and
+commands, so it can be run against older versions of plumpy to compare them::
+
+    python benchmarks/states.py --number 20000
+"""
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, Optional
+
+import plumpy
+from plumpy import process_states
+
+
+class BenchmarkProcess(plumpy.Process):
+    """Process that does nothing when run."""
+
+
+EXCEPTION = RuntimeError('benchmark')
+
+# For each state and command, a function that creates an instance of the given class for the given process
+FACTORIES: Dict[type, Callable[[type, plumpy.Process], Any]] = {
+    process_states.Created: lambda cls, process: cls(process, process.run),
+    process_states.Running: lambda cls, process: cls(process, process.run),
+    process_states.Waiting: lambda cls, process: cls(process, None),
+    process_states.Finished: lambda cls, process: cls(process, None, True),
+    process_states.Excepted: lambda cls, process: cls(process, EXCEPTION),
+    process_states.Killed: lambda cls, process: cls(process, None),
+    process_states.Continue: lambda cls, process: cls(process.run),
+    process_states.Wait: lambda cls, process: cls(),
+    process_states.Stop: lambda cls, process: cls(None, True),
+    process_states.Kill: lambda cls, process: cls(),
+}
+
+
+def measure_memory(factory: Callable[[], Any], number: int) -> float:
+    """Return the number of bytes allocated per instance created by the factory."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        instances = [factory() for _ in range(number)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    # Do not count the list holding the instances
+    return (after - before - instances.__sizeof__()) / number
+
+
+def measure_time(factory: Callable[[], Any], number: int) -> float:
+    """Return the best time of creating an instance with the factory in microseconds."""
+    return min(timeit.repeat(factory, number=number, repeat=15)) / number * 1e6
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=20000, help='the number of instances created of each class')
+    args = parser.parse_args(argv)
+
+    plumpy.set_event_loop_policy()
+    process = BenchmarkProcess()
+
+    print(f'{"class":<12}{"bytes":>10}{"us":>10}')
+    for cls, create in FACTORIES.items():
+
+        def factory(cls=cls, create=create):
+            return create(cls, process)
+
+        memory, time = measure_memory(factory, args.number), measure_time(factory, args.number)
+        print(f'{cls.__name__:<12}{memory:>10.0f}{time:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the cost of calling lifecycle hooks through ``call_with_super_check`` compared to calling them directly.
+
+Processes call their lifecycle hooks through ``call_with_super_check``, which checks that each hook that is overridden
+calls the hook of its base class. The hooks are called on classes that override them at increasing depths, once through
+the check and once directly on the same classes without the check::
+
+    python benchmarks/super_check.py --number 20000
+"""
+
+import argparse
+import timeit
+from typing import Callable, Optional
+
+from plumpy.base.utils import call_with_super_check, super_check
+
+
+class Base:
+    # Like ``plumpy.persistence.Savable``, such that reading the call counter does not miss
+    _called = 0
+
+    @super_check
+    def on_hook(self):
+        pass
+
+
+class Depth2(Base):
+    def on_hook(self):
+        super().on_hook()
+
+
+class Depth3(Depth2):
+    def on_hook(self):
+        super().on_hook()
+
+
+class PlainBase:
+    def on_hook(self):
+        pass
+
+
+class PlainDepth2(PlainBase):
+    def on_hook(self):
+        super().on_hook()
+
+
+class PlainDepth3(PlainDepth2):
+    def on_hook(self):
+        super().on_hook()
+
+
+def bench_checked(cls: type) -> Callable[[], None]:
+    """Return a function that calls the hook of an instance of the class through ``call_with_super_check``."""
+    instance = cls()
+
+    def call():
+        call_with_super_check(instance.on_hook)
+
+    return call
+
+
+def bench_direct(cls: type) -> Callable[[], None]:
+    """Return a function that calls the hook of an instance of the class directly."""
+    instance = cls()
+
+    def call():
+        instance.on_hook()
+
+    return call
+
+
+BENCHMARKS = {
+    'hook, depth 1 (us/call)': (Base, PlainBase),
+    'hook, depth 3 (us/call)': (Depth3, PlainDepth3),
+}
+
+
+def measure(function: Callable[[], None], number: int) -> float:
+    """Return the best time of a call of the function in microseconds."""
+    return min(timeit.repeat(function, number=number, repeat=15)) / number * 1e6
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=20000, help='the number of calls of each benchmark')
+    args = parser.parse_args(argv)
+
+    print(f'{"benchmark":<26}{"checked":>12}{"direct":>12}')
+    for name, (checked, direct) in BENCHMARKS.items():
+        results = [measure(bench_checked(checked), args.number), measure(bench_direct(direct), args.number)]
+        print(f'{name:<26}' + ''.join(f'{result:>12.2f}' for result in results))
+
+
+if __name__ == '__main__':
+    main()
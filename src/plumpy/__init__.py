@@ -2,13 +2,16 @@
 # mypy: disable-error-code=name-defined
 __version__ = '0.25.1'
 
+import importlib
 import logging
+from typing import Any, List
 
 from .communications import *
 from .events import *
 from .exceptions import *
 from .futures import *
 from .loaders import *
+from .metrics import *
 from .mixins import *
 from .persistence import *
 from .ports import *
@@ -16,9 +19,20 @@ from .process_comms import *
 from .process_listener import *
 from .process_states import *
 from .processes import *
+from .profiling import *
+from .registry import *
 from .utils import *
 from .workchains import *
 
+# Modules that are only imported on first access of one of their attributes, since most users of plumpy do not need them
+_LAZY_MODULES = {
+    'asyncio_comms': ('AsyncioCommunicator',),
+    'hibernation': ('HibernatedProcess', 'HibernationManager'),
+    'watchdog': ('LoopWatchdog', 'SlowStep'),
+    'workers': ('WorkerPool',),
+}
+_LAZY_ATTRIBUTES = {attribute: module for module, attributes in _LAZY_MODULES.items() for attribute in attributes}
+
 __all__ = (
     events.__all__
     + exceptions.__all__
@@ -34,9 +48,30 @@ __all__ = (
     + loaders.__all__
     + ports.__all__
     + process_states.__all__
+    + registry.__all__
+    + metrics.__all__
+    + profiling.__all__
+    + list(_LAZY_ATTRIBUTES)
 )
 
 
+def __getattr__(name: str) -> Any:
+    """Import the lazily loaded modules on first access of the module or one of its attributes."""
+    if name in _LAZY_MODULES:
+        return importlib.import_module(f'.{name}', __name__)
+
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(f'.{_LAZY_ATTRIBUTES[name]}', __name__), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_MODULES) | set(_LAZY_ATTRIBUTES))
+
+
 # Do this se we don't get the "No handlers could be found..." warnings that will be produced
 # if a user of this library doesn't set any handlers. See
 # https://docs.python.org/3.1/library/logging.html#library-config
@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+"""An in-process communicator that delivers all messages on a single asyncio event loop"""
+
+import asyncio
+import collections
+import concurrent.futures
+import inspect
+import logging
+import uuid
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+import kiwipy
+
+from . import communications, futures
+
+if TYPE_CHECKING:
+    from .communications import ID_TYPE, BroadcastSubscriber, RpcSubscriber, TaskSubscriber
+
+__all__ = ['AsyncioCommunicator']
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TASK_QUEUE_SIZE = 1024
+DEFAULT_TASK_PREFETCH_COUNT = 1
+
+# The number of subjects for which the matching broadcast subscribers are cached
+SUBJECT_CACHE_SIZE = 256
+
+
+def _is_future(value: Any) -> bool:
+    return asyncio.isfuture(value) or isinstance(value, concurrent.futures.Future)
+
+
+class _QueuedTask:
+    """A task message waiting in the queue of an :class:`AsyncioCommunicator`"""
+
+    __slots__ = ('body', 'future', 'no_reply', 'rejected_by')
+
+    def __init__(self, body: Any, future: futures.Future, no_reply: bool):
+        self.body = body
+        self.future = future
+        self.no_reply = no_reply
+        self.rejected_by: Set['ID_TYPE'] = set()
+
+
+class _TaskSubscriber:
+    """A task subscriber together with the number of tasks it is currently processing"""
+
+    __slots__ = ('callback', 'in_flight')
+
+    def __init__(self, callback: 'TaskSubscriber'):
+        self.callback = callback
+        self.in_flight = 0
+
+
+class AsyncioCommunicator(kiwipy.Communicator):  # type: ignore
+    """
+    A communicator for single node deployments where senders and subscribers live in the same interpreter.
+
+    All messages are delivered by scheduling the subscribers directly on the event loop, without any serialisation,
+    broker round trip or hop through a communication thread. All methods have to be called from the thread that runs
+    the event loop.
+
+    * Tasks are put in a bounded queue and handed to the task subscribers, each of which processes at most
+      ``prefetch_count`` tasks at the same time. A task that is rejected by a subscriber is offered to the others, if
+      all of them reject it the task fails with :class:`kiwipy.TaskRejected`.
+    * RPC messages are dispatched directly to the subscriber registered with the recipient identifier.
+    * Broadcast subscribers can be registered for a set of subjects, in which case they are looked up by the leading
+      component of the subject of the message, as are :class:`plumpy.RoutedBroadcastFilter` subscribers. The
+      subscribers that are not indexed this way, for example those wrapped in a :class:`kiwipy.BroadcastFilter`, have
+      their subject filters evaluated once per subject.
+
+    The futures returned by :meth:`task_send` and :meth:`rpc_send` follow the conventions of the RabbitMQ communicator
+    so that the :class:`plumpy.RemoteProcessController` can be used unchanged: the future of an RPC resolves to the
+    return value of the subscriber, which can itself be a future, and the future of a task resolves, once the task
+    has been processed, to a future with its outcome.
+    """
+
+    def __init__(
+        self,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        queue_size: int = DEFAULT_TASK_QUEUE_SIZE,
+        prefetch_count: int = DEFAULT_TASK_PREFETCH_COUNT,
+    ):
+        """
+        :param loop: the event loop on which all messages are delivered
+        :param queue_size: the maximum number of tasks waiting to be processed, zero means unbounded
+        :param prefetch_count: the maximum number of tasks each task subscriber processes concurrently
+        """
+        if queue_size < 0:
+            raise ValueError(f'queue_size must be a non-negative integer, got: {queue_size}')
+        if prefetch_count < 1:
+            raise ValueError(f'prefetch_count must be a positive integer, got: {prefetch_count}')
+
+        self._loop = loop or asyncio.get_event_loop()
+        self._queue_size = queue_size
+        self._prefetch_count = prefetch_count
+        self._closed = False
+
+        self._task_queue: Deque[_QueuedTask] = collections.deque()
+        self._task_subscribers: Dict['ID_TYPE', _TaskSubscriber] = {}
+        self._dispatch_scheduled = False
+
+        self._rpc_subscribers: Dict['ID_TYPE', 'RpcSubscriber'] = {}
+
+        self._broadcast_subscribers: Dict['ID_TYPE', 'BroadcastSubscriber'] = {}
+        self._broadcast_topics: Dict[str, Dict['ID_TYPE', 'BroadcastSubscriber']] = {}
+        self._broadcast_subscriber_topics: Dict['ID_TYPE', Tuple[str, ...]] = {}
+        self._subject_cache: Dict[Any, List['BroadcastSubscriber']] = {}
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def is_closed(self) -> bool:
+        """Return `True` if the communicator was closed"""
+        return self._closed
+
+    def close(self) -> None:
+        """Close the communicator, any tasks still in the queue will fail with :class:`kiwipy.CommunicatorClosed`"""
+        if self._closed:
+            return
+
+        self._closed = True
+
+        while self._task_queue:
+            queued = self._task_queue.popleft()
+            if not queued.future.done():
+                queued.future.set_exception(kiwipy.CommunicatorClosed('the communicator was closed'))
+
+        self._task_subscribers.clear()
+        self._rpc_subscribers.clear()
+        self._broadcast_subscribers.clear()
+        self._broadcast_topics.clear()
+        self._broadcast_subscriber_topics.clear()
+        self._subject_cache.clear()
+
+    # region Tasks
+
+    def add_task_subscriber(self, subscriber: 'TaskSubscriber', identifier: Optional['ID_TYPE'] = None) -> 'ID_TYPE':
+        self._ensure_open()
+        identifier = identifier or str(uuid.uuid4())
+        if identifier in self._task_subscribers:
+            raise kiwipy.DuplicateSubscriberIdentifier(f"Task identifier '{identifier}'")
+
+        self._task_subscribers[identifier] = _TaskSubscriber(subscriber)
+        # There may be tasks that were sent before anyone was listening
+        self._schedule_dispatch()
+        return identifier
+
+    def remove_task_subscriber(self, identifier: 'ID_TYPE') -> None:
+        self._ensure_open()
+        try:
+            self._task_subscribers.pop(identifier)
+        except KeyError as exception:
+            raise ValueError(f"Unknown subscriber: '{identifier}'") from exception
+
+        # Tasks that were only waiting for this subscriber may now have been rejected by all others
+        self._schedule_dispatch()
+
+    def task_send(self, task: Any, no_reply: bool = False) -> Optional[futures.Future]:
+        """
+        Put a task in the queue.
+
+        :param task: the task message
+        :param no_reply: if True, do not return a future for the outcome of the task
+        :return: a future that resolves to a future with the outcome of the task, or None if ``no_reply`` is True
+        :raises kiwipy.DeliveryFailed: if the task queue is full
+        """
+        self._ensure_open()
+        if self._queue_size and len(self._task_queue) >= self._queue_size:
+            raise kiwipy.DeliveryFailed(f'the task queue is full ({self._queue_size} tasks)')
+
+        future = self._loop.create_future()
+        self._task_queue.append(_QueuedTask(task, future, no_reply))
+        self._schedule_dispatch()
+
+        if no_reply:
+            return None
+
+        return future
+
+    def _schedule_dispatch(self) -> None:
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            self._loop.call_soon(self._dispatch_tasks)
+
+    def _dispatch_tasks(self) -> None:
+        """Hand the tasks at the head of the queue to the subscribers that have capacity left."""
+        self._dispatch_scheduled = False
+
+        while self._task_queue and not self._closed:
+            queued = self._task_queue[0]
+
+            if queued.future.cancelled():
+                self._task_queue.popleft()
+                continue
+
+            candidates = [
+                (identifier, subscriber)
+                for identifier, subscriber in self._task_subscribers.items()
+                if identifier not in queued.rejected_by
+            ]
+
+            if not candidates:
+                if self._task_subscribers:
+                    # Every subscriber has had its chance and rejected the task
+                    self._task_queue.popleft()
+                    if queued.no_reply:
+                        _LOGGER.warning('Task was rejected by all subscribers: %r', queued.body)
+                    else:
+                        queued.future.set_exception(kiwipy.TaskRejected('the task was rejected by all subscribers'))
+                    continue
+                # Nobody is listening yet, wait for a subscriber to be added
+                return
+
+            for identifier, subscriber in candidates:
+                if subscriber.in_flight < self._prefetch_count:
+                    break
+            else:
+                # All subscribers that could take the task are busy, keep it at the head of the queue
+                return
+
+            self._task_queue.popleft()
+            subscriber.in_flight += 1
+            self._loop.create_task(self._process_task(identifier, subscriber, queued))
+
+    async def _process_task(self, identifier: 'ID_TYPE', subscriber: _TaskSubscriber, queued: _QueuedTask) -> None:
+        try:
+            result = subscriber.callback(self, queued.body)
+            if inspect.isawaitable(result) and not _is_future(result):
+                result = await result
+
+            # The task is only done once the chain of futures it returned has produced a concrete result
+            while _is_future(result):
+                result = await asyncio.wrap_future(result)
+        except kiwipy.TaskRejected:
+            queued.rejected_by.add(identifier)
+            self._task_queue.appendleft(queued)
+        except asyncio.CancelledError:
+            queued.future.cancel()
+        except Exception as exception:
+            if queued.no_reply:
+                _LOGGER.exception('Exception occurred while processing task.')
+            elif not queued.future.done():
+                queued.future.set_exception(exception)
+        else:
+            if not queued.future.done():
+                outcome = self._loop.create_future()
+                outcome.set_result(result)
+                queued.future.set_result(outcome)
+        finally:
+            subscriber.in_flight -= 1
+            self._schedule_dispatch()
+
+    # endregion
+
+    # region RPC
+
+    def add_rpc_subscriber(self, subscriber: 'RpcSubscriber', identifier: Optional['ID_TYPE'] = None) -> 'ID_TYPE':
+        self._ensure_open()
+        identifier = identifier or str(uuid.uuid4())
+        if identifier in self._rpc_subscribers:
+            raise kiwipy.DuplicateSubscriberIdentifier(f"RPC identifier '{identifier}'")
+
+        self._rpc_subscribers[identifier] = subscriber
+        return identifier
+
+    def remove_rpc_subscriber(self, identifier: 'ID_TYPE') -> None:
+        self._ensure_open()
+        try:
+            self._rpc_subscribers.pop(identifier)
+        except KeyError as exception:
+            raise ValueError(f"Unknown subscriber '{identifier}'") from exception
+
+    def rpc_send(self, recipient_id: 'ID_TYPE', msg: Any) -> futures.Future:
+        """
+        Send an RPC message to the subscriber with the given identifier.
+
+        :param recipient_id: the identifier of the recipient
+        :param msg: the body of the message
+        :return: a future that resolves to the return value of the subscriber
+        :raises kiwipy.UnroutableError: if there is no subscriber with the given identifier
+        """
+        self._ensure_open()
+        try:
+            subscriber = self._rpc_subscribers[recipient_id]
+        except KeyError:
+            # Processes subscribe with the string representation of their pid, like the routing keys of RabbitMQ
+            try:
+                subscriber = self._rpc_subscribers[str(recipient_id)]
+            except KeyError as exception:
+                raise kiwipy.UnroutableError(f"Unknown rpc recipient '{recipient_id}'") from exception
+
+        future = self._loop.create_future()
+        self._loop.call_soon(self._deliver_rpc, subscriber, msg, future)
+        return future
+
+    def _deliver_rpc(self, subscriber: 'RpcSubscriber', msg: Any, future: futures.Future) -> None:
+        if future.cancelled():
+            return
+
+        try:
+            result = subscriber(self, msg)
+        except Exception as exception:
+            future.set_exception(exception)
+            return
+
+        if inspect.isawaitable(result) and not _is_future(result):
+            task = asyncio.ensure_future(result, loop=self._loop)
+            task.add_done_callback(lambda done: self._resolve_rpc(future, done))
+        else:
+            self._set_rpc_result(future, result)
+
+    def _resolve_rpc(self, future: futures.Future, task: futures.Future) -> None:
+        if future.done():
+            return
+
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())  # type: ignore[arg-type]
+        else:
+            self._set_rpc_result(future, task.result())
+
+    def _set_rpc_result(self, future: futures.Future, result: Any) -> None:
+        if future.done():
+            return
+
+        if isinstance(result, concurrent.futures.Future):
+            result = asyncio.wrap_future(result, loop=self._loop)
+
+        future.set_result(result)
+
+    # endregion
+
+    # region Broadcast
+
+    def add_broadcast_subscriber(
+        self,
+        subscriber: 'BroadcastSubscriber',
+        identifier: Optional['ID_TYPE'] = None,
+        subjects: Optional[Iterable[str]] = None,
+    ) -> 'ID_TYPE':
+        """
+        Add a broadcast subscriber.
+
+        :param subscriber: the subscriber function to be called
+        :param identifier: an optional identifier for the subscriber
+        :param subjects: optional subjects the subscriber is interested in. A broadcast is delivered if its subject,
+            or the part of its subject before the first period, equals one of these subjects.
+        :return: an identifier for the subscriber and can be subsequently used to remove it
+        """
+        self._ensure_open()
+        identifier = identifier or str(uuid.uuid4())
+        if identifier in self._broadcast_subscribers or identifier in self._broadcast_subscriber_topics:
+            raise kiwipy.DuplicateSubscriberIdentifier(f"Broadcast identifier '{identifier}'")
+
+        if subjects is None and isinstance(subscriber, communications.RoutedBroadcastFilter):
+            subjects = subscriber.subjects
+
+        if subjects is None:
+            self._broadcast_subscribers[identifier] = subscriber
+            self._subject_cache.clear()
+        else:
+            topics = tuple(set(subjects))
+            for topic in topics:
+                self._broadcast_topics.setdefault(topic, {})[identifier] = subscriber
+            self._broadcast_subscriber_topics[identifier] = topics
+
+        return identifier
+
+    def remove_broadcast_subscriber(self, identifier: 'ID_TYPE') -> None:
+        self._ensure_open()
+        if identifier in self._broadcast_subscribers:
+            del self._broadcast_subscribers[identifier]
+            self._subject_cache.clear()
+            return
+
+        try:
+            topics = self._broadcast_subscriber_topics.pop(identifier)
+        except KeyError as exception:
+            raise ValueError(f"Broadcast subscriber '{identifier}' unknown") from exception
+
+        for topic in topics:
+            subscribers = self._broadcast_topics[topic]
+            del subscribers[identifier]
+            if not subscribers:
+                del self._broadcast_topics[topic]
+
+    def broadcast_send(
+        self,
+        body: Optional[Any],
+        sender: Optional[str] = None,
+        subject: Optional[str] = None,
+        correlation_id: Optional['ID_TYPE'] = None,
+    ) -> bool:
+        """Schedule the delivery of a broadcast message to all interested subscribers."""
+        self._ensure_open()
+
+        for subscriber in self._get_broadcast_subscribers(sender, subject):
+            self._loop.call_soon(self._deliver_broadcast, subscriber, body, sender, subject, correlation_id)
+
+        return True
+
+    def _get_broadcast_subscribers(self, sender: Any, subject: Any) -> List['BroadcastSubscriber']:
+        subscribers: List['BroadcastSubscriber'] = []
+
+        if subject is not None and self._broadcast_topics:
+            exact = self._broadcast_topics.get(subject)
+            prefix = None
+            if isinstance(subject, str):
+                topic = subject.partition('.')[0]
+                if topic != subject:
+                    prefix = self._broadcast_topics.get(topic)
+
+            if exact and prefix:
+                # A subscriber of both the subject and its topic should only receive the message once
+                subscribers.extend({**exact, **prefix}.values())
+            elif exact:
+                subscribers.extend(exact.values())
+            elif prefix:
+                subscribers.extend(prefix.values())
+
+        try:
+            candidates = self._subject_cache[subject]
+        except KeyError:
+            candidates = [
+                subscriber
+                for subscriber in self._broadcast_subscribers.values()
+                if not (isinstance(subscriber, kiwipy.BroadcastFilter) and subscriber.is_filtered(None, subject))
+            ]
+            if len(self._subject_cache) >= SUBJECT_CACHE_SIZE:
+                self._subject_cache.clear()
+            self._subject_cache[subject] = candidates
+
+        if sender is None:
+            subscribers.extend(candidates)
+        else:
+            subscribers.extend(
+                subscriber
+                for subscriber in candidates
+                if not (isinstance(subscriber, kiwipy.BroadcastFilter) and subscriber.is_filtered(sender, None))
+            )
+
+        return subscribers
+
+    def _deliver_broadcast(
+        self, subscriber: 'BroadcastSubscriber', body: Any, sender: Any, subject: Any, correlation_id: Any
+    ) -> None:
+        try:
+            result = subscriber(self, body, sender, subject, correlation_id)
+        except Exception:
+            _LOGGER.exception('Exception in broadcast receiver')
+            return
+
+        if inspect.isawaitable(result) and not _is_future(result):
+            asyncio.ensure_future(result, loop=self._loop).add_done_callback(self._log_broadcast_exception)
+
+    @staticmethod
+    def _log_broadcast_exception(task: futures.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.error('Exception in broadcast receiver', exc_info=task.exception())
+
+    # endregion
+
+    def _ensure_open(self) -> None:
+        if self._closed:
+            raise kiwipy.CommunicatorClosed
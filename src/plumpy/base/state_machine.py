@@ -88,12 +88,15 @@ def event(
     if from_states != '*':
         if inspect.isclass(from_states):
             from_states = (from_states,)
-        if not all(issubclass(state, State) for state in from_states):  # type: ignore
+        # A tuple, such that the state can be checked against all state classes with a single ``isinstance`` call
+        from_states = tuple(from_states)  # type: ignore[arg-type]
+        if not all(issubclass(state, State) for state in from_states):
             raise TypeError(f'from_states: {from_states}')
     if to_states != '*':
         if inspect.isclass(to_states):
             to_states = (to_states,)
-        if not all(issubclass(state, State) for state in to_states):  # type: ignore
+        to_states = tuple(to_states)  # type: ignore[arg-type]
+        if not all(issubclass(state, State) for state in to_states):
             raise TypeError(f'to_states: {to_states}')
 
     def wrapper(wrapped: Callable[..., Any]) -> Callable[..., Any]:
@@ -103,12 +106,12 @@ def event(
         def transition(self: Any, *a: Any, **kw: Any) -> Any:
             initial = self._state
 
-            if from_states != '*' and not any(isinstance(self._state, state) for state in from_states):  # type: ignore
+            if from_states != '*' and not isinstance(initial, from_states):  # type: ignore[arg-type]
                 raise EventError(evt_label, f'Event {evt_label} invalid in state {initial.LABEL}')
 
             result = wrapped(self, *a, **kw)
             if not (result is False or isinstance(result, Future)):
-                if to_states != '*' and not any(isinstance(self._state, state) for state in to_states):  # type: ignore
+                if to_states != '*' and not isinstance(self._state, to_states):  # type: ignore[arg-type]
                     if self._state == initial:
                         raise EventError(evt_label, 'Machine did not transition')
 
@@ -128,6 +131,8 @@ def event(
 
 
 class State:
+    __slots__ = ('_called', 'in_state', 'state_machine')
+
     LABEL: LABEL_TYPE = None
     # A set containing the labels of states that can be entered
     # from this one
@@ -307,8 +312,10 @@ class StateMachine(metaclass=StateMachineMeta):
             raise ValueError(f"Callback not set for hook '{hook}'")
 
     def _fire_state_event(self, hook: Hashable, state: Optional[State]) -> None:
-        for callback in self._event_callbacks.get(hook, []):
-            callback(self, hook, state)
+        callbacks = self._event_callbacks.get(hook)
+        if callbacks:
+            for callback in callbacks:
+                callback(self, hook, state)
 
     @super_check
     def on_terminated(self) -> None:
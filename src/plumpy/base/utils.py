@@ -11,8 +11,9 @@ def super_check(wrapped: Callable[..., Any]) -> Callable[..., Any]:
     """
 
     def wrapper(self: Any, *args: Any, **kwargs: Any) -> None:
-        msg = f"The function '{wrapped.__name__}' was not called through call_with_super_check"
-        assert getattr(self, '_called', 0) >= 1, msg
+        assert (
+            getattr(self, '_called', 0) >= 1
+        ), f"The function '{wrapped.__name__}' was not called through call_with_super_check"
         wrapped(self, *args, **kwargs)
         self._called -= 1
 
@@ -29,5 +30,6 @@ def call_with_super_check(wrapped: Callable[..., Any], *args: Any, **kwargs: Any
     call_count = getattr(self, '_called', 0)
     self._called = call_count + 1
     wrapped(*args, **kwargs)
-    msg = f"Base '{wrapped.__name__}' was not called from '{self.__class__}'\nHint: Did you forget to call the super?"
-    assert self._called == call_count, msg
+    assert (
+        self._called == call_count
+    ), f"Base '{wrapped.__name__}' was not called from '{self.__class__}'\nHint: Did you forget to call the super?"
@@ -3,7 +3,10 @@
 
 import asyncio
 import functools
-from typing import TYPE_CHECKING, Any, Callable, Hashable, Optional
+import inspect
+import logging
+import uuid
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional
 
 import kiwipy
 
@@ -14,7 +17,11 @@ __all__ = [
     'Communicator',
     'DeliveryFailed',
     'RemoteException',
+    'RoutedBroadcastFilter',
     'TaskRejected',
+    'WorkerCommunicator',
+    'create_routed_body',
+    'create_routed_broadcast_body',
     'plum_to_kiwi_future',
     'wrap_communicator',
 ]
@@ -24,6 +31,12 @@ DeliveryFailed = kiwipy.DeliveryFailed
 TaskRejected = kiwipy.TaskRejected
 Communicator = kiwipy.Communicator
 
+_LOGGER = logging.getLogger(__name__)
+
+ROUTE_RECIPIENT_KEY = 'recipient'
+ROUTE_RECIPIENTS_KEY = 'recipients'
+ROUTE_MESSAGE_KEY = 'message'
+
 if TYPE_CHECKING:
     # identifiers for subscribers
     ID_TYPE = Hashable
@@ -79,8 +92,9 @@ def convert_to_comm(
         # of setting up async tasks and callbacks
 
         def _passthrough(*args: Any, **kwargs: Any) -> bool:
-            sender = kwargs.get('sender', args[1])
-            subject = kwargs.get('subject', args[2])
+            # The subscriber may be called with keyword arguments, as kiwipy's ``LocalCommunicator`` does
+            sender = kwargs['sender'] if 'sender' in kwargs else args[1]
+            subject = kwargs['subject'] if 'subject' in kwargs else args[2]
             return callback.is_filtered(sender, subject)
     else:
 
@@ -186,3 +200,302 @@ class LoopCommunicator(kiwipy.Communicator):  # type: ignore
     def close(self) -> None:
         """Close a communicator, free up all resources and do not allow any further operations"""
         self._communicator.close()
+
+
+def create_routed_body(recipient_id: 'ID_TYPE', msg: Any) -> Dict[str, Any]:
+    """
+    Create the body of an RPC message for a recipient that is managed by a :class:`WorkerCommunicator`.
+
+    The message should be sent to the identifier of the worker, which will dispatch it to the recipient.
+
+    :param recipient_id: the identifier of the recipient, e.g. the pid of a process
+    :param msg: the body of the message for the recipient
+    :return: the message body
+    """
+    return {ROUTE_RECIPIENT_KEY: str(recipient_id), ROUTE_MESSAGE_KEY: msg}
+
+
+def create_routed_broadcast_body(recipient_ids: Iterable['ID_TYPE'], body: Any) -> Dict[str, Any]:
+    """
+    Create the body of a broadcast that should only be acted upon by the given recipients.
+
+    The recipients are matched against the ``recipient_id`` of the :class:`RoutedBroadcastFilter` subscribers.
+
+    :param recipient_ids: the identifiers of the recipients, e.g. the pids of processes
+    :param body: the body of the broadcast for the recipients
+    :return: the broadcast body
+    """
+    return {ROUTE_RECIPIENTS_KEY: [str(recipient_id) for recipient_id in recipient_ids], ROUTE_MESSAGE_KEY: body}
+
+
+class RoutedBroadcastFilter(kiwipy.BroadcastFilter):  # type: ignore
+    """
+    A broadcast filter that only passes broadcasts with one of a fixed set of subjects.
+
+    Broadcasts created with :func:`create_routed_broadcast_body` are only passed if the identifier of the recipient is
+    one of the recipients of the broadcast, in which case the subscriber receives the original body. Subjects are
+    compared for equality, which makes the filter cheaper than the pattern based filters and allows the
+    :class:`WorkerCommunicator` to look up the subscribers of a broadcast by its subject.
+    """
+
+    def __init__(self, subscriber: 'BroadcastSubscriber', subjects: Iterable[str], recipient_id: 'ID_TYPE'):
+        """
+        :param subscriber: the subscriber function to be called
+        :param subjects: the subjects of the broadcasts that should be passed
+        :param recipient_id: the identifier of the recipient, used for broadcasts with a list of recipients
+        """
+        super().__init__(subscriber)
+        self.subjects: FrozenSet[str] = frozenset(subjects)
+        self.recipient_id = str(recipient_id)
+
+    @property
+    def subscriber(self) -> 'BroadcastSubscriber':
+        return self._subscriber
+
+    def __call__(
+        self,
+        communicator: kiwipy.Communicator,
+        body: Any,
+        sender: Any = None,
+        subject: Any = None,
+        correlation_id: Any = None,
+    ) -> Any:
+        if self.is_filtered(sender, subject):
+            return None
+
+        if isinstance(body, dict) and ROUTE_RECIPIENTS_KEY in body:
+            if self.recipient_id not in body[ROUTE_RECIPIENTS_KEY]:
+                return None
+            body = body[ROUTE_MESSAGE_KEY]
+
+        return self._subscriber(communicator, body, sender, subject, correlation_id)
+
+    def is_filtered(self, sender: Any, subject: Any) -> bool:
+        if subject is not None and subject not in self.subjects:
+            return True
+
+        return super().is_filtered(sender, subject)
+
+
+class WorkerCommunicator(kiwipy.Communicator):  # type: ignore
+    """
+    Wrapper around a `kiwipy.Communicator` that keeps the RPC and broadcast subscribers of a worker in memory.
+
+    Instead of registering an RPC subscriber with the underlying communicator for every process, which for a broker
+    based communicator means a queue and a blocking round trip per process, the worker registers a single subscriber
+    under its own identifier and keeps a routing table of the local subscribers. Messages created with
+    :func:`create_routed_body` and sent to the worker identifier are dispatched to the local recipient, which is what a
+    :class:`plumpy.RemoteProcessController` does when it is given the identifier of the worker. Senders that do not
+    know the worker of a recipient can only reach it if the worker also subscribes the local recipients with the
+    underlying communicator, see ``subscribe_recipients``, which gives up the single subscription.
+
+    RPC messages for recipients that are not on this worker, both sent through this communicator and received by the
+    worker, are passed to the fallback, which by default sends them through the underlying communicator.
+
+    Likewise, :class:`RoutedBroadcastFilter` subscribers are indexed by their subjects behind a single broadcast
+    subscriber of the worker, such that each broadcast is matched once and only handed to the local subscribers for
+    its subject, or to the listed recipients for a body created with :func:`create_routed_broadcast_body`. The filters
+    still apply their own sender and subject filters, like they do when subscribed to a communicator. All other
+    operations are passed on to the underlying communicator unchanged.
+    """
+
+    def __init__(
+        self,
+        communicator: kiwipy.Communicator,
+        identifier: Optional['ID_TYPE'] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        fallback: Optional[Callable[['ID_TYPE', Any], kiwipy.Future]] = None,
+        subscribe_recipients: bool = False,
+    ):
+        """
+        :param communicator: The kiwipy communicator
+        :param identifier: The RPC identifier of the worker, a unique one is generated if not specified
+        :param loop: The event loop to schedule the local subscribers on
+        :param fallback: Called with the recipient identifier and message for recipients that are not on this worker,
+            should return a future with the outcome. By default the message is sent to the recipient through the
+            underlying communicator.
+        :param subscribe_recipients: Also subscribe every local RPC subscriber with the underlying communicator under
+            its own identifier, such that messages sent to it directly instead of routed through the worker reach it
+        """
+        assert communicator is not None
+
+        self._communicator = communicator
+        self._loop: asyncio.AbstractEventLoop = loop or asyncio.get_event_loop()
+        self._fallback = fallback or communicator.rpc_send
+        self._subscribe_recipients = subscribe_recipients
+        self._rpc_subscribers: Dict['ID_TYPE', Callable[..., kiwipy.Future]] = {}
+        # The routed broadcast filters by subject, then by recipient and then by their subscriber identifier, as more
+        # than one filter can have the same recipient, e.g. a process that was reloaded while the old one is subscribed
+        self._broadcast_routes: Dict[str, Dict['ID_TYPE', Dict['ID_TYPE', RoutedBroadcastFilter]]] = {}
+        self._routed_broadcast_subscribers: Dict['ID_TYPE', RoutedBroadcastFilter] = {}
+        self._identifier = communicator.add_rpc_subscriber(self._on_rpc, identifier or str(uuid.uuid4()))
+        communicator.add_broadcast_subscriber(self._on_broadcast, self._identifier)
+
+    @property
+    def identifier(self) -> 'ID_TYPE':
+        """Return the RPC identifier of this worker."""
+        return self._identifier
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def is_local(self, recipient_id: 'ID_TYPE') -> bool:
+        """Return whether the RPC subscriber with the given identifier is on this worker."""
+        return str(recipient_id) in self._rpc_subscribers
+
+    def _on_rpc(self, _communicator: kiwipy.Communicator, msg: Dict[str, Any]) -> Any:
+        """Dispatch an RPC message received by the worker to the local recipient."""
+        if not isinstance(msg, dict) or ROUTE_RECIPIENT_KEY not in msg or ROUTE_MESSAGE_KEY not in msg:
+            raise ValueError(
+                f'worker `{self._identifier}` only accepts messages created with `create_routed_body`, got: {msg!r}'
+            )
+
+        recipient_id = msg[ROUTE_RECIPIENT_KEY]
+        try:
+            subscriber = self._rpc_subscribers[recipient_id]
+        except KeyError:
+            return self._fallback(recipient_id, msg[ROUTE_MESSAGE_KEY])
+
+        return subscriber(self, msg[ROUTE_MESSAGE_KEY])
+
+    def _on_recipient_rpc(self, recipient_id: 'ID_TYPE', _communicator: kiwipy.Communicator, msg: Any) -> Any:
+        """Dispatch an RPC message sent directly to a local recipient through the underlying communicator."""
+        try:
+            subscriber = self._rpc_subscribers[recipient_id]
+        except KeyError:
+            raise kiwipy.UnroutableError(f"Unknown recipient '{recipient_id}'")
+
+        return subscriber(self, msg)
+
+    def _on_broadcast(
+        self,
+        _communicator: kiwipy.Communicator,
+        body: Any,
+        sender: Any = None,
+        subject: Any = None,
+        correlation_id: Any = None,
+    ) -> None:
+        """Hand a broadcast received by the worker to the local subscribers of its subject."""
+        routes = self._broadcast_routes.get(subject)
+        if not routes:
+            return
+
+        if isinstance(body, dict) and ROUTE_RECIPIENTS_KEY in body:
+            recipients = [routes[recipient] for recipient in body[ROUTE_RECIPIENTS_KEY] if recipient in routes]
+        else:
+            recipients = list(routes.values())
+
+        subscribers = [routed for filters in recipients for routed in filters.values()]
+
+        if subscribers:
+            # The filters are called themselves, such that their checks of the sender and subject apply like they do
+            # when they are subscribed with a communicator directly, and they unwrap the body for their recipient
+            args = (body, sender, subject, correlation_id)
+            self._loop.call_soon_threadsafe(self._deliver_broadcast, subscribers, args)
+
+    def _deliver_broadcast(self, subscribers: List[RoutedBroadcastFilter], args: Any) -> None:
+        for subscriber in subscribers:
+            try:
+                result = subscriber(self, *args)
+                if inspect.isawaitable(result):
+                    asyncio.ensure_future(result, loop=self._loop).add_done_callback(self._log_broadcast_exception)
+            except Exception:
+                _LOGGER.exception('Exception in broadcast receiver')
+
+    @staticmethod
+    def _log_broadcast_exception(task: futures.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.error('Exception in broadcast receiver', exc_info=task.exception())
+
+    def add_rpc_subscriber(self, subscriber: 'RpcSubscriber', identifier: Optional['ID_TYPE'] = None) -> 'ID_TYPE':
+        identifier = str(identifier or uuid.uuid4())
+        if identifier in self._rpc_subscribers:
+            raise kiwipy.DuplicateSubscriberIdentifier(f"RPC identifier '{identifier}'")
+
+        if self._subscribe_recipients:
+            self._communicator.add_rpc_subscriber(functools.partial(self._on_recipient_rpc, identifier), identifier)
+
+        self._rpc_subscribers[identifier] = convert_to_comm(subscriber, self._loop)
+        return identifier
+
+    def remove_rpc_subscriber(self, identifier: 'ID_TYPE') -> None:
+        try:
+            self._rpc_subscribers.pop(str(identifier))
+        except KeyError as exception:
+            raise ValueError(f"Unknown subscriber '{identifier}'") from exception
+
+        if self._subscribe_recipients:
+            self._communicator.remove_rpc_subscriber(str(identifier))
+
+    def add_task_subscriber(self, subscriber: 'TaskSubscriber', identifier: Optional['ID_TYPE'] = None) -> 'ID_TYPE':
+        return self._communicator.add_task_subscriber(subscriber, identifier)
+
+    def remove_task_subscriber(self, identifier: 'ID_TYPE') -> None:
+        return self._communicator.remove_task_subscriber(identifier)
+
+    def add_broadcast_subscriber(
+        self, subscriber: 'BroadcastSubscriber', identifier: Optional['ID_TYPE'] = None
+    ) -> 'ID_TYPE':
+        if not isinstance(subscriber, RoutedBroadcastFilter):
+            return self._communicator.add_broadcast_subscriber(subscriber, identifier)
+
+        identifier = str(identifier or uuid.uuid4())
+        if identifier in self._routed_broadcast_subscribers:
+            raise kiwipy.DuplicateSubscriberIdentifier(f"Broadcast identifier '{identifier}'")
+
+        self._routed_broadcast_subscribers[identifier] = subscriber
+        for subject in subscriber.subjects:
+            routes = self._broadcast_routes.setdefault(subject, {})
+            routes.setdefault(subscriber.recipient_id, {})[identifier] = subscriber
+        return identifier
+
+    def remove_broadcast_subscriber(self, identifier: 'ID_TYPE') -> None:
+        try:
+            subscriber = self._routed_broadcast_subscribers.pop(str(identifier))
+        except KeyError:
+            return self._communicator.remove_broadcast_subscriber(identifier)
+
+        identifier = str(identifier)
+        for subject in subscriber.subjects:
+            routes = self._broadcast_routes[subject]
+            filters = routes[subscriber.recipient_id]
+            del filters[identifier]
+            if not filters:
+                del routes[subscriber.recipient_id]
+            if not routes:
+                del self._broadcast_routes[subject]
+
+    def task_send(self, task: Any, no_reply: bool = False) -> kiwipy.Future:
+        return self._communicator.task_send(task, no_reply)
+
+    def rpc_send(self, recipient_id: 'ID_TYPE', msg: Any) -> kiwipy.Future:
+        try:
+            subscriber = self._rpc_subscribers[str(recipient_id)]
+        except KeyError:
+            return self._fallback(recipient_id, msg)
+
+        # The recipient is on this worker so there is no need to go through the underlying communicator
+        future = kiwipy.Future()
+        with kiwipy.capture_exceptions(future):
+            future.set_result(subscriber(self, msg))
+        return future
+
+    def broadcast_send(
+        self,
+        body: Optional[Any],
+        sender: Optional[str] = None,
+        subject: Optional[str] = None,
+        correlation_id: Optional['ID_TYPE'] = None,
+    ) -> futures.Future:
+        return self._communicator.broadcast_send(body, sender, subject, correlation_id)
+
+    def is_closed(self) -> bool:
+        """Return `True` if the communicator was closed"""
+        return self._communicator.is_closed()
+
+    def close(self) -> None:
+        """Close a communicator, free up all resources and do not allow any further operations"""
+        self._rpc_subscribers.clear()
+        self._broadcast_routes.clear()
+        self._routed_broadcast_subscribers.clear()
+        self._communicator.close()
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""Release idle waiting processes from memory and continue them from their checkpoint when they are needed again."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import sys
+import weakref
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Optional, Set, Tuple, cast
+
+import kiwipy
+
+from . import communications, futures, persistence, process_comms, process_states, workchains
+from .base import state_machine
+from .utils import PID_TYPE
+
+if TYPE_CHECKING:
+    from .processes import Process
+
+__all__ = ['HibernatedProcess', 'HibernationManager']
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _get_memory_usage() -> int:
+    """Return the resident memory of this process in bytes, or its peak if the current value is not available."""
+    import resource
+
+    try:
+        with open('/proc/self/statm', encoding='utf-8') as handle:
+            return int(handle.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        # The maximum resident set size is reported in bytes on macOS and in kilobytes elsewhere
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class HibernatedProcess:
+    """The stub that is kept in memory for a hibernated process."""
+
+    __slots__ = ('awaiting', 'future', 'pid', 'subscriptions')
+
+    def __init__(self, pid: PID_TYPE, future: asyncio.Future, awaiting: Dict[asyncio.Future, str]) -> None:
+        """
+        :param pid: the pid of the process
+        :param future: the future of the process, that is resolved once the continued process terminates
+        :param awaiting: the awaitables the process is waiting on, mapped onto the context keys of their results
+        """
+        self.pid = pid
+        self.future = future
+        self.awaiting = awaiting
+        self.subscriptions: Tuple[str, ...] = ()
+
+    def __repr__(self) -> str:
+        return f'<HibernatedProcess pid={self.pid} awaiting={sorted(self.awaiting.values())}>'
+
+
+class HibernationManager:
+    """
+    Hibernates the waiting processes it tracks and continues them from their checkpoint when they are needed again.
+
+    A process is hibernated once it has been waiting for longer than the threshold, or when the memory usage of the
+    worker exceeds the high-water mark. The process is checkpointed with the persister, after which it is closed and
+    stops stepping, such that it can be garbage collected. Only a :class:`HibernatedProcess` stub is kept, which holds
+    the pid, the future of the process and the awaitables it was waiting on.
+
+    The process is continued from its checkpoint once all of its awaitables are done, when an RPC or a broadcast
+    intent is sent to it through the communicator, when its future is cancelled or when :meth:`wake` is called.
+    Hibernation is transparent to the communicator and to those holding the future of the process, but not to those
+    holding a reference to the process itself, which should therefore only be tracked if it is controlled remotely.
+    """
+
+    def __init__(
+        self,
+        persister: persistence.Persister,
+        threshold: float,
+        high_water_mark: Optional[int] = None,
+        interval: Optional[float] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        communicator: Optional[kiwipy.Communicator] = None,
+        load_context: Optional[persistence.LoadSaveContext] = None,
+        memory_usage: Callable[[], int] = _get_memory_usage,
+    ) -> None:
+        """
+        :param persister: the persister to checkpoint the hibernated processes with
+        :param threshold: the number of seconds a process should be waiting before it is hibernated
+        :param high_water_mark: the memory usage in bytes above which all waiting processes are hibernated, longest
+            waiting first, until the usage is below the mark again
+        :param interval: the number of seconds between checks for processes to hibernate, defaults to the threshold
+        :param loop: the event loop to continue the processes on
+        :param communicator: the communicator of the processes, to continue them when they are messaged
+        :param load_context: the context to load the processes from their checkpoint with
+        :param memory_usage: the function returning the memory usage in bytes
+        """
+        self._persister = persister
+        self._threshold = threshold
+        self._high_water_mark = high_water_mark
+        self._interval = threshold if interval is None else interval
+        self._loop = loop or asyncio.get_event_loop()
+        self._communicator = communicator
+        self._memory_usage = memory_usage
+
+        load_context = load_context if load_context is not None else persistence.LoadSaveContext()
+        extend: Dict[str, Any] = {}
+        if 'loop' not in load_context:
+            extend['loop'] = self._loop
+        if communicator is not None and 'communicator' not in load_context:
+            extend['communicator'] = communicator
+        self._load_context = load_context.copyextend(**extend) if extend else load_context
+
+        # The waiting processes mapped onto the time at which they started waiting
+        self._waiting: Dict[PID_TYPE, Tuple['Process', float]] = {}
+        self._hibernated: Dict[PID_TYPE, HibernatedProcess] = {}
+        self._tasks: Set[asyncio.Future] = set()
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def hibernated(self) -> Dict[PID_TYPE, HibernatedProcess]:
+        """Return the stubs of the hibernated processes keyed on their pid."""
+        return dict(self._hibernated)
+
+    def is_hibernated(self, pid: PID_TYPE) -> bool:
+        """Return whether the process with the given pid is hibernated."""
+        return pid in self._hibernated
+
+    def track(self, process: 'Process') -> None:
+        """
+        Track the process, such that it is hibernated when it has been waiting for long enough.
+
+        :param process: the process
+        """
+        process.add_state_event_callback(state_machine.StateEventHook.ENTERED_STATE, self._state_entered)
+        self._update(process)
+
+    def untrack(self, process: 'Process') -> None:
+        """Stop tracking the process."""
+        self._waiting.pop(process.pid, None)
+        try:
+            process.remove_state_event_callback(state_machine.StateEventHook.ENTERED_STATE, self._state_entered)
+        except ValueError:
+            pass
+
+    def start(self) -> None:
+        """Start checking for processes to hibernate periodically."""
+        if self._handle is None:
+            self._handle = self._loop.call_later(self._interval, self._periodic_check)
+
+    def stop(self) -> None:
+        """Stop checking for processes to hibernate periodically."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def check(self) -> int:
+        """
+        Hibernate the processes that have been waiting for longer than the threshold, or all waiting processes, longest
+        waiting first, while the memory usage exceeds the high-water mark.
+
+        :return: the number of processes that were hibernated
+        """
+        now = self._loop.time()
+        candidates = sorted(self._waiting.values(), key=lambda item: item[1])
+        over_high_water_mark = self._high_water_mark is not None and self._memory_usage() > self._high_water_mark
+        count = 0
+
+        for process, since in candidates:
+            if not over_high_water_mark and now - since < self._threshold:
+                break
+
+            if self.hibernate(process):
+                count += 1
+                if over_high_water_mark:
+                    over_high_water_mark = self._memory_usage() > cast(int, self._high_water_mark)
+
+        return count
+
+    def hibernate(self, process: 'Process') -> bool:
+        """
+        Checkpoint the waiting process and release it from memory.
+
+        :param process: the process
+        :return: True if the process is being hibernated, False if it cannot be hibernated
+        """
+        if process.state != process_states.ProcessState.WAITING or process.paused or process.hibernated:
+            return False
+
+        state = process._state
+        awaiting = state.detach_awaitables() if isinstance(state, workchains.Waiting) else {}
+
+        try:
+            self._persister.save_checkpoint(process)
+        except Exception:
+            # Do not try again until the process enters a new waiting state
+            _LOGGER.warning('Process<%s>: failed to checkpoint the process for hibernation', process.pid, exc_info=True)
+            self._restore(process, awaiting)
+            return False
+
+        result = process.hibernate()
+        if not result:
+            self._restore(process, awaiting)
+            return False
+
+        stub = HibernatedProcess(process.pid, process.future(), awaiting)
+        self._hibernated[stub.pid] = stub
+        self.untrack(process)
+        _LOGGER.debug('Process<%s>: hibernating', stub.pid)
+
+        if isinstance(result, futures.CancellableAction):
+            # The process is stepping, so it is only closed once the step is interrupted, after which the stub can take
+            # over its subscriptions. If the interruption is cancelled, for example by a pause, the process carries on.
+            def interrupted(action: asyncio.Future) -> None:
+                if self._hibernated.get(stub.pid) is not stub:
+                    return
+                if action.cancelled():
+                    del self._hibernated[stub.pid]
+                    self._restore(process, awaiting)
+                    self.track(process)
+                else:
+                    self._subscribe(stub)
+
+            result.add_done_callback(interrupted)
+        else:
+            self._subscribe(stub)
+
+        return True
+
+    def wake(self, pid: PID_TYPE) -> 'Process':
+        """
+        Continue the hibernated process from its checkpoint.
+
+        :param pid: the pid of the process
+        :return: the continued process
+        :raises KeyError: if the process is not hibernated
+        """
+        stub = self._hibernated.pop(pid)
+        self._unsubscribe(stub)
+
+        saved_state = self._persister.load_checkpoint(pid)
+        process = cast('Process', saved_state.unbundle(self._load_context))
+        _LOGGER.debug('Process<%s>: continuing from hibernation', pid)
+
+        if stub.awaiting:
+            cast(workchains.Waiting, process._state).attach_awaitables(stub.awaiting)
+
+        # Resolve the future of the hibernated process with that of the continued one, and kill it when it is cancelled
+        def resolve(future: asyncio.Future) -> None:
+            if stub.future.done():
+                return
+            if future.cancelled():
+                stub.future.cancel()
+            elif future.exception() is not None:
+                stub.future.set_exception(cast(BaseException, future.exception()))
+            else:
+                stub.future.set_result(future.result())
+
+        process.future().add_done_callback(resolve)
+        stub.future.add_done_callback(functools.partial(self._future_cancelled, weakref.ref(process), process.future()))
+
+        self.track(process)
+        task = asyncio.ensure_future(process.step_until_terminated(), loop=self._loop)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        return process
+
+    def _restore(self, process: 'Process', awaiting: Dict[asyncio.Future, str]) -> None:
+        """Restore the process that could not be hibernated, untracking it until it enters a new waiting state."""
+        self._waiting.pop(process.pid, None)
+        if awaiting:
+            cast(workchains.Waiting, process._state).attach_awaitables(awaiting)
+
+    @staticmethod
+    def _future_cancelled(process_ref: weakref.ref, continued: asyncio.Future, future: asyncio.Future) -> None:
+        """Kill the continued process when the future of the hibernated process is cancelled.
+
+        If the continued process was hibernated again, its own future is cancelled instead, such that the callbacks
+        registered on it when it was hibernated, or when it was continued again, take care of killing the process.
+        """
+        if not future.cancelled():
+            return
+
+        process = process_ref()
+        if process is not None and not process.hibernated and not process.has_terminated():
+            process.kill('Killed by future being cancelled')
+        elif not continued.done():
+            continued.cancel()
+
+    def _periodic_check(self) -> None:
+        self._handle = None
+        try:
+            self.check()
+        finally:
+            self.start()
+
+    def _state_entered(self, machine: state_machine.StateMachine, _hook: Hashable, _state: Any) -> None:
+        self._update(cast('Process', machine))
+
+    def _update(self, process: 'Process') -> None:
+        if process.state == process_states.ProcessState.WAITING:
+            if process.pid not in self._waiting:
+                self._waiting[process.pid] = (process, self._loop.time())
+        else:
+            self._waiting.pop(process.pid, None)
+            if process.has_terminated():
+                self.untrack(process)
+
+    def _subscribe(self, stub: HibernatedProcess) -> None:
+        """Subscribe the stub to the events that should continue the hibernated process."""
+        pid = stub.pid
+
+        def awaitable_done(_: asyncio.Future) -> None:
+            if self._hibernated.get(pid) is stub and all(awaitable.done() for awaitable in stub.awaiting):
+                self.wake(pid)
+
+        for awaitable in stub.awaiting:
+            awaitable.add_done_callback(awaitable_done)
+
+        def future_done(future: asyncio.Future) -> None:
+            if future.cancelled() and self._hibernated.get(pid) is stub:
+                self.wake(pid).kill('Killed by future being cancelled')
+
+        stub.future.add_done_callback(future_done)
+
+        if self._communicator is None:
+            return
+
+        def message_receive(communicator: kiwipy.Communicator, msg: process_comms.MessageType) -> Any:
+            return self.wake(pid).message_receive(communicator, msg)
+
+        def broadcast_receive(communicator: kiwipy.Communicator, *args: Any, **kwargs: Any) -> Any:
+            return self.wake(pid).broadcast_receive(communicator, *args, **kwargs)
+
+        subscriber = communications.RoutedBroadcastFilter(
+            broadcast_receive,
+            subjects=(process_comms.Intent.PLAY, process_comms.Intent.PAUSE, process_comms.Intent.KILL),
+            recipient_id=pid,
+        )
+
+        try:
+            stub.subscriptions = (
+                self._communicator.add_rpc_subscriber(message_receive, identifier=str(pid)),
+                self._communicator.add_broadcast_subscriber(subscriber, identifier=str(pid)),
+            )
+        except kiwipy.TimeoutError:
+            _LOGGER.exception('Process<%s>: failed to subscribe the hibernated process, continuing it', pid)
+            self.wake(pid)
+
+    def _unsubscribe(self, stub: HibernatedProcess) -> None:
+        if self._communicator is None or not stub.subscriptions:
+            return
+
+        rpc_identifier, broadcast_identifier = stub.subscriptions
+        stub.subscriptions = ()
+        self._communicator.remove_rpc_subscriber(rpc_identifier)
+        self._communicator.remove_broadcast_subscriber(broadcast_identifier)
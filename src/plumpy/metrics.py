@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+"""Metrics of the processes of a worker, exported in the Prometheus text format."""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import os
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import kiwipy
+
+from .profiling import DEFAULT_BUCKETS, Histogram
+from .registry import ProcessRegistry, get_process_registry
+
+if TYPE_CHECKING:
+    from .process_states import State
+    from .processes import Process
+
+__all__ = ['CounterMetric', 'GaugeMetric', 'HistogramMetric', 'Metrics', 'get_metrics', 'set_metrics']
+
+# The content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# The upper bounds, in bytes, of the buckets of the histogram of the checkpoint sizes
+CHECKPOINT_BYTES_BUCKETS: Tuple[float, ...] = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+LABEL_VALUES_TYPE = Tuple[str, ...]
+
+
+class _Metric:
+    """A named metric with a value for each combination of the values of its labels."""
+
+    TYPE: str
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        """
+        :param name: the name of the metric
+        :param documentation: the description of the metric
+        :param labels: the names of the labels of the metric
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def samples(self) -> Iterator[Tuple[str, LABEL_VALUES_TYPE, Tuple[Tuple[str, str], ...], float]]:
+        """
+        Return the samples of the metric.
+
+        :return: tuples of the name of the sample, the values of the labels, any extra labels and the value
+        """
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Return the lines of the metric in the Prometheus text format."""
+        lines = [f'# HELP {self.name} {_escape(self.documentation)}', f'# TYPE {self.name} {self.TYPE}']
+        for name, label_values, extra, value in self.samples():
+            labels = [*zip(self.labels, label_values), *extra]
+            if labels:
+                formatted = ','.join(f'{label}="{_escape(label_value, quote=True)}"' for label, label_value in labels)
+                lines.append(f'{name}{{{formatted}}} {_format_value(value)}')
+            else:
+                lines.append(f'{name} {_format_value(value)}')
+
+        return lines
+
+
+class CounterMetric(_Metric):
+    """Metric whose values only increase."""
+
+    TYPE = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LABEL_VALUES_TYPE, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """
+        Increase the value for the given label values.
+
+        :param label_values: the values of the labels
+        :param amount: the amount to increase the value by
+        """
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Return the value for the given label values."""
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> Iterator[Tuple[str, LABEL_VALUES_TYPE, Tuple[Tuple[str, str], ...], float]]:
+        for label_values, value in list(self._values.items()):
+            yield self.name, label_values, (), value
+
+
+class GaugeMetric(_Metric):
+    """Metric whose values go up and down, either set directly or returned by a function when they are collected."""
+
+    TYPE = 'gauge'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        function: Optional[Callable[[], Dict[LABEL_VALUES_TYPE, float]]] = None,
+    ) -> None:
+        """
+        :param name: the name of the metric
+        :param documentation: the description of the metric
+        :param labels: the names of the labels of the metric
+        :param function: optional function returning the values keyed on the label values, when they are collected
+        """
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LABEL_VALUES_TYPE, float] = {}
+        self._function = function
+
+    def set(self, value: float, *label_values: str) -> None:
+        """
+        Set the value for the given label values.
+
+        :param value: the value
+        :param label_values: the values of the labels
+        """
+        self._values[label_values] = value
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """
+        Increase the value for the given label values.
+
+        :param label_values: the values of the labels
+        :param amount: the amount to increase the value by
+        """
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        """
+        Decrease the value for the given label values.
+
+        :param label_values: the values of the labels
+        :param amount: the amount to decrease the value by
+        """
+        self.inc(*label_values, amount=-amount)
+
+    def value(self, *label_values: str) -> float:
+        """Return the value for the given label values."""
+        if self._function is not None:
+            return self._function().get(label_values, 0.0)
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> Iterator[Tuple[str, LABEL_VALUES_TYPE, Tuple[Tuple[str, str], ...], float]]:
+        values = self._function() if self._function is not None else dict(self._values)
+        for label_values, value in values.items():
+            yield self.name, label_values, (), value
+
+
+class HistogramMetric(_Metric):
+    """Metric of the distribution of observed values in buckets with fixed upper bounds."""
+
+    TYPE = 'histogram'
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        """
+        :param name: the name of the metric
+        :param documentation: the description of the metric
+        :param labels: the names of the labels of the metric
+        :param buckets: the upper bounds of the buckets
+        """
+        super().__init__(name, documentation, labels)
+        self._buckets = tuple(buckets)
+        self._histograms: Dict[LABEL_VALUES_TYPE, Histogram] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """
+        Add a value to the histogram of the given label values.
+
+        :param value: the value
+        :param label_values: the values of the labels
+        """
+        try:
+            histogram = self._histograms[label_values]
+        except KeyError:
+            histogram = self._histograms[label_values] = Histogram(self._buckets)
+
+        histogram.observe(value)
+
+    def histogram(self, *label_values: str) -> Optional[Histogram]:
+        """Return the histogram of the given label values, or None if no values were observed for them."""
+        return self._histograms.get(label_values)
+
+    def samples(self) -> Iterator[Tuple[str, LABEL_VALUES_TYPE, Tuple[Tuple[str, str], ...], float]]:
+        for label_values, histogram in list(self._histograms.items()):
+            cumulative = 0
+            for bucket, count in zip(self._buckets, histogram.counts):
+                cumulative += count
+                yield f'{self.name}_bucket', label_values, (('le', _format_value(bucket)),), cumulative
+            yield f'{self.name}_bucket', label_values, (('le', '+Inf'),), histogram.count
+            yield f'{self.name}_sum', label_values, (), histogram.total
+            yield f'{self.name}_count', label_values, (), histogram.count
+
+
+class Metrics:
+    """
+    The metrics of the processes of a worker.
+
+    While set with :func:`set_metrics`, the metrics are fed from the hooks of the processes, the persisters and the
+    process launcher. Rates, such as the transitions per second, are derived from the counters by the scraper. The
+    metrics are exported in the Prometheus text format with :meth:`render`, to a file with :meth:`write` or over HTTP
+    with :meth:`serve`.
+    """
+
+    def __init__(self, registry: Optional[ProcessRegistry] = None, prefix: str = 'plumpy') -> None:
+        """
+        :param registry: the registry of the live processes, defaults to the one set with
+            :func:`~plumpy.registry.set_process_registry` at the time the metrics are rendered
+        :param prefix: the prefix of the names of the metrics
+        """
+        self._registry = registry
+
+        self.processes_created = CounterMetric(
+            f'{prefix}_processes_created_total', 'Number of processes created.', ('process_class',)
+        )
+        self.processes_terminated = CounterMetric(
+            f'{prefix}_processes_terminated_total',
+            'Number of processes that terminated, by terminal state.',
+            ('process_class', 'state'),
+        )
+        self.transitions = CounterMetric(
+            f'{prefix}_transitions_total', 'Number of state transitions of processes.', ('state',)
+        )
+        self.live_processes = GaugeMetric(
+            f'{prefix}_live_processes',
+            'Number of processes in memory, by state.',
+            ('state',),
+            function=self._count_live_processes,
+        )
+        self.checkpoint_seconds = HistogramMetric(
+            f'{prefix}_checkpoint_seconds', 'Time to save a checkpoint of a process in seconds.'
+        )
+        self.checkpoint_bytes = HistogramMetric(
+            f'{prefix}_checkpoint_bytes',
+            'Size of the saved checkpoints of processes in bytes.',
+            (),
+            CHECKPOINT_BYTES_BUCKETS,
+        )
+        self.rpc_seconds = HistogramMetric(
+            f'{prefix}_rpc_seconds', 'Time to handle an RPC message to a process in seconds.', ('intent',)
+        )
+        self.launcher_tasks = GaugeMetric(
+            f'{prefix}_launcher_tasks',
+            'Number of tasks for which process launchers are launching or continuing a process, not counting the time '
+            'spent waiting for the process to terminate.',
+        )
+
+    @property
+    def metrics(self) -> List[_Metric]:
+        """Return all metrics."""
+        return [
+            self.processes_created,
+            self.processes_terminated,
+            self.transitions,
+            self.live_processes,
+            self.checkpoint_seconds,
+            self.checkpoint_bytes,
+            self.rpc_seconds,
+            self.launcher_tasks,
+        ]
+
+    def state_entered(self, process: 'Process', from_state: Optional['State']) -> None:
+        """
+        Record the transition of a process into its current state.
+
+        :param process: the process
+        :param from_state: the state the process left, or None if it was just created
+        """
+        state = process.state
+        label = state.value if isinstance(state, enum.Enum) else str(state)
+        process_class = process.__class__.__qualname__
+
+        self.transitions.inc(label)
+        if from_state is None:
+            self.processes_created.inc(process_class)
+        elif process.has_terminated():
+            self.processes_terminated.inc(process_class, label)
+
+    def observe_checkpoint(self, seconds: float, size: Optional[int] = None) -> None:
+        """
+        Record the save of a checkpoint.
+
+        :param seconds: the time it took to save the checkpoint
+        :param size: the size of the checkpoint in bytes, if known
+        """
+        self.checkpoint_seconds.observe(seconds)
+        if size is not None:
+            self.checkpoint_bytes.observe(size)
+
+    def observe_rpc(self, intent: str, start: float, outcome: Any) -> Any:
+        """
+        Record the time to handle an RPC message, once its outcome is resolved if it is a future.
+
+        :param intent: the intent of the message
+        :param start: the :func:`time.perf_counter` time at which the message was received
+        :param outcome: the outcome of handling the message
+        :return: the outcome
+        """
+        if isinstance(outcome, kiwipy.Future):
+            outcome.add_done_callback(lambda _: self.rpc_seconds.observe(time.perf_counter() - start, intent))
+        else:
+            self.rpc_seconds.observe(time.perf_counter() - start, intent)
+
+        return outcome
+
+    def render(self) -> str:
+        """Return the metrics in the Prometheus text format."""
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str) -> None:
+        """
+        Write the metrics in the Prometheus text format to a file, for example for the textfile collector of the node
+        exporter. The file is replaced atomically, such that readers never see a partially written file.
+
+        :param path: the path of the file
+        """
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as handle:
+            handle.write(self.render())
+        os.replace(temporary_path, path)
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 0) -> asyncio.AbstractServer:
+        """
+        Serve the metrics over HTTP at the ``/metrics`` path, from the event loop of the processes.
+
+        :param host: the host to listen on, which defaults to only local connections
+        :param port: the port to listen on, where 0 picks a free port
+        :return: the server, whose ``sockets`` give the address it listens on and that should be closed when done
+        """
+        return await asyncio.start_server(self._handle_scrape, host, port)
+
+    async def _handle_scrape(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = (await reader.readline()).split()
+            # Skip the headers of the request
+            while (await reader.readline()).strip():
+                pass
+
+            if len(request) < 2 or request[0] != b'GET':
+                status, body = '405 Method Not Allowed', b''
+            elif request[1].split(b'?')[0] != b'/metrics':
+                status, body = '404 Not Found', b''
+            else:
+                status, body = '200 OK', self.render().encode('utf-8')
+
+            headers = f'HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\nContent-Length: {len(body)}\r\n'
+            writer.write(f'{headers}Connection: close\r\n\r\n'.encode('latin-1') + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _count_live_processes(self) -> Dict[LABEL_VALUES_TYPE, float]:
+        registry = self._registry if self._registry is not None else get_process_registry()
+        if registry is None:
+            return {}
+
+        return {
+            (state.value if isinstance(state, enum.Enum) else str(state),): count
+            for state, count in registry.counts_by_state().items()
+        }
+
+
+def _escape(value: str, quote: bool = False) -> str:
+    value = value.replace('\\', '\\\\').replace('\n', '\\n')
+    return value.replace('"', '\\"') if quote else value
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+METRICS: Optional[Metrics] = None
+
+
+def get_metrics() -> Optional[Metrics]:
+    """
+    Get the global metrics
+
+    :return: the metrics or None if no metrics are collected
+    """
+    return METRICS
+
+
+def set_metrics(metrics: Optional[Metrics]) -> None:
+    """
+    Set the global metrics, which enables collecting them from all processes, or disable it by passing None
+
+    :param metrics: the metrics or None
+    """
+    global METRICS  # noqa: PLW0603
+    METRICS = metrics
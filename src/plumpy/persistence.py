@@ -8,13 +8,14 @@ import fnmatch
 import inspect
 import os
 import pickle
+import time
 import uuid
 from types import MethodType
 from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, Iterable, List, Optional, Set, TypeVar, Union
 
 import yaml
 
-from . import futures, loaders, utils
+from . import futures, loaders, metrics, utils
 from .base.utils import call_with_super_check, super_check
 from .utils import PID_TYPE, SAVED_STATE_TYPE
 
@@ -246,8 +247,22 @@ class PicklePersister(Persister):
         checkpoint = PersistedCheckpoint(process.pid, tag)
         persisted_pickle = PersistedPickle(checkpoint, bundle)
 
-        with open(self._pickle_filepath(process.pid, tag), 'w+b') as handle:
+        # Write to a temporary file first and then move it in place, such that other processes that share the pickle
+        # directory never see a partially written checkpoint.
+        filepath = self._pickle_filepath(process.pid, tag)
+        temporary_filepath = f'{filepath}.{os.getpid()}.tmp'
+
+        collector = metrics.get_metrics()
+        start = time.perf_counter() if collector is not None else 0.0
+
+        with open(temporary_filepath, 'w+b') as handle:
             pickle.dump(persisted_pickle, handle)
+            size = handle.tell()
+
+        os.replace(temporary_filepath, filepath)
+
+        if collector is not None:
+            collector.observe_checkpoint(time.perf_counter() - start, size)
 
     def load_checkpoint(self, pid: PID_TYPE, tag: Optional[str] = None) -> Bundle:
         """
@@ -328,8 +343,14 @@ class InMemoryPersister(Persister):
         self._save_context = LoadSaveContext(loader=loader)
 
     def save_checkpoint(self, process: 'Process', tag: Optional[str] = None) -> None:
+        collector = metrics.get_metrics()
+        start = time.perf_counter() if collector is not None else 0.0
+
         self._checkpoints.setdefault(process.pid, {})[tag] = Bundle(process, self._save_context, dereference=True)
 
+        if collector is not None:
+            collector.observe_checkpoint(time.perf_counter() - start)
+
     def load_checkpoint(self, pid: PID_TYPE, tag: Optional[str] = None) -> Bundle:
         return self._checkpoints[pid][tag]
 
@@ -441,10 +462,14 @@ META__TYPE__SAVABLE: str = 'S'
 
 
 class Savable:
+    __slots__ = ()
+
     CLASS_NAME: str = 'class_name'
 
     _auto_persist: Optional[Set[str]] = None
     _persist_configured = False
+    # The number of pending calls through ``call_with_super_check``, a class default such that reading it is cheap
+    _called = 0
 
     @staticmethod
     def load(saved_state: SAVED_STATE_TYPE, load_context: Optional[LoadSaveContext] = None) -> 'Savable':
@@ -549,9 +574,12 @@ class Savable:
             setattr(self, member, self._get_value(saved_state, member, load_context))
 
     def _ensure_persist_configured(self) -> None:
-        if not self._persist_configured:
+        # The configuration is stored on the class, which is also what ``persist`` configures, such that it is done once
+        # per class and does not require an instance attribute, which slotted subclasses may not have.
+        cls = self.__class__
+        if not cls.__dict__.get('_persist_configured', False):
             self.persist()
-            self._persist_configured = True
+            cls._persist_configured = True
 
     # region Metadata getter/setters
 
@@ -615,6 +643,8 @@ class SavableFuture(futures.Future, Savable):
     .. note: This does not save any assigned done callbacks.
     """
 
+    __slots__ = ('_called',)
+
     def save_instance_state(self, out_state: SAVED_STATE_TYPE, save_context: LoadSaveContext) -> None:
         super().save_instance_state(out_state, save_context)
         if self.done() and self.exception() is not None:
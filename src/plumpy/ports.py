@@ -1,17 +1,45 @@
 # -*- coding: utf-8 -*-
 """Module for process ports"""
 
+import asyncio
 import collections
 import copy
 import inspect
 import json
 import logging
 import warnings
-from typing import Any, Callable, Dict, Iterator, List, Mapping, MutableMapping, Optional, Sequence, Type, Union, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    ItemsView,
+    Iterator,
+    KeysView,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    ValuesView,
+    cast,
+)
 
 from plumpy.utils import AttributesFrozendict, is_mutable_property, type_check
 
-__all__ = ['UNSPECIFIED', 'InputPort', 'OutputPort', 'Port', 'PortNamespace', 'PortValidationError']
+__all__ = [
+    'UNSPECIFIED',
+    'CombinedPortValidationError',
+    'InputPort',
+    'OutputPort',
+    'Port',
+    'PortNamespace',
+    'PortValidationError',
+    'ValidationCache',
+]
 
 _LOGGER = logging.getLogger(__name__)
 UNSPECIFIED = ()
@@ -23,6 +51,14 @@ VALIDATOR_SIGNATURE_DEPRECATION_WARNING = """the validator `{}` has a signature
 VALIDATOR_TYPE = Callable[[Any, 'Port'], Optional[str]]
 
 
+def is_async_validator(validator: Optional[VALIDATOR_TYPE]) -> bool:
+    """Return whether the validator is a coroutine function, whose result has to be awaited.
+
+    :param validator: the validator of a port
+    """
+    return validator is not None and inspect.iscoroutinefunction(validator)
+
+
 class PortValidationError(Exception):
     """Error when validation fails on a port"""
 
@@ -57,12 +93,41 @@ class PortValidationError(Exception):
         return self._port
 
 
+class CombinedPortValidationError(PortValidationError):
+    """Errors when validation fails on multiple ports"""
+
+    def __init__(self, errors: Sequence[PortValidationError]) -> None:
+        """
+        :param errors: the validation errors, of which there should be at least one
+
+        """
+        if not errors:
+            raise ValueError('at least one validation error is required')
+
+        message = '\n'.join(str(error) for error in errors)
+        super().__init__(message, errors[0].port)
+        self._errors = list(errors)
+
+    @property
+    def errors(self) -> List[PortValidationError]:
+        """
+        Get the validation errors
+
+        :return: the list of validation errors
+
+        """
+        return self._errors
+
+
 class Port:
     """
     Specifications relating to a general input/output value including
     properties like whether it is required, valid types, the help string, etc.
     """
 
+    # The last validator that was called and whether it takes the port as second argument
+    _validator_signature: Optional[Tuple[VALIDATOR_TYPE, bool]] = None
+
     def __init__(
         self,
         name: str,
@@ -186,22 +251,10 @@ class Port:
         :param breadcrumbs: a tuple of the path to having reached this point in validation
 
         """
-        validation_error = None
-
-        if value is UNSPECIFIED and self._required:
-            validation_error = f"required value was not provided for '{self.name}'"
-        elif value is not UNSPECIFIED and self._valid_type is not None and not isinstance(value, self._valid_type):
-            validation_error = (
-                f"value '{self.name}' is not of the right type. Got '{type(value)}', expected '{self._valid_type}'"
-            )
+        validation_error = self._validate_required_and_type(value)
 
         if not validation_error and self.validator is not None and value is not UNSPECIFIED:
-            spec = inspect.getfullargspec(self.validator)
-            if len(spec[0]) == 1:
-                warnings.warn(VALIDATOR_SIGNATURE_DEPRECATION_WARNING.format(self.validator.__name__))
-                result = self.validator(value)  # type: ignore
-            else:
-                result = self.validator(value, self)
+            result = self._call_validator_sync(self.validator, value)
             if result is not None:
                 assert isinstance(result, str), 'Validator returned non string type'
                 validation_error = result
@@ -212,6 +265,100 @@ class Port:
 
         return None
 
+    async def async_validate(self, value: Any, breadcrumbs: Sequence[str] = ()) -> Optional[PortValidationError]:
+        """Validate a value to see if it is valid for this port, awaiting the validator if it is a coroutine function
+
+        :param value: the value to check
+        :param breadcrumbs: a tuple of the path to having reached this point in validation
+        """
+        return await self._async_validate(value, breadcrumbs, None)
+
+    async def _async_validate(
+        self, value: Any, breadcrumbs: Sequence[str], semaphore: Optional[asyncio.Semaphore]
+    ) -> Optional[PortValidationError]:
+        """Implementation of :meth:`async_validate`.
+
+        :param semaphore: optional semaphore that limits the number of validators that are awaited concurrently
+        """
+        validator = self.validator
+
+        # Subclasses that customise the validation are validated synchronously, like ports without async validator
+        if type(self).validate is not Port.validate or not is_async_validator(validator):
+            return self.validate(value, breadcrumbs)
+
+        assert validator is not None
+        validation_error = self._validate_required_and_type(value)
+
+        if not validation_error and value is not UNSPECIFIED:
+            if semaphore is None:
+                result = await self.call_validator(validator, value)  # type: ignore[misc]
+            else:
+                async with semaphore:
+                    result = await self.call_validator(validator, value)  # type: ignore[misc]
+            if result is not None:
+                assert isinstance(result, str), 'Validator returned non string type'
+                validation_error = result
+
+        if validation_error is not None:
+            return PortValidationError(validation_error, breadcrumbs_to_port((*breadcrumbs, self.name)))
+
+        return None
+
+    def _validate_required_and_type(self, value: Any) -> Optional[str]:
+        """Return the validation error message if the value is required but missing or of the wrong type."""
+        if value is UNSPECIFIED and self._required:
+            return f"required value was not provided for '{self.name}'"
+
+        if value is not UNSPECIFIED and self._valid_type is not None and not isinstance(value, self._valid_type):
+            return f"value '{self.name}' is not of the right type. Got '{type(value)}', expected '{self._valid_type}'"
+
+        return None
+
+    def call_validator(self, validator: VALIDATOR_TYPE, value: Any) -> Optional[str]:
+        """Call the validator with the given value, and this port if the signature of the validator accepts it.
+
+        The signature of the validator is only inspected the first time it is called.
+
+        :param validator: the validator of this port
+        :param value: the value to validate
+        :return: the return value of the validator
+        """
+        signature = self._validator_signature
+        if signature is None or signature[0] != validator:
+            signature = self._validator_signature = (validator, len(inspect.getfullargspec(validator)[0]) != 1)
+
+        if not signature[1]:
+            warnings.warn(VALIDATOR_SIGNATURE_DEPRECATION_WARNING.format(validator.__name__))
+            return validator(value)  # type: ignore
+
+        return validator(value, self)
+
+    def _call_validator_sync(self, validator: VALIDATOR_TYPE, value: Any) -> Optional[str]:
+        """Call the validator like :meth:`call_validator`, running it to completion if it is a coroutine function.
+
+        A coroutine is run on the current event loop, which therefore cannot be running, as that would block it or fail.
+        Coroutines running on the loop should use :meth:`async_validate` instead.
+
+        :param validator: the validator of this port
+        :param value: the value to validate
+        :return: the return value of the validator
+        :raises RuntimeError: if the validator is a coroutine function and the event loop is running
+        """
+        result = self.call_validator(validator, value)
+
+        if inspect.isawaitable(result):
+            loop = asyncio.get_event_loop()
+            if loop.is_running():
+                if inspect.iscoroutine(result):
+                    result.close()
+                raise RuntimeError(
+                    f'the async validator of port `{self.name}` cannot be run to completion while the event loop is '
+                    'running, use `async_validate` instead'
+                )
+            result = loop.run_until_complete(result)
+
+        return result
+
 
 class InputPort(Port):
     """
@@ -300,6 +447,9 @@ class PortNamespace(collections.abc.MutableMapping, Port):
     """
 
     NAMESPACE_SEPARATOR = '.'
+    # The number of times a port was added to or removed from any port namespace, or a namespace became dynamic or
+    # stopped being dynamic, such that caches of the namespaces of a specification can tell whether they are stale
+    modifications: int = 0
 
     def __init__(
         self,
@@ -329,6 +479,8 @@ class PortNamespace(collections.abc.MutableMapping, Port):
         """
         super().__init__(name=name, help=help, required=required, validator=validator, valid_type=valid_type)
         self._ports: Dict[str, Union[Port, 'PortNamespace']] = {}
+        # Names of the ports that are shared with another namespace through `absorb` and are copied on first access
+        self._shared_ports: Set[str] = set()
         self.default = default
         self.populate_defaults = populate_defaults
         self.valid_type = valid_type
@@ -346,21 +498,65 @@ class PortNamespace(collections.abc.MutableMapping, Port):
     def __len__(self) -> int:
         return len(self._ports)
 
+    def __contains__(self, key: object) -> bool:
+        return key in self._ports
+
+    def keys(self) -> KeysView[str]:
+        return self._ports.keys()
+
+    def items(self) -> ItemsView[str, Any]:
+        """Return a view of the names and ports of this namespace.
+
+        Unlike :meth:`__getitem__`, this does not copy ports that are shared with another namespace, so the ports should
+        only be read. Retrieve a port through :meth:`__getitem__` or :meth:`get_port` to modify it.
+        """
+        return self._ports.items()
+
+    def values(self) -> ValuesView[Any]:
+        """Return a view of the ports of this namespace.
+
+        Unlike :meth:`__getitem__`, this does not copy ports that are shared with another namespace, so the ports should
+        only be read. Retrieve a port through :meth:`__getitem__` or :meth:`get_port` to modify it.
+        """
+        return self._ports.values()
+
     def __delitem__(self, key: str) -> None:
         del self._ports[key]
+        self._shared_ports.discard(key)
+        PortNamespace.modifications += 1
 
     def __getitem__(self, key: str) -> Union[Port, 'PortNamespace']:
+        if key in self._shared_ports:
+            return self._copy_shared_port(key)
         return self._ports[key]
 
     def __setitem__(self, key: str, port: Union[Port, 'PortNamespace']) -> None:
         if not isinstance(port, Port):
             raise TypeError('port needs to be an instance of Port')
         self._ports[key] = port
+        self._shared_ports.discard(key)
+        PortNamespace.modifications += 1
 
     @property
     def ports(self) -> Dict[str, Union[Port, 'PortNamespace']]:
+        for key in list(self._shared_ports):
+            self._copy_shared_port(key)
         return self._ports
 
+    def _copy_shared_port(self, key: str) -> Union[Port, 'PortNamespace']:
+        """Replace a port that is shared with another namespace by a copy that is owned by this namespace.
+
+        Ports are shared by :meth:`absorb` and only copied once they are accessed through the public interface, since
+        that is the only way in which they can be modified.
+
+        :param key: the name of the shared port
+        :return: the copy of the port
+        """
+        port = copy.deepcopy(self._ports[key])
+        self._ports[key] = port
+        self._shared_ports.discard(key)
+        return port
+
     def has_default(self) -> bool:
         return self._default is not UNSPECIFIED
 
@@ -378,6 +574,9 @@ class PortNamespace(collections.abc.MutableMapping, Port):
 
     @dynamic.setter
     def dynamic(self, dynamic: bool) -> None:
+        # The property is not yet set while the namespace is being constructed
+        if dynamic != getattr(self, '_dynamic', dynamic):
+            PortNamespace.modifications += 1
         self._dynamic = dynamic
 
     @property
@@ -435,7 +634,8 @@ class PortNamespace(collections.abc.MutableMapping, Port):
 
         :param name: name (potentially namespaced) of the port to retrieve.
         :param create_dynamically: If set to ``True``, dynamically create the requested port if it doesn't exist and the
-            namespace is dynamic, instead of raising a ``ValueError``.
+            namespace is dynamic, instead of raising a ``ValueError``. The created port namespace is added to its
+            parent namespace, use :meth:`dynamic_namespace` for one that is not.
         :returns: Port
         :raises: ValueError if port or namespace does not exist
         """
@@ -445,30 +645,42 @@ class PortNamespace(collections.abc.MutableMapping, Port):
         if not name:
             raise ValueError('name cannot be an empty string')
 
-        namespace = name.split(self.NAMESPACE_SEPARATOR)
-        port_name = namespace.pop(0)
+        port: Union[Port, PortNamespace] = self
 
-        if port_name not in self:
-            if not self.dynamic or not create_dynamically:
-                raise ValueError(f"port '{port_name}' does not exist in port namespace '{self.name}'")
-
-            self[port_name] = self.__class__(
-                name=port_name,
-                required=self.required,
-                validator=self.validator,
-                valid_type=self.valid_type,
-                default=self.default,
-                dynamic=self.dynamic,
-                populate_defaults=self.populate_defaults,
-            )
+        for port_name in name.split(self.NAMESPACE_SEPARATOR):
+            if not isinstance(port, PortNamespace):
+                raise ValueError(f"port '{port.name}' is not a port namespace and so has no port '{port_name}'")
 
-        if namespace:
-            portnamespace = cast(PortNamespace, self[port_name])
-            return portnamespace.get_port(
-                self.NAMESPACE_SEPARATOR.join(namespace), create_dynamically=create_dynamically
-            )
+            port_namespace = port
+            try:
+                port = port_namespace[port_name]
+            except KeyError:
+                if not port_namespace.dynamic or not create_dynamically:
+                    raise ValueError(f"port '{port_name}' does not exist in port namespace '{port_namespace.name}'")
+                port = port_namespace[port_name] = port_namespace.dynamic_namespace(port_name)
+
+        return port
 
-        return self[port_name]
+    def dynamic_namespace(self, name: str) -> 'PortNamespace':
+        """Return a port namespace for values under a name that is not a port of this dynamic namespace.
+
+        The returned namespace has the same properties as this namespace and so validates the nested values against
+        them, but contrary to :meth:`get_port` with ``create_dynamically=True`` it is not added to this namespace. This
+        way, a specification that is shared by all instances of a process class does not grow with every distinct
+        dynamic namespace that the processes use.
+
+        :param name: the name of the dynamic namespace
+        :return: the PortNamespace
+        """
+        return self.__class__(
+            name=name,
+            required=self.required,
+            validator=self.validator,
+            valid_type=self.valid_type,
+            default=self.default,
+            dynamic=self.dynamic,
+            populate_defaults=self.populate_defaults,
+        )
 
     def create_port_namespace(self, name: str, **kwargs: Any) -> 'PortNamespace':
         """
@@ -490,7 +702,7 @@ class PortNamespace(collections.abc.MutableMapping, Port):
         namespace = name.split(self.NAMESPACE_SEPARATOR)
         port_name = namespace.pop(0)
 
-        if port_name in self and not isinstance(self[port_name], PortNamespace):
+        if port_name in self and not isinstance(self._ports[port_name], PortNamespace):
             raise ValueError(f"the name '{port_name}' in '{self.name}' already contains a Port")
 
         # If this is True, the (sub) port namespace does not yet exist, so we create it
@@ -546,9 +758,8 @@ class PortNamespace(collections.abc.MutableMapping, Port):
             namespace_options = {}
 
         # Overload mutable attributes of PortNamespace unless overridden by value in namespace_options
-        for attr in dir(port_namespace):
-            if is_mutable_property(PortNamespace, attr):
-                setattr(self, attr, namespace_options.pop(attr, getattr(port_namespace, attr)))
+        for attr in _get_mutable_properties(type(port_namespace)):
+            setattr(self, attr, namespace_options.pop(attr, getattr(port_namespace, attr)))
 
         if namespace_options:
             raise ValueError(
@@ -557,7 +768,7 @@ class PortNamespace(collections.abc.MutableMapping, Port):
 
         absorbed_ports = []
 
-        for port_name, port in port_namespace.items():
+        for port_name, port in port_namespace._ports.items():
             # If the current port name occurs in the exclude list, simply skip it entirely, there is no need to consider
             # any of the nested ports it might have, even if it is a port namespace
             if exclude and port_name in exclude:
@@ -575,16 +786,20 @@ class PortNamespace(collections.abc.MutableMapping, Port):
                 # Create a new namespace at `port_name` and copy the original port namespace itself such that we keep
                 # all its mutable properties, but reset its ports, since those will be taken care of by the recursive
                 # absorb call that will properly consider the include and exclude rules
-                self[port_name] = copy.copy(port)
-                portnamespace = cast(PortNamespace, self[port_name])
+                portnamespace = copy.copy(port)
                 portnamespace._ports = {}
+                portnamespace._shared_ports = set()
                 portnamespace.absorb(port, sub_exclude, sub_include)
+                self[port_name] = portnamespace
             else:
                 # If include rules are specified but the port name does not appear, simply skip it
                 if include and port_name not in include:
                     continue
 
-                self[port_name] = copy.deepcopy(port)
+                # Rather than copying the port, share it with the source namespace until either of them accesses it
+                self[port_name] = port
+                self._shared_ports.add(port_name)
+                port_namespace._shared_ports.add(port_name)
 
             absorbed_ports.append(port_name)
 
@@ -602,7 +817,7 @@ class PortNamespace(collections.abc.MutableMapping, Port):
         result: MutableMapping[str, Any] = {}
 
         for name, value in port_values.items():
-            if name in self.ports:
+            if name in self._ports:
                 if isinstance(value, PortNamespace):
                     port = self[name]
                     assert isinstance(port, PortNamespace)
@@ -633,36 +848,26 @@ class PortNamespace(collections.abc.MutableMapping, Port):
             message = f'specified value is of type {type(port_values)} which is not sub class of `Mapping`'
             return PortValidationError(message, breadcrumbs_to_port(breadcrumbs_local))
 
-        # Turn the port values into a normal dictionary and create a shallow copy. The `validate_ports` method to which
-        # the `port_values` will be passed, will pop the values corresponding to explicit ports. This is necessary for
-        # the `validate_dynamic_ports` to correctly detect any implicit ports. However, the `validator` will expect the
-        # entire original input namespace to be there. Since the latter has to be called after the ports have been
-        # validated, we need to create a clone of the port values here.
-        port_values = dict(port_values)
-        port_values_clone = port_values.copy()
-
         # If the namespace is not required and there are no port_values specified, consider it valid
         if not port_values and not self.required:
             return None
 
-        # In all other cases, validate all input ports explicitly specified in this port namespace
-        validation_error = self.validate_ports(port_values, breadcrumbs_local)
-        if validation_error:
-            return validation_error
+        if type(self).validate_ports is PortNamespace.validate_ports:
+            validation_error = self._validate_ports_and_dynamic_ports(port_values, breadcrumbs)
+        else:
+            # A subclass customised the validation of the explicit ports, so keep calling it with a copy of the port
+            # values from which it pops the values of the explicit ports, which leaves the values of the dynamic ports
+            remaining_port_values = dict(port_values)
+            validation_error = self.validate_ports(remaining_port_values, breadcrumbs_local)
+            if not validation_error:
+                validation_error = self.validate_dynamic_ports(remaining_port_values, breadcrumbs)
 
-        # If any port_values remain, validate against the dynamic properties of the namespace
-        validation_error = self.validate_dynamic_ports(port_values, breadcrumbs)
         if validation_error:
             return validation_error
 
         # Validate the validator after the ports themselves, as it most likely will rely on the port values
         if self.validator is not None:
-            spec = inspect.getfullargspec(self.validator)
-            if len(spec[0]) == 1:
-                warnings.warn(VALIDATOR_SIGNATURE_DEPRECATION_WARNING.format(self.validator.__name__))
-                message = self.validator(port_values_clone)  # type: ignore
-            else:
-                message = self.validator(port_values_clone, self)
+            message = self._call_validator_sync(self.validator, dict(port_values))
             if message is not None:
                 assert isinstance(
                     message, str
@@ -671,6 +876,300 @@ class PortNamespace(collections.abc.MutableMapping, Port):
 
         return None
 
+    def _validate_ports_and_dynamic_ports(
+        self, port_values: Mapping[str, Any], breadcrumbs: Sequence[str]
+    ) -> Optional[PortValidationError]:
+        """Validate the explicit ports and then any remaining values against the dynamic properties of the namespace.
+
+        This is equivalent to calling :meth:`validate_ports` followed by :meth:`validate_dynamic_ports` but does not
+        need a copy of the port values: the values of the dynamic ports are only collected if there are any.
+
+        :param port_values: an arbitrarily nested dictionary of parsed port values
+        :param breadcrumbs: a tuple of the path to having reached this namespace in validation
+        """
+        breadcrumbs_local = (*breadcrumbs, self.name)
+        num_matched = 0
+
+        for name, port in self._ports.items():
+            try:
+                value = port_values[name]
+            except KeyError:
+                value = UNSPECIFIED
+            else:
+                num_matched += 1
+
+            validation_error = port.validate(value, breadcrumbs_local)
+            if validation_error:
+                return validation_error
+
+        if (
+            len(port_values) == num_matched
+            and type(self).validate_dynamic_ports is PortNamespace.validate_dynamic_ports
+        ):
+            return None
+
+        dynamic_port_values = {key: value for key, value in port_values.items() if key not in self._ports}
+        return self.validate_dynamic_ports(dynamic_port_values, breadcrumbs)
+
+    def has_async_validators(self) -> bool:
+        """Return whether this namespace or any of its ports, recursively, has a validator that is a coroutine function.
+
+        :return: True if :meth:`async_validate` can validate the port values concurrently, False otherwise
+        """
+        if is_async_validator(self.validator):
+            return True
+
+        for port in self._ports.values():
+            if isinstance(port, PortNamespace):
+                if port.has_async_validators():
+                    return True
+            elif is_async_validator(port.validator):
+                return True
+
+        return False
+
+    async def async_validate(
+        self,
+        port_values: Optional[Mapping[str, Any]] = None,
+        breadcrumbs: Sequence[str] = (),
+        max_concurrency: Optional[int] = None,
+    ) -> Optional[PortValidationError]:
+        """Validate the namespace port itself and subsequently all the port_values it contains, like :meth:`validate`.
+
+        The validators of the ports, which may be coroutine functions, are independent of each other and so the
+        validators of the ports of this namespace and its sub namespaces are awaited concurrently. The validator of a
+        namespace is only called once its ports have been validated successfully. If multiple ports are invalid, the
+        error of the first of them is returned, like :meth:`validate` does.
+
+        :param port_values: an arbitrarily nested dictionary of parsed port values
+        :param breadcrumbs: a tuple of the path to having reached this point in validation
+        :param max_concurrency: the maximum number of validators that are awaited concurrently, unlimited if None
+        :return: None or the validation error
+        """
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+        return await self._async_validate(port_values, breadcrumbs, semaphore)
+
+    async def _async_validate(
+        self, port_values: Any, breadcrumbs: Sequence[str], semaphore: Optional[asyncio.Semaphore]
+    ) -> Optional[PortValidationError]:
+        """Implementation of :meth:`async_validate`."""
+        breadcrumbs_local = (*breadcrumbs, self.name)
+        message: Optional[str]
+        cls = type(self)
+
+        # A subclass that customises the validation is validated synchronously, as is a namespace without async
+        # validators, for which there is nothing to be gained
+        if (
+            cls.validate is not PortNamespace.validate
+            or cls.validate_ports is not PortNamespace.validate_ports
+            or not self.has_async_validators()
+        ):
+            return self.validate(port_values, breadcrumbs)
+
+        if not port_values:
+            port_values = {}
+
+        if not isinstance(port_values, collections.abc.Mapping):
+            message = f'specified value is of type {type(port_values)} which is not sub class of `Mapping`'
+            return PortValidationError(message, breadcrumbs_to_port(breadcrumbs_local))
+
+        if not port_values and not self.required:
+            return None
+
+        results = await asyncio.gather(
+            *(
+                port._async_validate(port_values.get(name, UNSPECIFIED), breadcrumbs_local, semaphore)
+                for name, port in self._ports.items()
+            )
+        )
+
+        for validation_error in results:
+            if validation_error:
+                return validation_error
+
+        dynamic_port_values = {key: value for key, value in port_values.items() if key not in self._ports}
+        validation_error = self.validate_dynamic_ports(dynamic_port_values, breadcrumbs)
+        if validation_error:
+            return validation_error
+
+        validator = self.validator
+        if validator is None:
+            return None
+
+        if not is_async_validator(validator):
+            message = self.call_validator(validator, dict(port_values))
+        elif semaphore is None:
+            message = await self.call_validator(validator, dict(port_values))  # type: ignore[misc]
+        else:
+            async with semaphore:
+                message = await self.call_validator(validator, dict(port_values))  # type: ignore[misc]
+
+        if message is not None:
+            assert isinstance(message, str), f"Validator returned something other than None or str: '{type(message)}'"
+            return PortValidationError(message, breadcrumbs_to_port(breadcrumbs_local))
+
+        return None
+
+    def parse_inputs(
+        self,
+        port_values: Optional[Mapping[str, Any]] = None,
+        breadcrumbs: Sequence[str] = (),
+        cache: Optional['ValidationCache'] = None,
+    ) -> Tuple[AttributesFrozendict, Optional[PortValidationError]]:
+        """Fill in the defaults, validate and freeze the port values in a single traversal.
+
+        This is equivalent to calling :meth:`pre_process` followed by :meth:`validate`, except that the port values
+        are not modified: each namespace is copied once, into the mapping that is returned. Parsing stops at the first
+        validation error, in which case the returned mapping is incomplete.
+
+        :param port_values: an arbitrarily nested dictionary of port values
+        :param breadcrumbs: a tuple of the path to having reached this point in validation
+        :param cache: optional cache in which the successfully parsed values of this namespace and its sub namespaces
+            are memoized, see :class:`ValidationCache`
+        :return: tuple of the pre-processed port values and the validation error, or None if they are valid
+        """
+        return self._parse_inputs(port_values, breadcrumbs, cache, {} if cache is not None else None)
+
+    def _parse_inputs(
+        self,
+        port_values: Optional[Mapping[str, Any]],
+        breadcrumbs: Sequence[str],
+        cache: Optional['ValidationCache'],
+        fingerprints: Optional[Dict[int, Any]],
+    ) -> Tuple[AttributesFrozendict, Optional[PortValidationError]]:
+        """Implementation of :meth:`parse_inputs`.
+
+        :param fingerprints: the fingerprints of the mappings computed so far by the cache, keyed on their identity, so
+            the fingerprint of each nested mapping is only computed once
+        """
+        if cache is not None:
+            assert fingerprints is not None
+            key = cache.get_key(self, port_values, fingerprints)
+            if key is not None:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached, None
+
+                parsed, validation_error = self._parse_namespace_inputs(port_values, breadcrumbs, cache, fingerprints)
+                if validation_error is None:
+                    cache.put(key, parsed)
+                return parsed, validation_error
+
+        return self._parse_namespace_inputs(port_values, breadcrumbs, cache, fingerprints)
+
+    def _parse_namespace_inputs(
+        self,
+        port_values: Optional[Mapping[str, Any]],
+        breadcrumbs: Sequence[str],
+        cache: Optional['ValidationCache'],
+        fingerprints: Optional[Dict[int, Any]],
+    ) -> Tuple[AttributesFrozendict, Optional[PortValidationError]]:
+        """Parse the port values of this namespace, passing the cache on to the sub namespaces."""
+        breadcrumbs_local = (*breadcrumbs, self.name)
+
+        if not port_values:
+            port_values = {}
+
+        if not isinstance(port_values, collections.abc.Mapping):
+            message = f'specified value is of type {type(port_values)} which is not sub class of `Mapping`'
+            return AttributesFrozendict(), PortValidationError(message, breadcrumbs_to_port(breadcrumbs_local))
+
+        cls = type(self)
+        if (
+            cls.pre_process is not PortNamespace.pre_process
+            or cls.validate is not PortNamespace.validate
+            or cls.validate_ports is not PortNamespace.validate_ports
+        ):
+            # A subclass customised one of the two phases, so run them separately. Since ``pre_process`` modifies its
+            # argument, it gets a copy of the nested dictionaries, but not of the values themselves.
+            parsed = self.pre_process(copy_nested_dicts(port_values))
+            return parsed, self.validate(parsed, breadcrumbs)
+
+        # The values of sub namespaces are copied when they are parsed. The nested dictionaries of all other values,
+        # e.g. of dynamic namespaces, are copied here, such that the parsed values do not share them with the argument.
+        values = {
+            key: copy_nested_dicts(value)
+            if isinstance(value, dict) and not isinstance(self._ports.get(key), PortNamespace)
+            else value
+            for key, value in port_values.items()
+        }
+        num_explicit = 0
+
+        # If the namespace is not required and no values are specified or filled in as defaults, consider it valid
+        if not values and not self.required and not any(self._has_port_default(port) for port in self._ports.values()):
+            return AttributesFrozendict._wrap(values), None
+
+        for name, port in self._ports.items():
+            # Checked once per port, since ``PortNamespace`` is an abstract base class which makes the check expensive
+            is_namespace = isinstance(port, PortNamespace)
+
+            if name in values:
+                value = values[name]
+                num_explicit += 1
+            elif is_namespace:
+                value = self._get_port_default(port)
+            elif port.has_default():  # type: ignore[union-attr]
+                default = port.default  # type: ignore[union-attr]
+                value = default() if callable(default) else default
+            else:
+                value = UNSPECIFIED
+
+            if value is not UNSPECIFIED and is_namespace:
+                value, validation_error = port._parse_inputs(value, breadcrumbs_local, cache, fingerprints)  # type: ignore[union-attr]
+            else:
+                validation_error = port.validate(value, breadcrumbs_local)
+
+            if value is not UNSPECIFIED:
+                values[name] = value
+
+            if validation_error:
+                return AttributesFrozendict._wrap(values), validation_error
+
+        if len(port_values) > num_explicit:
+            # Collect the values that do not correspond to an explicit port, which were all passed in ``port_values``
+            dynamic_port_values = {key: value for key, value in port_values.items() if key not in self._ports}
+            validation_error = self.validate_dynamic_ports(dynamic_port_values, breadcrumbs)
+        elif cls.validate_dynamic_ports is not PortNamespace.validate_dynamic_ports:
+            validation_error = self.validate_dynamic_ports({}, breadcrumbs)
+        else:
+            validation_error = None
+
+        if validation_error:
+            return AttributesFrozendict._wrap(values), validation_error
+
+        # Validate the validator after the ports themselves, as it most likely will rely on the port values
+        if self.validator is not None:
+            message = self._call_validator_sync(self.validator, dict(values))
+            if message is not None:
+                assert isinstance(
+                    message, str
+                ), f"Validator returned something other than None or str: '{type(message)}'"
+                validation_error = PortValidationError(message, breadcrumbs_to_port(breadcrumbs_local))
+
+        return AttributesFrozendict._wrap(values), validation_error
+
+    @staticmethod
+    def _has_port_default(port: Port) -> bool:
+        """Return whether :meth:`pre_process` fills in a value for the port if no value is specified for it."""
+        # A namespace with ``populate_defaults=False`` is skipped entirely if no value is specified for it
+        if isinstance(port, PortNamespace):
+            return port.populate_defaults and (port.has_default() or bool(port._ports))
+
+        return port.has_default()  # type: ignore[attr-defined]
+
+    @classmethod
+    def _get_port_default(cls, port: Port) -> Any:
+        """Return the value :meth:`pre_process` fills in for the port if no value is specified, or ``UNSPECIFIED``."""
+        if not cls._has_port_default(port):
+            return UNSPECIFIED
+
+        if port.has_default():  # type: ignore[attr-defined]
+            default = port.default  # type: ignore[attr-defined]
+            return default() if callable(default) else default
+
+        # A namespace containing ports gets an empty dictionary so its ports can be considered recursively
+        return {}
+
     def pre_process(self, port_values: MutableMapping[str, Any]) -> AttributesFrozendict:
         """Map port values onto the port namespace, filling in values for ports with a default.
 
@@ -692,7 +1191,7 @@ class PortNamespace(collections.abc.MutableMapping, Port):
                         port_value = default
 
                 # If a namespace containing ports, create an empty dictionary so its ports can be considered recursively
-                elif isinstance(port, PortNamespace) and port.ports:
+                elif isinstance(port, PortNamespace) and port._ports:
                     port_value = {}
                 else:
                     continue
@@ -726,17 +1225,22 @@ class PortNamespace(collections.abc.MutableMapping, Port):
         return None
 
     def validate_dynamic_ports(
-        self, port_values: MutableMapping[str, Any], breadcrumbs: Sequence[str] = ()
+        self, port_values: MutableMapping[str, Any], breadcrumbs: Sequence[str] = (), collect_all: bool = False
     ) -> Optional[PortValidationError]:
         """
         Validate port values with respect to the dynamic properties of the port namespace. It will
         check if the namespace is actually dynamic and if all values adhere to the valid types of
         the namespace if those are specified
 
+        Nested dictionaries are validated iteratively, so arbitrarily deep nesting does not hit the recursion limit,
+        and the breadcrumbs of a value are only constructed if it is invalid.
+
         :param port_values: an arbitrarily nested dictionary of parsed port values
         :type port_values: dict
         :param breadcrumbs: a tuple of the path to having reached this point in validation
         :type breadcrumbs: typing.Tuple[str]
+        :param collect_all: if True, validate all values and return the errors of all invalid values as a
+            :class:`CombinedPortValidationError`, instead of returning the error of the first invalid value
         :return: if invalid returns a string with the reason for the validation failure, otherwise None
         :rtype: typing.Optional[str]
         """
@@ -744,20 +1248,57 @@ class PortNamespace(collections.abc.MutableMapping, Port):
             msg = f'Unexpected ports {port_values}, for a non dynamic namespace'
             return PortValidationError(msg, breadcrumbs_to_port((*breadcrumbs, self.name)))
 
-        if self.valid_type is None:
+        valid_type = self.valid_type
+
+        if valid_type is None:
             return None
 
-        if isinstance(port_values, dict):
-            for key, value in port_values.items():
-                result = self.validate_dynamic_ports(value, (*breadcrumbs, self.name, key))
-                if result is not None:
-                    return result
-        elif not isinstance(port_values, self.valid_type):
-            msg = f'Invalid type {type(port_values)} for dynamic port value: expected {self.valid_type}'
-            return PortValidationError(msg, breadcrumbs_to_port(breadcrumbs))
+        if not isinstance(port_values, dict):
+            if isinstance(port_values, valid_type):
+                return None
+            return self._dynamic_port_error(port_values, breadcrumbs)
+
+        errors = []
+
+        # Depth first traversal, where each entry holds the iterator over the items of a nested dictionary and the path
+        # to it, as a linked list of ``(parent, key)`` tuples that is only converted into breadcrumbs for errors
+        stack: List[Tuple[Iterator[Tuple[str, Any]], Any]] = [(iter(port_values.items()), None)]
+
+        while stack:
+            items, path = stack[-1]
+
+            for key, value in items:
+                if isinstance(value, dict):
+                    stack.append((iter(value.items()), (path, key)))
+                    break
+
+                if not isinstance(value, valid_type):
+                    error = self._dynamic_port_error(value, self._path_to_breadcrumbs(breadcrumbs, (path, key)))
+                    if not collect_all:
+                        return error
+                    errors.append(error)
+            else:
+                stack.pop()
+
+        if errors:
+            return CombinedPortValidationError(errors)
 
         return None
 
+    def _path_to_breadcrumbs(self, breadcrumbs: Sequence[str], path: Any) -> Tuple[str, ...]:
+        """Convert the linked list of ``(parent, key)`` tuples of a dynamic value into its breadcrumbs."""
+        keys = []
+        while path is not None:
+            path, key = path
+            keys.append(key)
+
+        return (*breadcrumbs, self.name, *reversed(keys))
+
+    def _dynamic_port_error(self, value: Any, breadcrumbs: Sequence[str]) -> PortValidationError:
+        """Return the validation error for a dynamic value that is not of the valid type of this namespace."""
+        msg = f'Invalid type {type(value)} for dynamic port value: expected {self.valid_type}'
+        return PortValidationError(msg, breadcrumbs_to_port(breadcrumbs))
+
     @staticmethod
     def strip_namespace(namespace: str, separator: str, rules: Optional[Sequence[str]] = None) -> Optional[List[str]]:
         """Filter given exclude/include rules staring with namespace and strip the first level.
@@ -791,6 +1332,231 @@ class PortNamespace(collections.abc.MutableMapping, Port):
         return stripped
 
 
+class _Identity:
+    """Hashable reference to an object that compares by identity, keeping the object alive while it is referenced."""
+
+    __slots__ = ('obj',)
+
+    def __init__(self, obj: Any) -> None:
+        self.obj = obj
+
+    def __hash__(self) -> int:
+        return id(self.obj)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _Identity) and other.obj is self.obj
+
+
+class ValidationCache:
+    """Bounded cache of the successfully parsed port values of port namespaces.
+
+    The cache maps a port namespace and a structural fingerprint of the port values passed to it onto the result of
+    :meth:`PortNamespace.parse_inputs`. The fingerprint of a mapping is built from the fingerprints of its values:
+    values of an immutable builtin type are fingerprinted by value and instances of the types registered through
+    :meth:`register_identity_type` by identity. Port values containing anything else cannot be fingerprinted, in which
+    case the namespace is parsed as usual. Since each sub namespace is memoized separately, a sub tree that is shared by
+    different port values is only validated once.
+
+    Only successful results are cached and the cache assumes that the validators are pure functions of the port values.
+    The parsed port values of a namespace are frozen, but the values of dynamic ports can contain plain dictionaries,
+    which are copied on every hit, such that the processes that get the same cached result do not share them.
+    Namespaces whose ports have a callable default are never cached, because the default should be evaluated anew for
+    each parse. The cache has to be invalidated explicitly through :meth:`clear` when the ports are modified, which the
+    :class:`~plumpy.process_spec.ProcessSpec` does automatically for the ports it creates.
+    """
+
+    _IMMUTABLE_TYPES = frozenset((type(None), bool, int, float, complex, str, bytes))
+
+    identity_types: Tuple[type, ...] = ()
+
+    @classmethod
+    def register_identity_type(cls, identity_type: type) -> None:
+        """Register a type whose instances are fingerprinted by identity.
+
+        This should only be used for types whose instances are not modified in a way that affects validation, e.g.
+        references to stored data.
+
+        :param identity_type: the type to register
+        """
+        if identity_type not in cls.identity_types:
+            cls.identity_types = (*cls.identity_types, identity_type)
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """
+        :param maxsize: the maximum number of parsed namespaces to keep, the least recently used are discarded first
+        """
+        if maxsize < 1:
+            raise ValueError(f'maxsize should be positive, got: {maxsize}')
+
+        self._maxsize = maxsize
+        # The parsed port values and whether they contain mutable dictionaries that have to be copied on a hit
+        self._entries: collections.OrderedDict[Any, Tuple[AttributesFrozendict, bool]] = collections.OrderedDict()
+        self._cacheable: Dict[int, bool] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def clear(self) -> None:
+        """Invalidate all cached results."""
+        self._entries.clear()
+        self._cacheable.clear()
+
+    def get(self, key: Any) -> Optional[AttributesFrozendict]:
+        """Return the parsed port values cached for the key, or None if there are none."""
+        try:
+            parsed, mutable = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return _copy_parsed_dicts(parsed) if mutable else parsed
+
+    def put(self, key: Any, parsed: AttributesFrozendict) -> None:
+        """Cache the parsed port values for the key, discarding the least recently used entry if the cache is full."""
+        self._entries[key] = (parsed, _contains_dicts(parsed))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def get_key(self, namespace: PortNamespace, port_values: Any, fingerprints: Dict[int, Any]) -> Optional[Any]:
+        """Return the cache key of parsing the port values with the namespace, or None if it cannot be cached.
+
+        :param namespace: the port namespace that parses the port values
+        :param port_values: the port values
+        :param fingerprints: the fingerprints of mappings computed so far, keyed on their identity
+        """
+        if not self._is_cacheable(namespace):
+            return None
+
+        fingerprint = self.fingerprint(port_values, fingerprints)
+        if fingerprint is None:
+            return None
+
+        return _Identity(namespace), fingerprint
+
+    def fingerprint(self, value: Any, fingerprints: Optional[Dict[int, Any]] = None) -> Optional[Any]:
+        """Return a hashable structural fingerprint of the value, or None if it cannot be fingerprinted.
+
+        :param value: the value to fingerprint
+        :param fingerprints: the fingerprints of mappings computed so far, keyed on their identity. The mappings should
+            not be modified or garbage collected while it is in use.
+        """
+        value_type = type(value)
+
+        if value_type in self._IMMUTABLE_TYPES:
+            return value_type, value
+
+        if isinstance(value, collections.abc.Mapping):
+            if fingerprints is None:
+                fingerprints = {}
+            elif id(value) in fingerprints:
+                return fingerprints[id(value)]
+
+            items = []
+            result: Optional[Any] = None
+            for key, item in value.items():
+                item_fingerprint = self.fingerprint(item, fingerprints)
+                if item_fingerprint is None:
+                    break
+                items.append((key, item_fingerprint))
+            else:
+                result = (collections.abc.Mapping, frozenset(items))
+
+            fingerprints[id(value)] = result
+            return result
+
+        if value_type is tuple or value_type is frozenset:
+            elements = [self.fingerprint(element, fingerprints) for element in value]
+            if any(element is None for element in elements):
+                return None
+            return value_type, value_type(elements)
+
+        if isinstance(value, self.identity_types):
+            return _Identity(value)
+
+        return None
+
+    def _is_cacheable(self, namespace: PortNamespace) -> bool:
+        """Return whether the results of the namespace can be cached."""
+        try:
+            return self._cacheable[id(namespace)]
+        except KeyError:
+            pass
+
+        cls = type(namespace)
+        cacheable = (
+            cls.pre_process is PortNamespace.pre_process
+            and cls.validate is PortNamespace.validate
+            and cls.validate_ports is PortNamespace.validate_ports
+            and not callable(namespace.default)
+        )
+
+        for port in namespace._ports.values():
+            if not cacheable:
+                break
+            if isinstance(port, PortNamespace):
+                cacheable = self._is_cacheable(port)
+            else:
+                cacheable = not (isinstance(port, InputPort) and port.has_default() and callable(port.default))
+
+        self._cacheable[id(namespace)] = cacheable
+        return cacheable
+
+
+_MUTABLE_PROPERTIES: Dict[type, Tuple[str, ...]] = {}
+
+
+def _get_mutable_properties(namespace_class: type) -> Tuple[str, ...]:
+    """Return the names of the mutable properties of :class:`PortNamespace` that the namespace class has.
+
+    :param namespace_class: subclass of :class:`PortNamespace`
+    :return: the names of the properties in alphabetical order
+    """
+    try:
+        return _MUTABLE_PROPERTIES[namespace_class]
+    except KeyError:
+        properties = tuple(attr for attr in dir(namespace_class) if is_mutable_property(PortNamespace, attr))
+        _MUTABLE_PROPERTIES[namespace_class] = properties
+        return properties
+
+
+def copy_nested_dicts(value: Any) -> Any:
+    """Recursively copy the mapping but only create copies of the dictionaries not the values.
+
+    :param value: the value to copy
+    :return: the copy
+    """
+    if isinstance(value, dict):
+        return {key: copy_nested_dicts(subvalue) for key, subvalue in value.items()}
+    return value
+
+
+def _contains_dicts(value: Any) -> bool:
+    """Return whether the parsed port values contain a dictionary at any depth."""
+    if isinstance(value, dict):
+        return True
+    if isinstance(value, AttributesFrozendict):
+        return any(_contains_dicts(subvalue) for subvalue in value.values())
+    return False
+
+
+def _copy_parsed_dicts(value: Any) -> Any:
+    """Copy the dictionaries in the parsed port values, recreating the frozen mappings that contain them."""
+    if isinstance(value, dict):
+        return copy_nested_dicts(value)
+    if isinstance(value, AttributesFrozendict) and _contains_dicts(value):
+        return AttributesFrozendict._wrap({key: _copy_parsed_dicts(subvalue) for key, subvalue in value.items()})
+    return value
+
+
 def breadcrumbs_to_port(breadcrumbs: Sequence[str]) -> str:
     """Convert breadcrumbs to a string representing the port
 
@@ -4,12 +4,14 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
 import logging
-from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Union, cast
+import weakref
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Union, cast
 
 import kiwipy
 
-from . import communications, futures, loaders, persistence
+from . import communications, futures, loaders, metrics, persistence, settings
 from .utils import PID_TYPE
 
 __all__ = [
@@ -17,11 +19,14 @@ __all__ = [
     'ProcessLauncher',
     'RemoteProcessController',
     'RemoteProcessThreadController',
+    'StateChangeCoalescer',
+    'StateChangedBroadcast',
     'create_continue_body',
     'create_launch_body',
 ]
 
 if TYPE_CHECKING:
+    from .communications import ID_TYPE
     from .processes import Process
 
 ProcessResult = Any
@@ -31,6 +36,8 @@ INTENT_KEY = 'intent'
 MESSAGE_TEXT_KEY = 'message'
 FORCE_KILL_KEY = 'force_kill'
 
+STATE_CHANGES_SUBJECT = 'state_changes'
+
 
 class Intent:
     """Intent constants for a process message"""
@@ -41,6 +48,19 @@ class Intent:
     STATUS: str = 'status'
 
 
+class StateChangedBroadcast:
+    """Policies for the broadcasts that processes send when they change state, see `settings.state_changed_broadcast`"""
+
+    ALL: str = 'all'
+    """Broadcast every transition with the subject ``state_changed.{from}.{to}``"""
+    TERMINAL: str = 'terminal'
+    """Only broadcast the transitions into a terminal state"""
+    COALESCED: str = 'coalesced'
+    """Collect the transitions per communicator and broadcast them together, see :class:`StateChangeCoalescer`"""
+    NONE: str = 'none'
+    """Do not broadcast state changes"""
+
+
 MessageType = Dict[str, Any]
 
 
@@ -99,6 +119,11 @@ CREATE_TASK = 'create'
 
 LOGGER = logging.getLogger(__name__)
 
+# The function that stops counting the launcher task that is being handled in the ``launcher_tasks`` metric
+_RELEASE_LAUNCHER_TASK: contextvars.ContextVar[Optional[Callable[[], None]]] = contextvars.ContextVar(
+    'release launcher task', default=None
+)
+
 
 def create_launch_body(
     process_class: str,
@@ -181,14 +206,102 @@ def create_create_body(
     return msg_body
 
 
+class StateChangeCoalescer:
+    """
+    Collects the state changes of processes and broadcasts them in a single message per time window.
+
+    The broadcast has the subject ``state_changes`` and the body is a list of ``[pid, from, to]`` triples, one for
+    each transition in the order in which they occurred.
+    """
+
+    def __init__(
+        self,
+        communicator: kiwipy.Communicator,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        window: Optional[float] = None,
+    ):
+        """
+        :param communicator: the communicator to send the broadcasts with
+        :param loop: the event loop to schedule the broadcasts on
+        :param window: the number of seconds during which transitions are collected, defaults to
+            `settings.state_changed_window`
+        """
+        self._communicator = communicator
+        self._loop = loop or asyncio.get_event_loop()
+        self._window = settings.state_changed_window if window is None else window
+        self._changes: List[List[Any]] = []
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def add(self, pid: 'PID_TYPE', from_label: Optional[str], to_label: str) -> None:
+        """
+        Add a transition to the next broadcast.
+
+        :param pid: the pid of the process
+        :param from_label: the label of the state the process left
+        :param to_label: the label of the state the process entered
+        """
+        self._changes.append([pid, from_label, to_label])
+        if self._handle is None:
+            self._handle = self._loop.call_later(self._window, self.flush)
+
+    def flush(self) -> None:
+        """Broadcast the collected transitions now."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        if not self._changes:
+            return
+
+        changes, self._changes = self._changes, []
+        LOGGER.debug('Broadcasting %d state changes', len(changes))
+        try:
+            self._communicator.broadcast_send(body=changes, subject=STATE_CHANGES_SUBJECT)
+        except Exception:
+            LOGGER.warning('Failed to broadcast %d state changes', len(changes), exc_info=True)
+
+
+_COALESCERS: weakref.WeakKeyDictionary[kiwipy.Communicator, StateChangeCoalescer] = weakref.WeakKeyDictionary()
+
+
+def get_state_change_coalescer(communicator: kiwipy.Communicator) -> StateChangeCoalescer:
+    """
+    Return the state change coalescer of a communicator, creating it on the current event loop if necessary.
+
+    :param communicator: the communicator
+    :return: the coalescer that broadcasts the state changes with the communicator
+    """
+    try:
+        return _COALESCERS[communicator]
+    except KeyError:
+        coalescer = _COALESCERS[communicator] = StateChangeCoalescer(communicator)
+        return coalescer
+
+
+def _rpc_send(
+    communicator: kiwipy.Communicator, worker_id: Optional['ID_TYPE'], pid: 'PID_TYPE', msg: Any
+) -> kiwipy.Future:
+    """Send an RPC message to a process, routed through the worker with the given identifier if there is one."""
+    if worker_id is None:
+        return communicator.rpc_send(pid, msg)
+
+    return communicator.rpc_send(worker_id, communications.create_routed_body(pid, msg))
+
+
 class RemoteProcessController:
     """
     Control remote processes using coroutines that will send messages and wait
     (in a non-blocking way) for their response
     """
 
-    def __init__(self, communicator: kiwipy.Communicator) -> None:
+    def __init__(self, communicator: kiwipy.Communicator, worker_id: Optional['ID_TYPE'] = None) -> None:
+        """
+        :param communicator: the communicator to use
+        :param worker_id: the identifier of the :class:`plumpy.communications.WorkerCommunicator` that runs the
+            processes, if set the messages are routed through it instead of being sent to the pids of the processes
+        """
         self._communicator = communicator
+        self._worker_id = worker_id
 
     async def get_status(self, pid: 'PID_TYPE') -> 'ProcessStatus':
         """
@@ -196,7 +309,7 @@ class RemoteProcessController:
         :param pid: the process id
         :return: the status response from the process
         """
-        future = self._communicator.rpc_send(pid, MessageBuilder.status())
+        future = _rpc_send(self._communicator, self._worker_id, pid, MessageBuilder.status())
         result = await asyncio.wrap_future(future)
         return result
 
@@ -210,7 +323,7 @@ class RemoteProcessController:
         """
         msg = MessageBuilder.pause(text=msg_text)
 
-        pause_future = self._communicator.rpc_send(pid, msg)
+        pause_future = _rpc_send(self._communicator, self._worker_id, pid, msg)
         # rpc_send return a thread future from communicator
         future = await asyncio.wrap_future(pause_future)
         # future is just returned from rpc call which return a kiwipy future
@@ -224,7 +337,7 @@ class RemoteProcessController:
         :param pid: the pid of the process to play
         :return: True if played, False otherwise
         """
-        play_future = self._communicator.rpc_send(pid, MessageBuilder.play())
+        play_future = _rpc_send(self._communicator, self._worker_id, pid, MessageBuilder.play())
         future = await asyncio.wrap_future(play_future)
         result = await asyncio.wrap_future(future)
         return result
@@ -242,7 +355,7 @@ class RemoteProcessController:
         msg = MessageBuilder.kill(text=msg_text, force_kill=force_kill)
 
         # Wait for the communication to go through
-        kill_future = self._communicator.rpc_send(pid, msg)
+        kill_future = _rpc_send(self._communicator, self._worker_id, pid, msg)
         future = await asyncio.wrap_future(kill_future)
         # Now wait for the kill to be enacted
         result = await asyncio.wrap_future(future)
@@ -348,14 +461,17 @@ class RemoteProcessThreadController:
     A class that can be used to control and launch remote processes
     """
 
-    def __init__(self, communicator: kiwipy.Communicator):
+    def __init__(self, communicator: kiwipy.Communicator, worker_id: Optional['ID_TYPE'] = None):
         """
         Create a new process controller
 
         :param communicator: the communicator to use
+        :param worker_id: the identifier of the :class:`plumpy.communications.WorkerCommunicator` that runs the
+            processes, if set the messages are routed through it instead of being sent to the pids of the processes
 
         """
         self._communicator = communicator
+        self._worker_id = worker_id
 
     def get_status(self, pid: 'PID_TYPE') -> kiwipy.Future:
         """Get the status of a process with the given PID.
@@ -363,7 +479,7 @@ class RemoteProcessThreadController:
         :param pid: the process id
         :return: the status response from the process
         """
-        return self._communicator.rpc_send(pid, MessageBuilder.status())
+        return _rpc_send(self._communicator, self._worker_id, pid, MessageBuilder.status())
 
     def pause_process(self, pid: 'PID_TYPE', msg_text: Optional[str] = None) -> kiwipy.Future:
         """
@@ -376,7 +492,7 @@ class RemoteProcessThreadController:
         """
         msg = MessageBuilder.pause(text=msg_text)
 
-        return self._communicator.rpc_send(pid, msg)
+        return _rpc_send(self._communicator, self._worker_id, pid, msg)
 
     def pause_all(self, msg_text: Optional[str]) -> None:
         """
@@ -395,7 +511,7 @@ class RemoteProcessThreadController:
         :return: a response future from the process to be played
 
         """
-        return self._communicator.rpc_send(pid, MessageBuilder.play())
+        return _rpc_send(self._communicator, self._worker_id, pid, MessageBuilder.play())
 
     def play_all(self) -> None:
         """
@@ -412,7 +528,7 @@ class RemoteProcessThreadController:
         :return: a response future from the process to be killed
         """
         msg = MessageBuilder.kill(text=msg_text, force_kill=force_kill)
-        return self._communicator.rpc_send(pid, msg)
+        return _rpc_send(self._communicator, self._worker_id, pid, msg)
 
     def kill_all(self, msg_text: Optional[str]) -> None:
         """
@@ -550,15 +666,43 @@ class ProcessLauncher:
         Receive a task.
         :param task: The task message
         """
-        task_type = task[TASK_KEY]
-        if task_type == LAUNCH_TASK:
-            return await self._launch(communicator, **task.get(TASK_ARGS, {}))
-        if task_type == CONTINUE_TASK:
-            return await self._continue(communicator, **task.get(TASK_ARGS, {}))
-        if task_type == CREATE_TASK:
-            return await self._create(communicator, **task.get(TASK_ARGS, {}))
+        collector = metrics.get_metrics()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if collector is not None and not released:
+                released = True
+                collector.launcher_tasks.dec()
 
-        raise communications.TaskRejected
+        if collector is not None:
+            collector.launcher_tasks.inc()
+
+        token = _RELEASE_LAUNCHER_TASK.set(release)
+        try:
+            task_type = task[TASK_KEY]
+            if task_type == LAUNCH_TASK:
+                return await self._launch(communicator, **task.get(TASK_ARGS, {}))
+            if task_type == CONTINUE_TASK:
+                return await self._continue(communicator, **task.get(TASK_ARGS, {}))
+            if task_type == CREATE_TASK:
+                return await self._create(communicator, **task.get(TASK_ARGS, {}))
+
+            raise communications.TaskRejected
+        finally:
+            _RELEASE_LAUNCHER_TASK.reset(token)
+            release()
+
+    @staticmethod
+    def _task_launched() -> None:
+        """Stop counting the task that is being handled in the ``launcher_tasks`` metric.
+
+        Called once the process of the task is launched or continued, before waiting for it to terminate, such that the
+        metric does not count the tasks whose processes are running.
+        """
+        release = _RELEASE_LAUNCHER_TASK.get()
+        if release is not None:
+            release()
 
     async def _launch(
         self,
@@ -598,9 +742,13 @@ class ProcessLauncher:
             asyncio.ensure_future(proc.step_until_terminated())  # noqa: RUF006
             return proc.pid
 
+        future = proc.future()
+        self._task_launched()
         await proc.step_until_terminated()
 
-        return proc.future().result()
+        # If the process was hibernated, its future is resolved once it is continued, so release it while waiting
+        del proc
+        return await future
 
     async def _continue(
         self, _communicator: kiwipy.Communicator, pid: 'PID_TYPE', nowait: bool, tag: Optional[str] = None
@@ -626,9 +774,13 @@ class ProcessLauncher:
             asyncio.ensure_future(proc.step_until_terminated())  # noqa: RUF006
             return proc.pid
 
+        future = proc.future()
+        self._task_launched()
         await proc.step_until_terminated()
 
-        return proc.future().result()
+        # If the process was hibernated, its future is resolved once it is continued, so release it while waiting
+        del proc
+        return await future
 
     async def _create(
         self,
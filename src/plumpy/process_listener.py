@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 import abc
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Tuple
 
 from . import persistence
 from .utils import SAVED_STATE_TYPE, protected
@@ -82,6 +82,18 @@ class ProcessListener(persistence.Savable, metaclass=abc.ABCMeta):
 
         """
 
+    def on_outputs_emitted(self, process: 'Process', outputs: Sequence[Tuple[str, Any, bool]]) -> None:
+        """
+        Called when the process has emitted multiple output values at once. By default this calls
+        :meth:`on_output_emitted` for each of them.
+
+        :param process: The process
+        :param outputs: Tuples of the output port, the value and whether the port is dynamic
+
+        """
+        for output_port, value, dynamic in outputs:
+            self.on_output_emitted(process, output_port, value, dynamic)
+
     def on_process_finished(self, process: 'Process', outputs: Any) -> None:
         """
         Called when the process has finished successfully
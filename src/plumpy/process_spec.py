@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import collections
 import json
 import logging
-from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Type, Union, cast
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Sequence, Tuple, Type, Union, cast
 
-from .ports import InputPort, OutputPort, Port, PortNamespace
+from . import settings
+from .ports import InputPort, OutputPort, Port, PortNamespace, PortValidationError, ValidationCache, copy_nested_dicts
+from .utils import AttributesFrozendict
 
 if TYPE_CHECKING:
     from .processes import Process
@@ -28,11 +31,21 @@ class ProcessSpec:
     PORT_NAMESPACE_TYPE = PortNamespace
     INPUT_PORT_TYPE = InputPort
     OUTPUT_PORT_TYPE = OutputPort
+    # The maximum number of dynamically created output namespaces that are cached, the least recently used first
+    DYNAMIC_OUTPUT_NAMESPACES_MAXSIZE: int = 128
 
     def __init__(self) -> None:
         self._ports: PortNamespace = self.PORT_NAMESPACE_TYPE()
         # self._validator = None  # this is never used
         self._sealed: bool = False
+        self._validation_cache: Optional[ValidationCache] = None
+        self._has_async_validators: Optional[bool] = None
+        self._output_namespaces: Dict[str, PortNamespace] = {}
+        self._dynamic_output_namespaces: collections.OrderedDict[str, PortNamespace] = collections.OrderedDict()
+        # The value of ``PortNamespace.modifications`` when the output namespaces were last cached
+        self._output_namespaces_modifications = PortNamespace.modifications
+        self._description: Optional[Dict[str, Any]] = None
+        self._description_json: Optional[str] = None
         self._logger = logging.getLogger(__name__)
 
         # Create the input and output port namespace
@@ -42,7 +55,14 @@ class ProcessSpec:
         self._exposed_outputs: EXPOSED_TYPE = collections.defaultdict(lambda: collections.defaultdict(list))
 
     def __str__(self) -> str:
-        return json.dumps(self.get_description(), sort_keys=True, indent=4)
+        if self._description_json is not None:
+            return self._description_json
+
+        description_json = json.dumps(self.get_description(), sort_keys=True, indent=4)
+        if self.sealed:
+            self._description_json = description_json
+
+        return description_json
 
     @property
     def namespace_separator(self) -> str:
@@ -55,7 +75,13 @@ class ProcessSpec:
     def seal(self) -> None:
         """
         Seal this specification disallowing any further changes
+
+        :raises ValueError: if an output port has an async validator, as outputs are validated synchronously when they
+            are recorded by a running process
         """
+        if not self._sealed and self.outputs.has_async_validators():
+            raise ValueError('outputs cannot have async validators, as they are validated when they are recorded')
+
         self._sealed = True
 
     @property
@@ -68,10 +94,115 @@ class ProcessSpec:
         """
         return self._sealed
 
+    @property
+    def validation_cache(self) -> Optional[ValidationCache]:
+        """
+        The cache of validated inputs, or None if it is not enabled
+
+        :return: the validation cache
+        """
+        return self._validation_cache
+
+    def enable_validation_cache(self, maxsize: int = 1024) -> None:
+        """
+        Enable caching the results of validating the inputs of processes with this specification.
+
+        The successfully parsed values of each input namespace are memoized on a structural fingerprint of the inputs,
+        such that processes that are launched repeatedly with the same inputs only validate them once. This should only
+        be enabled if the validators of the input ports are pure functions of the inputs, see
+        :class:`~plumpy.ports.ValidationCache` for the details.
+
+        :param maxsize: the maximum number of parsed namespaces to keep
+        """
+        self._validation_cache = ValidationCache(maxsize)
+
+    def disable_validation_cache(self) -> None:
+        """
+        Disable caching the results of validating the inputs, discarding the cached results
+        """
+        self._validation_cache = None
+
+    def invalidate_validation_cache(self) -> None:
+        """
+        Discard the cached results of validating the inputs.
+
+        This is done automatically whenever a port is added to this specification, but has to be called explicitly
+        when an existing port is modified.
+        """
+        if self._validation_cache is not None:
+            self._validation_cache.clear()
+
+    def has_async_validators(self) -> bool:
+        """
+        Return whether any of the input ports has a validator that is a coroutine function
+
+        :return: True if the inputs are validated asynchronously, False otherwise
+        """
+        if self._has_async_validators is not None:
+            return self._has_async_validators
+
+        has_async_validators = self.inputs.has_async_validators()
+        if self.sealed:
+            self._has_async_validators = has_async_validators
+
+        return has_async_validators
+
+    def parse_inputs(
+        self, inputs: Optional[Mapping[str, Any]], loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> Tuple[AttributesFrozendict, Optional[PortValidationError]]:
+        """
+        Fill in the defaults, validate and freeze the inputs, using the validation cache if it is enabled
+
+        If any of the input ports has a validator that is a coroutine function, the inputs are validated with
+        :meth:`~plumpy.ports.PortNamespace.async_validate` instead, which awaits up to
+        ``settings.validator_concurrency`` validators concurrently, and the validation cache is not used. The
+        validation is run to completion on the event loop, so it cannot be used from a coroutine running on the loop,
+        which should pre-process the inputs and await :meth:`~plumpy.ports.PortNamespace.async_validate` itself.
+
+        :param inputs: the raw inputs
+        :param loop: the event loop on which to run the async validators, by default the current event loop
+        :return: tuple of the pre-processed inputs and the validation error, or None if they are valid
+        :raises RuntimeError: if the inputs have async validators and the event loop is running
+        """
+        if not self.has_async_validators() or not isinstance(inputs, (Mapping, type(None))):
+            return self.inputs.parse_inputs(inputs, cache=self._validation_cache)
+
+        loop = loop or asyncio.get_event_loop()
+        if loop.is_running():
+            raise RuntimeError(
+                'the inputs have async validators that cannot be run to completion while the event loop is running, '
+                'pre-process the inputs and await `PortNamespace.async_validate` instead'
+            )
+
+        parsed = self.inputs.pre_process(copy_nested_dicts(dict(inputs or {})))
+        validation = self.inputs.async_validate(parsed, max_concurrency=settings.validator_concurrency)
+
+        return parsed, loop.run_until_complete(validation)
+
     def get_description(self) -> Dict[str, Any]:
         """
         Get a description of this process specification
 
+        Once the specification is sealed, the description is only built the first time and its JSON serialization,
+        as returned by ``str``, is cached as well. The cached description is returned as a copy of all its nested
+        dictionaries, so the returned description can be modified without affecting the cache.
+
+        :return: a dictionary with the descriptions of the input and output port namespaces
+        """
+        if self._description is not None:
+            return copy_nested_dicts(self._description)
+
+        description = self._build_description()
+        if self.sealed:
+            self._description = description
+            return copy_nested_dicts(description)
+
+        return description
+
+    def _build_description(self) -> Dict[str, Any]:
+        """
+        Build the description of this process specification, see :meth:`get_description`
+
         :return: a dictionary with the descriptions of the input and output port namespaces
         """
         description = {'inputs': self.inputs.get_description(), 'outputs': self.outputs.get_description()}
@@ -100,6 +231,74 @@ class ProcessSpec:
         """
         return cast(PortNamespace, self._ports[self.NAME_OUTPUTS_PORT_NAMESPACE])
 
+    def get_output_namespace(self, namespace: str) -> PortNamespace:
+        """
+        Return the (namespaced) port namespace in the output port namespace, creating it if it does not exist and its
+        parent namespace is dynamic.
+
+        The namespaces that are defined by this specification are cached per path, since a process emitting many
+        outputs resolves the same ones over and over again. Dynamically created namespaces are not added to the
+        specification, such that they do not accumulate when processes emit outputs under distinct keys. Instead, the
+        most recently used ones are kept in a cache of at most ``DYNAMIC_OUTPUT_NAMESPACES_MAXSIZE`` paths. Both caches
+        are discarded when ports are added to or removed from any port namespace, or whether a namespace is dynamic
+        changes, also when the namespaces are modified directly instead of through this specification.
+
+        :param namespace: the namespace, for example ``sub.space``, or the empty string for the outputs namespace itself
+        :return: the PortNamespace
+        :raises: ValueError if the namespace does not exist and cannot be created, or is not a PortNamespace
+        """
+        if self._output_namespaces_modifications != PortNamespace.modifications:
+            self._output_namespaces.clear()
+            self._dynamic_output_namespaces.clear()
+            self._output_namespaces_modifications = PortNamespace.modifications
+
+        try:
+            return self._output_namespaces[namespace]
+        except KeyError:
+            pass
+
+        try:
+            port_namespace = self._dynamic_output_namespaces[namespace]
+        except KeyError:
+            pass
+        else:
+            self._dynamic_output_namespaces.move_to_end(namespace)
+            return port_namespace
+
+        if not namespace:
+            port_namespace = self.outputs
+        else:
+            parent, _, name = namespace.rpartition(self.namespace_separator)
+            parent_namespace = self.get_output_namespace(parent)
+
+            try:
+                port = parent_namespace[name]
+            except KeyError:
+                if not parent_namespace.dynamic:
+                    raise ValueError(f"port '{name}' does not exist in port namespace '{parent_namespace.name}'")
+
+                port_namespace = self._dynamic_output_namespaces[namespace] = parent_namespace.dynamic_namespace(name)
+                if len(self._dynamic_output_namespaces) > self.DYNAMIC_OUTPUT_NAMESPACES_MAXSIZE:
+                    self._dynamic_output_namespaces.popitem(last=False)
+                return port_namespace
+
+            if not isinstance(port, PortNamespace):
+                raise ValueError(f"output port '{namespace}' is not a port namespace")
+            port_namespace = port
+
+        self._output_namespaces[namespace] = port_namespace
+        return port_namespace
+
+    def _spec_changed(self) -> None:
+        """
+        Discard the caches that depend on the ports of this specification
+        """
+        self._output_namespaces.clear()
+        self._dynamic_output_namespaces.clear()
+        self._description = None
+        self._description_json = None
+        self.invalidate_validation_cache()
+
     def _create_port(
         self, port_namespace: PortNamespace, port_class: Type[Union[Port, PortNamespace]], name: str, **kwargs: Any
     ) -> None:
@@ -122,6 +321,7 @@ class ProcessSpec:
             port_namespace = port_namespace.create_port_namespace(namespace)
 
         port_namespace[port_name] = port_class(port_name, **kwargs)
+        self._spec_changed()
 
     def input(self, name: str, **kwargs: Any) -> None:
         """
@@ -209,6 +409,7 @@ class ProcessSpec:
             include=include,
             namespace_options=namespace_options,
         )
+        self._spec_changed()
 
     def expose_outputs(
         self,
@@ -240,6 +441,7 @@ class ProcessSpec:
             include=include,
             namespace_options=namespace_options,
         )
+        self._spec_changed()
 
     @staticmethod
     def _expose_ports(
@@ -30,6 +30,7 @@ __all__ = [
     'Created',
     'Excepted',
     'Finished',
+    'HibernateInterruption',
     'Interruption',
     # Commands
     'Kill',
@@ -60,6 +61,10 @@ class KillInterruption(Interruption):
         self.force_kill: bool = force_kill
 
 
+class HibernateInterruption(Interruption):
+    """Interruption of a waiting process that is released from memory, to be continued from its checkpoint."""
+
+
 class PauseInterruption(Interruption):
     def __init__(self, msg_text: str | None):
         super().__init__(msg_text)
@@ -72,22 +77,26 @@ class PauseInterruption(Interruption):
 
 
 class Command(persistence.Savable):
-    pass
+    __slots__ = ('_called',)
 
 
 @auto_persist('msg')
 class Kill(Command):
+    __slots__ = ('msg',)
+
     def __init__(self, msg: Optional[MessageType] = None):
         super().__init__()
         self.msg = msg
 
 
 class Pause(Command):
-    pass
+    __slots__ = ()
 
 
 @auto_persist('msg', 'data')
 class Wait(Command):
+    __slots__ = ('continue_fn', 'data', 'msg')
+
     def __init__(
         self,
         continue_fn: Optional[Callable[..., Any]] = None,
@@ -102,6 +111,8 @@ class Wait(Command):
 
 @auto_persist('result')
 class Stop(Command):
+    __slots__ = ('result', 'successful')
+
     def __init__(self, result: Any, successful: bool) -> None:
         super().__init__()
         self.result = result
@@ -110,6 +121,8 @@ class Stop(Command):
 
 @auto_persist('args', 'kwargs')
 class Continue(Command):
+    __slots__ = ('args', 'continue_fn', 'kwargs')
+
     CONTINUE_FN = 'continue_fn'
 
     def __init__(self, continue_fn: Callable[..., Any], *args: Any, **kwargs: Any):
@@ -151,6 +164,8 @@ class ProcessState(Enum):
 
 @auto_persist('in_state')
 class State(state_machine.State, persistence.Savable):
+    __slots__ = ()
+
     @property
     def process(self) -> state_machine.StateMachine:
         """
@@ -168,6 +183,8 @@ class State(state_machine.State, persistence.Savable):
 
 @auto_persist('args', 'kwargs')
 class Created(State):
+    __slots__ = ('args', 'kwargs', 'run_fn')
+
     LABEL = ProcessState.CREATED
     ALLOWED = {ProcessState.RUNNING, ProcessState.KILLED, ProcessState.EXCEPTED}
 
@@ -194,6 +211,8 @@ class Created(State):
 
 @auto_persist('args', 'kwargs')
 class Running(State):
+    __slots__ = ('_command', '_running', 'args', 'kwargs', 'run_fn')
+
     LABEL = ProcessState.RUNNING
     ALLOWED = {
         ProcessState.RUNNING,
@@ -206,11 +225,6 @@ class Running(State):
     RUN_FN = 'run_fn'  # The key used to store the function to run
     COMMAND = 'command'  # The key used to store an upcoming command
 
-    # Class level defaults
-    _command: Union[None, Kill, Stop, Wait, Continue] = None
-    _running: bool = False
-    _run_handle = None
-
     def __init__(
         self, process: 'Process', run_fn: Callable[..., Union[Awaitable[Any], Any]], *args: Any, **kwargs: Any
     ) -> None:
@@ -223,7 +237,8 @@ class Running(State):
         # with the await syntax while not changing the program logic.
         self.args = args
         self.kwargs = kwargs
-        self._run_handle = None
+        self._command: Union[None, Kill, Stop, Wait, Continue] = None
+        self._running: bool = False
 
     def save_instance_state(self, out_state: SAVED_STATE_TYPE, save_context: persistence.LoadSaveContext) -> None:
         super().save_instance_state(out_state, save_context)
@@ -234,6 +249,8 @@ class Running(State):
     def load_instance_state(self, saved_state: SAVED_STATE_TYPE, load_context: persistence.LoadSaveContext) -> None:
         super().load_instance_state(saved_state, load_context)
         self.run_fn = ensure_coroutine(getattr(self.process, saved_state[self.RUN_FN]))
+        self._command = None
+        self._running = False
         if self.COMMAND in saved_state:
             self._command = persistence.Savable.load(saved_state[self.COMMAND], load_context)  # type: ignore
 
@@ -288,6 +305,8 @@ class Running(State):
 
 @auto_persist('msg', 'data')
 class Waiting(State):
+    __slots__ = ('_waiting_future', 'data', 'done_callback', 'msg')
+
     LABEL = ProcessState.WAITING
     ALLOWED = {
         ProcessState.RUNNING,
@@ -299,8 +318,6 @@ class Waiting(State):
 
     DONE_CALLBACK = 'DONE_CALLBACK'
 
-    _interruption = None
-
     def __str__(self) -> str:
         state_info = super().__str__()
         if self.msg is not None:
@@ -362,6 +379,7 @@ class Waiting(State):
             return
 
         self._waiting_future.set_result(value)
+        cast('Process', self.process)._mark_step_ready()
 
 
 class Excepted(State):
@@ -372,6 +390,8 @@ class Excepted(State):
     :param trace_back: An optional exception traceback
     """
 
+    __slots__ = ('exception', 'traceback')
+
     LABEL = ProcessState.EXCEPTED
 
     EXC_VALUE = 'ex_value'
@@ -434,6 +454,8 @@ class Finished(State):
     :param successful: Boolean for the exit code is ``0`` the process is successful.
     """
 
+    __slots__ = ('result', 'successful')
+
     LABEL = ProcessState.FINISHED
 
     def __init__(self, process: 'Process', result: Any, successful: bool) -> None:
@@ -453,6 +475,8 @@ class Killed(State):
     :param msg: An optional message explaining the reason for the process termination.
     """
 
+    __slots__ = ('msg',)
+
     LABEL = ProcessState.KILLED
 
     def __init__(self, process: 'Process', msg: Optional[MessageType]):
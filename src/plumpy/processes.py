@@ -8,9 +8,10 @@ import copy
 import enum
 import functools
 import logging
-import re
 import sys
+import threading
 import time
+import types
 import uuid
 import warnings
 from contextvars import ContextVar
@@ -23,6 +24,7 @@ from typing import (
     Generator,
     Hashable,
     List,
+    Mapping,
     Optional,
     Sequence,
     Tuple,
@@ -34,16 +36,20 @@ from typing import (
 
 import kiwipy
 import yaml
-from aio_pika.exceptions import ChannelInvalidStateError, ConnectionClosed
 
 from . import (
+    communications,
     events,
     exceptions,
     futures,
+    metrics,
     persistence,
     ports,
     process_comms,
     process_states,
+    profiling,
+    registry,
+    settings,
     utils,
 )
 from .base import state_machine
@@ -60,7 +66,90 @@ T = TypeVar('T')
 __all__ = ['BundleKeys', 'Process', 'ProcessSpec', 'TransitionFailed']
 
 _LOGGER = logging.getLogger(__name__)
-PROCESS_STACK: ContextVar[list['Process']] = ContextVar('process stack', default=[])
+# The hooks that are called when entering, having entered and exiting the process states, keyed on the state label
+_ENTERING_HOOKS: Dict[Hashable, Callable[['Process', Any], None]] = {
+    process_states.ProcessState.CREATED: lambda process, _state: call_with_super_check(process.on_create),
+    process_states.ProcessState.RUNNING: lambda process, _state: call_with_super_check(process.on_run),
+    process_states.ProcessState.WAITING: lambda process, state: call_with_super_check(process.on_wait, state.data),
+    process_states.ProcessState.FINISHED: lambda process, state: call_with_super_check(
+        process.on_finish, state.result, state.successful
+    ),
+    process_states.ProcessState.KILLED: lambda process, state: call_with_super_check(process.on_kill, state.msg),
+    process_states.ProcessState.EXCEPTED: lambda process, state: call_with_super_check(
+        process.on_except, state.get_exc_info()
+    ),
+}
+_ENTERED_HOOKS: Dict[Hashable, str] = {
+    process_states.ProcessState.RUNNING: 'on_running',
+    process_states.ProcessState.WAITING: 'on_waiting',
+    process_states.ProcessState.FINISHED: 'on_finished',
+    process_states.ProcessState.EXCEPTED: 'on_excepted',
+    process_states.ProcessState.KILLED: 'on_killed',
+}
+_EXITING_HOOKS: Dict[Hashable, str] = {
+    process_states.ProcessState.WAITING: 'on_exit_waiting',
+    process_states.ProcessState.RUNNING: 'on_exit_running',
+}
+
+
+# An immutable frame of the process stack: the running process and the scope of its caller. A plain tuple is used, as a
+# scope is created for every step and task of a process and creating a named tuple costs several times as much.
+_ProcessScope = Tuple['Process', Any]
+
+# The innermost scope of the stack of running processes, such that entering and leaving a scope are O(1)
+PROCESS_STACK: ContextVar[Optional[_ProcessScope]] = ContextVar('process stack', default=None)
+
+# The processes whose step is executing, as opposed to awaiting, by the identity of the step, with the identifier of the
+# thread executing it. Unlike the process stack, that is local to the context of a task, this can be read from other
+# threads by the watchdog. The steps are only published while there are subscribers, see ``subscribe_stepping``.
+STEPPING_PROCESSES: Dict[int, Tuple[int, 'Process']] = {}
+_STEPPING_SUBSCRIBERS = 0
+
+
+def subscribe_stepping(subscribe: bool = True) -> None:
+    """Start, or stop, publishing the processes whose step is executing in :data:`STEPPING_PROCESSES`.
+
+    Publishing has a cost for every step, so it is only done while there is at least one subscriber.
+
+    :param subscribe: True to add a subscriber, False to remove one
+    """
+    global _STEPPING_SUBSCRIBERS  # noqa: PLW0603
+    _STEPPING_SUBSCRIBERS = max(0, _STEPPING_SUBSCRIBERS + (1 if subscribe else -1))
+
+
+@types.coroutine
+def _publish_stepping(process: 'Process', awaitable: Awaitable[T]) -> Generator[Any, Any, T]:
+    """Await the step of the process, publishing it in :data:`STEPPING_PROCESSES` only while the step executes."""
+    iterator = awaitable.__await__()
+    key, thread_id = id(iterator), threading.get_ident()
+    value: Any = None
+    error: Optional[BaseException] = None
+    while True:
+        STEPPING_PROCESSES[key] = (thread_id, process)
+        try:
+            yielded = iterator.throw(error) if error is not None else iterator.send(value)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            del STEPPING_PROCESSES[key]
+
+        # The step is suspended, which is where other tasks run
+        try:
+            value, error = (yield yielded), None
+        except BaseException as exception:
+            value, error = None, exception
+
+
+def _broker_connection_errors() -> Tuple[Type[BaseException], ...]:
+    """Return the exceptions that the RabbitMQ client raises when the connection to the broker is not available.
+
+    The client is only imported when a RabbitMQ communicator is used, so it is not imported here just to be able to
+    catch its exceptions: if it has not been imported, they cannot have been raised.
+    """
+    exceptions = sys.modules.get('aio_pika.exceptions')
+    if exceptions is None:
+        return ()
+    return exceptions.ConnectionClosed, exceptions.ChannelInvalidStateError
 
 
 class BundleKeys:
@@ -74,6 +163,7 @@ class BundleKeys:
     INPUTS_RAW = 'INPUTS_RAW'
     INPUTS_PARSED = 'INPUTS_PARSED'
     OUTPUTS = 'OUTPUTS'
+    VALIDATE_INPUTS_PENDING = 'VALIDATE_INPUTS_PENDING'
 
 
 class ProcessStateMachineMeta(abc.ABCMeta, state_machine.StateMachineMeta):
@@ -155,6 +245,10 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
     _killing: Optional[futures.CancellableAction] = None
     _interrupt_action: Optional[futures.CancellableAction] = None
     _closed = False
+    _hibernated = False
+    _step_ready: Optional[float] = None  # The time at which the process was created or woken up, when profiling
+    _step_queue: Optional[float] = None  # The queue time of the current step, for the functions that record its times
+    _validate_inputs_pending = False  # Whether the async validators of the inputs still have to be awaited
     _cleanups: Optional[List[Callable[[], None]]] = None
 
     __called: bool = False
@@ -167,8 +261,9 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
         :return: the currently running process
 
         """
-        if PROCESS_STACK.get():
-            return PROCESS_STACK.get()[-1]
+        scope = PROCESS_STACK.get()
+        if scope is not None:
+            return scope[0]
 
         return None
 
@@ -317,6 +412,12 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
         This method is called in :class:`plumpy.base.state_machine.StateMachineMeta`
         """
         self._cleanups = []  # a list of functions to be ran on terminated
+        self._mark_step_ready()
+
+        process_registry = registry.get_process_registry()
+        if process_registry is not None:
+            # A process launched from within a step of another process is considered a child of that process
+            process_registry.register(self, parent=Process.current())
 
         if self._communicator is not None:
             try:
@@ -326,8 +427,12 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
                 self.logger.exception('Process<%s>: failed to register as an RPC subscriber', self.pid)
 
             try:
-                # filter out state change broadcasts
-                subscriber = kiwipy.BroadcastFilter(self.broadcast_receive, subject=re.compile(r'^(?!state_changed).*'))
+                # only the intents are acted upon, this also filters out the state change broadcasts
+                subscriber = communications.RoutedBroadcastFilter(
+                    self.broadcast_receive,
+                    subjects=(process_comms.Intent.PLAY, process_comms.Intent.PAUSE, process_comms.Intent.KILL),
+                    recipient_id=self.pid,
+                )
                 identifier = self._communicator.add_broadcast_subscriber(subscriber, identifier=str(self.pid))
                 self.add_cleanup(functools.partial(self._communicator.remove_broadcast_subscriber, identifier))
             except kiwipy.TimeoutError:
@@ -347,6 +452,8 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
                         )
 
             self._future.add_done_callback(try_killing)
+            # Release the reference of the future to this process once it is closed, e.g. when it is hibernated
+            self.add_cleanup(functools.partial(self._future.remove_done_callback, try_killing))
 
     def _setup_event_hooks(self) -> None:
         """Set the event hooks to process, when it is created or loaded(recreated)."""
@@ -464,6 +571,10 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
         """Return whether the process was terminated."""
         return self._state.is_terminal()
 
+    def is_closed(self) -> bool:
+        """Return whether the process was closed, after which it can no longer be used."""
+        return self._closed
+
     def result(self) -> Any:
         """
         Get the result from the process if it is finished.
@@ -573,19 +684,16 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
         meaning that globally someone can ask for Process.current() to get the last process
         that is on the call stack.
         """
-        stack_copy = PROCESS_STACK.get().copy()
-        stack_copy.append(self)
-        PROCESS_STACK.set(stack_copy)
+        scope = (self, PROCESS_STACK.get())
+        PROCESS_STACK.set(scope)
         try:
             yield None
         finally:
-            assert Process.current() is self, (
+            assert PROCESS_STACK.get() is scope, (
                 'Somehow, the process at the top of the stack is not me, but another process! '
                 f'({self} != {Process.current()})'
             )
-            stack_copy = PROCESS_STACK.get().copy()
-            stack_copy.pop()
-            PROCESS_STACK.set(stack_copy)
+            PROCESS_STACK.set(scope[1])
 
     async def _run_task(self, callback: Callable[..., T], *args: Any, **kwargs: Any) -> T:
         """
@@ -600,7 +708,10 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
         # Make sure execute is a coroutine
         coro = utils.ensure_coroutine(callback)
         with self._process_scope():
-            result = await coro(*args, **kwargs)
+            if _STEPPING_SUBSCRIBERS:
+                result = await _publish_stepping(self, coro(*args, **kwargs))
+            else:
+                result = await coro(*args, **kwargs)
         return result
 
     # endregion
@@ -632,6 +743,9 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
         if self.outputs:
             out_state[BundleKeys.OUTPUTS] = self.encode_input_args(self.outputs)
 
+        if self._validate_inputs_pending:
+            out_state[BundleKeys.VALIDATE_INPUTS_PENDING] = True
+
     @protected
     def load_instance_state(self, saved_state: SAVED_STATE_TYPE, load_context: persistence.LoadSaveContext) -> None:
         """Load the process from its saved instance state.
@@ -686,6 +800,9 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
         except KeyError:
             self._outputs = {}
 
+        # The async validators of the inputs were deferred when the process was created and have not been awaited yet
+        self._validate_inputs_pending = saved_state.get(BundleKeys.VALIDATE_INPUTS_PENDING, False)
+
     # endregion
 
     def add_process_listener(self, listener: ProcessListener) -> None:
@@ -716,76 +833,75 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
 
     def on_entering(self, state: process_states.State) -> None:
         # Map these onto direct functions that the subclass can implement
-        state_label = state.LABEL
-        if state_label == process_states.ProcessState.CREATED:
-            call_with_super_check(self.on_create)
-        elif state_label == process_states.ProcessState.RUNNING:
-            call_with_super_check(self.on_run)
-        elif state_label == process_states.ProcessState.WAITING:
-            call_with_super_check(self.on_wait, state.data)  # type: ignore
-        elif state_label == process_states.ProcessState.FINISHED:
-            call_with_super_check(self.on_finish, state.result, state.successful)  # type: ignore
-        elif state_label == process_states.ProcessState.KILLED:
-            call_with_super_check(self.on_kill, state.msg)  # type: ignore
-        elif state_label == process_states.ProcessState.EXCEPTED:
-            call_with_super_check(self.on_except, state.get_exc_info())  # type: ignore
+        hook = _ENTERING_HOOKS.get(state.LABEL)
+        if hook is not None:
+            hook(self, state)
 
     def on_entered(self, from_state: Optional[process_states.State]) -> None:
         # Map these onto direct functions that the subclass can implement
-        state_label = self._state.LABEL
-        if state_label == process_states.ProcessState.RUNNING:
-            call_with_super_check(self.on_running)
-        elif state_label == process_states.ProcessState.WAITING:
-            call_with_super_check(self.on_waiting)
-        elif state_label == process_states.ProcessState.FINISHED:
-            call_with_super_check(self.on_finished)
-        elif state_label == process_states.ProcessState.EXCEPTED:
-            call_with_super_check(self.on_excepted)
-        elif state_label == process_states.ProcessState.KILLED:
-            call_with_super_check(self.on_killed)
+        hook = _ENTERED_HOOKS.get(self._state.LABEL)
+        if hook is not None:
+            call_with_super_check(getattr(self, hook))
+
+        collector = metrics.get_metrics()
+        if collector is not None:
+            collector.state_entered(self, from_state)
 
         if self._communicator and isinstance(self.state, enum.Enum):
-            from_label = cast(enum.Enum, from_state.LABEL).value if from_state is not None else None
-            subject = f'state_changed.{from_label}.{self.state.value}'
-            self.logger.info('Process<%s>: Broadcasting state change: %s', self.pid, subject)
+            self._broadcast_state_change(self._communicator, from_state, self.state.value)
+
+    def _broadcast_state_change(
+        self, communicator: kiwipy.Communicator, from_state: Optional[process_states.State], to_label: str
+    ) -> None:
+        """Broadcast the transition into the state ``to_label`` according to `settings.state_changed_broadcast`."""
+        policy = settings.state_changed_broadcast
+        if policy == process_comms.StateChangedBroadcast.NONE:
+            return
+
+        from_label = cast(enum.Enum, from_state.LABEL).value if from_state is not None else None
+
+        if policy == process_comms.StateChangedBroadcast.COALESCED:
+            coalescer = process_comms.get_state_change_coalescer(communicator)
+            coalescer.add(self.pid, from_label, to_label)
+        elif policy == process_comms.StateChangedBroadcast.ALL or (
+            policy == process_comms.StateChangedBroadcast.TERMINAL and self._state.is_terminal()
+        ):
+            subject = f'state_changed.{from_label}.{to_label}'
+            self.logger.debug('Process<%s>: Broadcasting state change: %s', self.pid, subject)
             try:
-                self._communicator.broadcast_send(body=None, sender=self.pid, subject=subject)
-            except (ConnectionClosed, ChannelInvalidStateError):
+                communicator.broadcast_send(body=None, sender=self.pid, subject=subject)
+            except _broker_connection_errors():
                 message = 'Process<%s>: no connection available to broadcast state change from %s to %s'
-                self.logger.warning(message, self.pid, from_label, self.state.value)
+                self.logger.warning(message, self.pid, from_label, to_label)
             except kiwipy.TimeoutError:
                 message = 'Process<%s>: sending broadcast of state change from %s to %s timed out'
-                self.logger.warning(message, self.pid, from_label, self.state.value)
+                self.logger.warning(message, self.pid, from_label, to_label)
 
     def on_exiting(self) -> None:
-        state = self.state
-        if state == process_states.ProcessState.WAITING:
-            call_with_super_check(self.on_exit_waiting)
-        elif state == process_states.ProcessState.RUNNING:
-            call_with_super_check(self.on_exit_running)
+        hook = _EXITING_HOOKS.get(self.state)
+        if hook is not None:
+            call_with_super_check(getattr(self, hook))
 
     @super_check
     def on_create(self) -> None:
         """Entering the CREATED state."""
         self._creation_time = time.time()
 
-        def recursively_copy_dictionaries(value: Any) -> Any:
-            """Recursively copy the mapping but only create copies of the dictionaries not the values."""
-            if isinstance(value, dict):
-                return {key: recursively_copy_dictionaries(subvalue) for key, subvalue in value.items()}
-            return value
-
-        # This will parse the inputs with respect to the input portnamespace of the spec and validate them. The
-        # ``pre_process`` method of the inputs port namespace modifies its argument in place, and since the
-        # ``_raw_inputs`` should not be modified, we pass a clone of it. Note that we only need a clone of the nested
-        # dictionaries, so we don't use ``copy.deepcopy`` (which might seem like the obvious choice) as that will also
-        # create a clone of the values, which we don't want.
-        raw_inputs = recursively_copy_dictionaries(dict(self._raw_inputs)) if self._raw_inputs else {}
-        self._parsed_inputs = self.spec().inputs.pre_process(raw_inputs)
-        result = self.spec().inputs.validate(self._parsed_inputs)
+        spec = self.spec()
 
-        if result is not None:
-            raise ValueError(result)
+        if spec.has_async_validators() and self.loop.is_running():
+            # The async validators cannot be run to completion by this hook while the loop is running, so only the
+            # defaults are filled in here and the validators are awaited before the first step, see ``step``.
+            self._parsed_inputs = spec.inputs.pre_process(ports.copy_nested_dicts(dict(self._raw_inputs or {})))
+            self._validate_inputs_pending = True
+        else:
+            # This will parse the inputs with respect to the input portnamespace of the spec, filling in the defaults,
+            # and validate them in a single pass, awaiting any async validators concurrently. The ``_raw_inputs`` are
+            # not modified.
+            self._parsed_inputs, result = spec.parse_inputs(self._raw_inputs, loop=self.loop)
+
+            if result is not None:
+                raise ValueError(result)
 
         # Set up a process ID
         self._uuid = uuid.uuid4()
@@ -815,6 +931,20 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
     def on_output_emitted(self, output_port: str, value: Any, dynamic: bool) -> None:
         self._event_helper.fire_event(ProcessListener.on_output_emitted, self, output_port, value, dynamic)
 
+    def on_outputs_emitted(self, outputs: Sequence[Tuple[str, Any, bool]]) -> None:
+        """Multiple outputs were emitted at once by :meth:`out_many`.
+
+        If a subclass overrides :meth:`on_output_emitted`, it is called for each output, otherwise the listeners are
+        notified of all outputs with a single event.
+
+        :param outputs: tuples of the name of the output port, the value and whether the port is dynamic
+        """
+        if type(self).on_output_emitted is not Process.on_output_emitted:
+            for output_port, value, dynamic in outputs:
+                self.on_output_emitted(output_port, value, dynamic)
+        else:
+            self._event_helper.fire_event(ProcessListener.on_outputs_emitted, self, outputs)
+
     @super_check
     def on_wait(self, awaitables: Sequence[Awaitable]) -> None:
         """Entering the WAITING state."""
@@ -849,6 +979,7 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
         # Done being paused
         if self._paused is not None:
             self._paused.set_result(True)
+            self._mark_step_ready()
         self._paused = None
 
         self.set_status(self._pre_paused_status)
@@ -954,6 +1085,19 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
             msg,
         )
 
+        collector = metrics.get_metrics()
+        if collector is None:
+            return self._act_on_message(msg)
+
+        return collector.observe_rpc(msg[process_comms.INTENT_KEY], time.perf_counter(), self._act_on_message(msg))
+
+    def _act_on_message(self, msg: MessageType) -> Any:
+        """
+        Act on the intent of an RPC message.
+
+        :param msg: the message
+        :return: the outcome of processing the message
+        """
         intent = msg[process_comms.INTENT_KEY]
 
         if intent == process_comms.Intent.PLAY:
@@ -1159,6 +1303,9 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
             do_pause = functools.partial(self._do_pause, exception.msg)
             return futures.CancellableAction(do_pause, cookie=exception)
 
+        if isinstance(exception, process_states.HibernateInterruption):
+            return futures.CancellableAction(lambda _next_state: self._do_hibernate(), cookie=exception)
+
         if isinstance(exception, process_states.KillInterruption):
 
             def do_kill(_next_state: process_states.State) -> Any:
@@ -1263,6 +1410,41 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
         """Return if the process is already being killed."""
         return self._killing is not None
 
+    def hibernate(self) -> Union[bool, futures.CancellableAction]:
+        """Release the process from memory while it is waiting, such that it can be continued from its checkpoint.
+
+        The process is closed, which removes its communicator subscriptions, and stops stepping. It is the
+        responsibility of the caller to checkpoint the process beforehand and to continue it from that checkpoint, see
+        :class:`plumpy.hibernation.HibernationManager`.
+
+        :return: True if the process was hibernated, False if it is not waiting, or a future if the process is
+            currently stepping and will hibernate once the step is interrupted
+        """
+        if self._hibernated:
+            return True
+
+        if self.state != process_states.ProcessState.WAITING or self.paused or self._interrupt_action is not None:
+            return False
+
+        if self._stepping:
+            interrupt_exception = process_states.HibernateInterruption()
+            self._set_interrupt_action_from_exception(interrupt_exception)
+            action = self._interrupt_action
+            self._state.interrupt(interrupt_exception)
+            return cast(futures.CancellableAction, action)
+
+        return self._do_hibernate()
+
+    @property
+    def hibernated(self) -> bool:
+        """Return whether the process was hibernated and should be continued from its checkpoint instead."""
+        return self._hibernated
+
+    def _do_hibernate(self) -> bool:
+        self._hibernated = True
+        self.close()
+        return True
+
     # endregion
 
     def create_initial_state(self) -> process_states.State:
@@ -1323,11 +1505,20 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
         if self.paused and self._paused is not None:
             await self._paused
 
+        profiler = profiling.get_step_profiler()
+
         try:
             self._stepping = True
             next_state = None
             try:
-                next_state = await self._run_task(self._state.execute)
+                if self._validate_inputs_pending:
+                    await self._validate_inputs()
+
+                if profiler is None:
+                    self._step_ready = None
+                    next_state = await self._run_task(self._state.execute)
+                else:
+                    next_state = await self._profile_step(profiler)
             except process_states.Interruption as exception:
                 # If the interruption was caused by a call to a Process method then there should
                 # be an interrupt action ready to be executed, so just check if the cookie matches
@@ -1356,6 +1547,63 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
             self._stepping = False
             self._set_interrupt_action(None)
 
+    async def _validate_inputs(self) -> None:
+        """Await the async validators of the inputs, which were deferred when the process was created on a running loop.
+
+        :raises ValueError: if the inputs are invalid
+        """
+        self._validate_inputs_pending = False
+        inputs = self.spec().inputs
+        result = await inputs.async_validate(self._parsed_inputs, max_concurrency=settings.validator_concurrency)
+
+        if result is not None:
+            raise ValueError(result)
+
+    def _mark_step_ready(self) -> None:
+        """Record that the next step is ready to run, because the process was created or woken up, when profiling.
+
+        The time until the step starts is recorded as its queue time, see :class:`plumpy.profiling.StepProfiler`.
+        """
+        if profiling.get_step_profiler() is not None:
+            self._step_ready = time.perf_counter()
+
+    def _get_step_functions(self) -> List[Callable[..., Any]]:
+        """Return the functions run by the current step of the process, outermost first."""
+        if isinstance(self._state, process_states.Running):
+            return [self._state.run_fn]
+        return []
+
+    def _get_profiled_step(self, state: process_states.State) -> Optional[str]:
+        """Return the name under which the step of the state is profiled, or None if it is not profiled.
+
+        Steps that are not profiled either record their own times, or are not time spent on the event loop, like the
+        ``WAITING`` state, whose step lasts until the process is resumed.
+        """
+        if isinstance(state, process_states.Running):
+            return state.run_fn.__name__
+        if isinstance(state, process_states.Waiting):
+            return None
+        return str(cast(enum.Enum, state.LABEL).value)
+
+    async def _profile_step(self, profiler: profiling.StepProfiler) -> process_states.State:
+        """Run the current step while recording its times with the profiler."""
+        state = self._state
+        step = self._get_profiled_step(state)
+
+        queue = time.perf_counter() - self._step_ready if self._step_ready is not None else None
+        self._step_ready = None
+
+        task = self._run_task(state.execute)
+        if step is None:
+            # The queue time is passed on to the first function of the step that records its own times, if any
+            self._step_queue = queue
+            try:
+                return cast(process_states.State, await task)
+            finally:
+                self._step_queue = None
+
+        return await profiler.profile(self.__class__.__qualname__, step, task, queue)
+
     async def step_until_terminated(self) -> None:
         """If the process has not terminated,
         run the current step and wait until the step finished.
@@ -1363,7 +1611,7 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
         This is the function run by the event loop (not ``step``).
 
         """
-        while not self.has_terminated():
+        while not self.has_terminated() and not self._hibernated:
             await self.step()
 
     # endregion
@@ -1382,40 +1630,80 @@ class Process(StateMachine, persistence.Savable, metaclass=ProcessStateMachineMe
         :raises: ValueError if the output value is not validated against the port
         """
         self.on_output_emitting(output_port, value)
+        namespace, port_name, dynamic = self._validate_output(output_port, value)
 
-        namespace_separator = self.spec().namespace_separator
+        output_namespace = self._outputs
+        if namespace:
+            for sub_space in namespace.split(self.spec().namespace_separator):
+                output_namespace = output_namespace.setdefault(sub_space, {})
 
-        namespace = output_port.split(namespace_separator)
-        port_name = namespace.pop()
+        output_namespace[port_name] = value
+        self.on_output_emitted(output_port, value, dynamic)
 
-        if namespace:
-            port_namespace = cast(
-                ports.PortNamespace,
-                self.spec().outputs.get_port(namespace_separator.join(namespace), create_dynamically=True),
-            )
-        else:
-            port_namespace = self.spec().outputs
+    @ensure_not_closed
+    @protected
+    def out_many(self, outputs: Mapping[str, Any], namespace: Optional[str] = None) -> None:
+        """
+        Record the output values for multiple output ports at once. Each value is validated like it is by :meth:`out`,
+        but the values are only recorded once all of them are valid, after which :meth:`on_outputs_emitted` is called
+        once for all of them.
 
-        validation_error = None
-        try:
-            port = port_namespace[port_name]
+        :param outputs: a mapping of the names of the output ports, which can be namespaced, onto their values
+        :param namespace: optional namespace in which the output ports are to be found
+        :raises: ValueError if any of the output values is not validated against its port
+        """
+        prefix = f'{namespace}{self.spec().namespace_separator}' if namespace else ''
+        validated = []
+
+        for name, value in outputs.items():
+            output_port = f'{prefix}{name}'
+            self.on_output_emitting(output_port, value)
+            validated.append((output_port, value, self._validate_output(output_port, value)))
+
+        separator = self.spec().namespace_separator
+        output_namespaces: Dict[str, Dict[str, Any]] = {'': self._outputs}
+        emitted = []
+
+        for output_port, value, (port_namespace, port_name, dynamic) in validated:
+            try:
+                output_namespace = output_namespaces[port_namespace]
+            except KeyError:
+                output_namespace = self._outputs
+                for sub_space in port_namespace.split(separator):
+                    output_namespace = output_namespace.setdefault(sub_space, {})
+                output_namespaces[port_namespace] = output_namespace
+
+            output_namespace[port_name] = value
+            emitted.append((output_port, value, dynamic))
+
+        self.on_outputs_emitted(emitted)
+
+    def _validate_output(self, output_port: str, value: Any) -> Tuple[str, str, bool]:
+        """
+        Validate an output value against its output port, or the dynamic properties of its namespace.
+
+        :param output_port: the name of the output port, can be namespaced
+        :param value: the value for the output port
+        :return: tuple of the namespace of the output port, its name and whether it is dynamic
+        :raises: ValueError if the output value is not validated against the port
+        """
+        spec = self.spec()
+        namespace, _, port_name = output_port.rpartition(spec.namespace_separator)
+        port_namespace = spec.get_output_namespace(namespace)
+
+        port = port_namespace.get(port_name)
+        if port is not None:
             dynamic = False
             validation_error = port.validate(value)
-        except KeyError:
-            port = port_namespace
+        else:
             dynamic = True
-            validation_error = port.validate_dynamic_ports({port_name: value})
+            validation_error = port_namespace.validate_dynamic_ports({port_name: value})
 
         if validation_error:
             msg = f"Error validating output '{value}' for port '{validation_error.port}': {validation_error.message}"
             raise ValueError(msg)
 
-        output_namespace = self._outputs
-        for sub_space in namespace:
-            output_namespace = output_namespace.setdefault(sub_space, {})
-
-        output_namespace[port_name] = value
-        self.on_output_emitted(output_port, value, dynamic)
+        return namespace, port_name, dynamic
 
     @protected
     def encode_input_args(self, inputs: Any) -> Any:
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""Profiling of the steps of processes, aggregated in histograms per process class and step."""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import math
+import time
+from typing import Any, Awaitable, Dict, Generator, Iterator, List, Optional, Sequence, Tuple
+
+__all__ = ['Histogram', 'StepProfiler', 'get_step_profiler', 'set_step_profiler']
+
+# The upper bounds, in seconds, of the buckets of the histograms of the step times
+DEFAULT_BUCKETS: Tuple[float, ...] = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+
+STEP_KEY_TYPE = Tuple[str, str]
+
+
+class Histogram:
+    """Histogram of observed values in buckets with fixed upper bounds, the last bucket holding the values above all."""
+
+    __slots__ = ('buckets', 'count', 'counts', 'maximum', 'total')
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Add a value to the histogram.
+
+        :param value: the value
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(value, self.maximum)
+
+    def quantile(self, fraction: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket it falls in, or the maximum if it is in the last bucket.
+
+        :param fraction: the fraction of values below the quantile, between 0 and 1
+        :return: the estimate, which is 0 if no values were observed
+        """
+        if not self.count:
+            return 0.0
+
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for bucket, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket, self.maximum)
+
+        return self.maximum
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the state of the histogram as a dictionary."""
+        return {
+            'buckets': self.buckets,
+            'counts': list(self.counts),
+            'count': self.count,
+            'sum': self.total,
+            'max': self.maximum,
+        }
+
+
+class _StepStats:
+    """The histograms of the wall, CPU and queue times of one step."""
+
+    __slots__ = ('cpu', 'queue', 'wall')
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.wall = Histogram(buckets)
+        self.cpu = Histogram(buckets)
+        self.queue = Histogram(buckets)
+
+
+class _TimedAwaitable:
+    """
+    Awaitable that drives another one and measures the CPU time of the slices in which it runs.
+
+    Measuring the CPU time of the thread around the whole awaitable would also include the time of the other tasks that
+    run on the loop while it is suspended.
+    """
+
+    __slots__ = ('_awaitable', 'cpu')
+
+    def __init__(self, awaitable: Awaitable[Any]) -> None:
+        self._awaitable = awaitable
+        self.cpu = 0.0
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        iterator = self._awaitable.__await__()
+        value: Any = None
+        error: Optional[BaseException] = None
+
+        while True:
+            start = time.thread_time()
+            try:
+                if error is not None:
+                    yielded = iterator.throw(error)
+                else:
+                    yielded = iterator.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.cpu += time.thread_time() - start
+
+            value, error = None, None
+            try:
+                value = yield yielded
+            except GeneratorExit:
+                iterator.close()
+                raise
+            except BaseException as exception:
+                error = exception
+
+
+class StepProfiler:
+    """
+    Profiler of the steps of processes, recording the wall time, the CPU time and the time spent waiting to be run.
+
+    The times are aggregated in histograms keyed by the name of the process class and of the step. The step of a
+    process is the execution of its current state, named after the function that is run in the ``RUNNING`` state or
+    else after the state. The steps of the outline of a work chain are recorded under their function name, instead of
+    the ``RUNNING`` states that run them. The ``WAITING`` state is not recorded, as its step lasts until the process is
+    resumed, which is not time spent on the event loop.
+
+    The queue time of a step is the time from the moment the process became ready to run, because it was created, played
+    or resumed from waiting, until the step starts, which includes the time the event loop takes to schedule it. Steps
+    that directly follow the previous step of the same process do not wait to be scheduled and have no queue time. For a
+    work chain, the queue time is recorded for the first function of the outline that is called in a ``RUNNING`` step.
+
+    Processes only record their steps while a profiler is set with :func:`set_step_profiler`.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """
+        :param buckets: the upper bounds, in seconds, of the buckets of the histograms
+        """
+        self._buckets = tuple(buckets)
+        self._stats: Dict[STEP_KEY_TYPE, _StepStats] = {}
+
+    def record(self, process_class: str, step: str, wall: float, cpu: float, queue: Optional[float] = None) -> None:
+        """
+        Record the times of a step.
+
+        :param process_class: the name of the process class
+        :param step: the name of the step
+        :param wall: the wall time of the step in seconds
+        :param cpu: the CPU time of the step in seconds
+        :param queue: the time the step waited to be run in seconds, if known
+        """
+        try:
+            stats = self._stats[(process_class, step)]
+        except KeyError:
+            stats = self._stats[(process_class, step)] = _StepStats(self._buckets)
+
+        stats.wall.observe(wall)
+        stats.cpu.observe(cpu)
+        if queue is not None:
+            stats.queue.observe(queue)
+
+    @contextlib.contextmanager
+    def measure(self, process_class: str, step: str, queue: Optional[float] = None) -> Iterator[None]:
+        """
+        Context manager that records the wall and CPU time of the synchronous step run in its body.
+
+        :param process_class: the name of the process class
+        :param step: the name of the step
+        :param queue: the time the step waited to be run in seconds, if known
+        """
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(process_class, step, time.perf_counter() - wall, time.thread_time() - cpu, queue)
+
+    async def profile(
+        self, process_class: str, step: str, awaitable: Awaitable[Any], queue: Optional[float] = None
+    ) -> Any:
+        """
+        Await the step and record its times, where the CPU time only counts the slices in which the step itself runs.
+
+        :param process_class: the name of the process class
+        :param step: the name of the step
+        :param awaitable: the awaitable of the step
+        :param queue: the time the step waited to be run in seconds, if known
+        :return: the result of the awaitable
+        """
+        timed = _TimedAwaitable(awaitable)
+        wall = time.perf_counter()
+        try:
+            return await timed
+        finally:
+            self.record(process_class, step, time.perf_counter() - wall, timed.cpu, queue)
+
+    def reset(self) -> None:
+        """Discard all the recorded times."""
+        self._stats = {}
+
+    def snapshot(self) -> Dict[STEP_KEY_TYPE, Dict[str, Dict[str, Any]]]:
+        """
+        Return a copy of the histograms of all steps.
+
+        :return: for each tuple of the process class and step name, the snapshots of the ``wall``, ``cpu`` and
+            ``queue`` histograms
+        """
+        return {
+            key: {'wall': stats.wall.snapshot(), 'cpu': stats.cpu.snapshot(), 'queue': stats.queue.snapshot()}
+            for key, stats in self._stats.items()
+        }
+
+    def report(self) -> str:
+        """Return a table of the steps, in descending order of their total wall time, with estimated quantiles."""
+        header = ('process', 'step', 'count', 'wall', 'wall p50', 'wall p99', 'wall max', 'cpu', 'queue p99')
+        rows: List[Tuple[str, ...]] = [header]
+
+        for (process_class, step), stats in sorted(self._stats.items(), key=lambda item: -item[1].wall.total):
+            rows.append(
+                (
+                    process_class,
+                    step,
+                    str(stats.wall.count),
+                    _format_seconds(stats.wall.total),
+                    _format_seconds(stats.wall.quantile(0.5)),
+                    _format_seconds(stats.wall.quantile(0.99)),
+                    _format_seconds(stats.wall.maximum),
+                    _format_seconds(stats.cpu.total),
+                    _format_seconds(stats.queue.quantile(0.99)) if stats.queue.count else '-',
+                )
+            )
+
+        widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+        lines = []
+        for row in rows:
+            cells = [
+                cell.ljust(width) if column < 2 else cell.rjust(width)
+                for column, (cell, width) in enumerate(zip(row, widths))
+            ]
+            lines.append('  '.join(cells).rstrip())
+
+        return '\n'.join(lines)
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:.0f}us'
+    if seconds < 1.0:
+        return f'{seconds * 1e3:.1f}ms'
+    return f'{seconds:.2f}s'
+
+
+STEP_PROFILER: Optional[StepProfiler] = None
+
+
+def get_step_profiler() -> Optional[StepProfiler]:
+    """
+    Get the global step profiler
+
+    :return: the step profiler or None if the steps of processes are not profiled
+    """
+    return STEP_PROFILER
+
+
+def set_step_profiler(profiler: Optional[StepProfiler]) -> None:
+    """
+    Set the global step profiler, which enables profiling of the steps of all processes, or disable it by passing None
+
+    :param profiler: a step profiler or None
+    """
+    global STEP_PROFILER  # noqa: PLW0603
+    STEP_PROFILER = profiler
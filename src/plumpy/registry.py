@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""A registry of the live processes of a worker, indexed by state, class and parent."""
+
+from __future__ import annotations
+
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Iterator, List, Optional, Set, Tuple, Type
+
+from .base import state_machine
+from .utils import PID_TYPE
+
+if TYPE_CHECKING:
+    from .processes import Process
+
+__all__ = ['ProcessRegistry', 'get_process_registry', 'set_process_registry']
+
+
+class _Entry:
+    """The registration of a process, holding the keys of the indexes it is in."""
+
+    __slots__ = ('parent', 'process_class', 'ref', 'state')
+
+    def __init__(
+        self, ref: weakref.ref, process_class: Type['Process'], state: Hashable, parent: Optional[PID_TYPE]
+    ) -> None:
+        self.ref = ref
+        self.process_class = process_class
+        self.state = state
+        self.parent = parent
+
+
+class ProcessRegistry:
+    """
+    Registry of live processes, indexed by their state label, their class and the pid of their parent.
+
+    The processes are held by weak reference, so the registry does not extend their lifetime and a process is removed
+    once it is garbage collected. The state index is kept up to date through the state event hooks of the processes.
+    Since terminated and closed processes stay registered for as long as they are referenced, the registry can also be
+    used to find processes that are leaked.
+
+    The garbage collector can run at any allocation, including while the indexes are iterated, so the weak reference
+    callbacks only queue the removal of a collected process, which is applied at the start of the next operation.
+
+    Processes only register themselves while a registry is set with :func:`set_process_registry`.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[PID_TYPE, _Entry] = {}
+        self._by_state: Dict[Hashable, Set[PID_TYPE]] = {}
+        self._by_class: Dict[Type['Process'], Set[PID_TYPE]] = {}
+        self._by_parent: Dict[Optional[PID_TYPE], Set[PID_TYPE]] = {}
+        self._pending_removals: List[Tuple[PID_TYPE, weakref.ref]] = []
+
+    def __len__(self) -> int:
+        self._purge()
+        return len(self._entries)
+
+    def __contains__(self, pid: PID_TYPE) -> bool:
+        self._purge()
+        return pid in self._entries
+
+    def __iter__(self) -> Iterator['Process']:
+        return self.processes()
+
+    def register(self, process: 'Process', parent: Optional['Process'] = None) -> None:
+        """
+        Register the process, replacing any other process with the same pid.
+
+        :param process: the process
+        :param parent: the parent of the process, if any
+        """
+        pid = process.pid
+        self.unregister(pid)
+
+        pending_removals = self._pending_removals
+        ref = weakref.ref(process, lambda ref: pending_removals.append((pid, ref)))
+        entry = _Entry(ref, process.__class__, process.state, parent.pid if parent is not None else None)
+        self._entries[pid] = entry
+        self._by_state.setdefault(entry.state, set()).add(pid)
+        self._by_class.setdefault(entry.process_class, set()).add(pid)
+        self._by_parent.setdefault(entry.parent, set()).add(pid)
+
+        process.add_state_event_callback(state_machine.StateEventHook.ENTERED_STATE, self._state_entered)
+
+    def unregister(self, pid: PID_TYPE) -> None:
+        """
+        Remove the process with the given pid from the registry, if it is registered.
+
+        :param pid: the pid of the process
+        """
+        self._purge()
+        entry = self._entries.get(pid)
+        if entry is not None:
+            self._remove(pid, entry.ref)
+
+    def get(self, pid: PID_TYPE) -> Optional['Process']:
+        """
+        Return the registered process with the given pid.
+
+        :param pid: the pid of the process
+        :return: the process or None if it is not registered
+        """
+        entry = self._entries.get(pid)
+        return entry.ref() if entry is not None else None
+
+    def count(
+        self,
+        state: Optional[Hashable] = None,
+        process_class: Optional[Type['Process']] = None,
+        parent: Optional[PID_TYPE] = None,
+    ) -> int:
+        """
+        Return the number of registered processes matching all of the given criteria.
+
+        The count for a single criterion is a constant time lookup.
+
+        :param state: the label of the state of the processes
+        :param process_class: the exact class of the processes
+        :param parent: the pid of the parent of the processes
+        :return: the number of processes
+        """
+        self._purge()
+        pids = self._select(state, process_class, parent)
+        if pids is None:
+            return len(self._entries)
+        if isinstance(pids, set):
+            return len(pids)
+        return sum(1 for _ in pids)
+
+    def processes(
+        self,
+        state: Optional[Hashable] = None,
+        process_class: Optional[Type['Process']] = None,
+        parent: Optional[PID_TYPE] = None,
+    ) -> Iterator['Process']:
+        """
+        Iterate over the registered processes matching all of the given criteria.
+
+        :param state: the label of the state of the processes
+        :param process_class: the exact class of the processes
+        :param parent: the pid of the parent of the processes
+        :return: an iterator over the processes
+        """
+        self._purge()
+        pids = self._select(state, process_class, parent)
+        for pid in list(self._entries if pids is None else pids):
+            process = self.get(pid)
+            if process is not None:
+                yield process
+
+    def counts_by_state(self) -> Dict[Hashable, int]:
+        """Return the number of registered processes for each state label."""
+        self._purge()
+        return {state: len(pids) for state, pids in self._by_state.items() if pids}
+
+    def counts_by_class(self) -> Dict[Type['Process'], int]:
+        """Return the number of registered processes for each process class."""
+        self._purge()
+        return {process_class: len(pids) for process_class, pids in self._by_class.items() if pids}
+
+    def closed(self) -> List['Process']:
+        """Return the registered processes that were closed but are still referenced and so are possibly leaked."""
+        return [process for process in self.processes() if process.is_closed()]
+
+    def _select(
+        self, state: Optional[Hashable], process_class: Optional[Type['Process']], parent: Optional[PID_TYPE]
+    ) -> Any:
+        """Return the pids matching the criteria, as a set for a single criterion or else an iterable."""
+        indexes = []
+        if state is not None:
+            indexes.append(self._by_state.get(state, set()))
+        if process_class is not None:
+            indexes.append(self._by_class.get(process_class, set()))
+        if parent is not None:
+            indexes.append(self._by_parent.get(parent, set()))
+
+        if not indexes:
+            return None
+        if len(indexes) == 1:
+            return indexes[0]
+
+        # Iterate over the smallest index and check membership of the others
+        indexes.sort(key=len)
+        smallest, others = indexes[0], indexes[1:]
+        return [pid for pid in smallest if all(pid in index for index in others)]
+
+    def _state_entered(self, machine: state_machine.StateMachine, _hook: Hashable, _state: Any) -> None:
+        self._purge()
+        entry = self._entries.get(machine.pid)  # type: ignore[attr-defined]
+        if entry is None or entry.ref() is not machine:
+            return
+
+        state = machine.state
+        if state != entry.state:
+            self._discard(self._by_state, entry.state, machine.pid)  # type: ignore[attr-defined]
+            self._by_state.setdefault(state, set()).add(machine.pid)  # type: ignore[attr-defined]
+            entry.state = state
+
+    def _purge(self) -> None:
+        """Apply the removals of the collected processes that were queued by their weak reference callbacks."""
+        pending_removals = self._pending_removals
+        while pending_removals:
+            self._remove(*pending_removals.pop())
+
+    def _remove(self, pid: PID_TYPE, ref: weakref.ref) -> None:
+        entry = self._entries.get(pid)
+        if entry is None or entry.ref is not ref:
+            # The process was already replaced by another one with the same pid
+            return
+
+        del self._entries[pid]
+        self._discard(self._by_state, entry.state, pid)
+        self._discard(self._by_class, entry.process_class, pid)
+        self._discard(self._by_parent, entry.parent, pid)
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[PID_TYPE]], key: Any, pid: PID_TYPE) -> None:
+        pids = index.get(key)
+        if pids is not None:
+            pids.discard(pid)
+            if not pids:
+                del index[key]
+
+
+PROCESS_REGISTRY: Optional[ProcessRegistry] = None
+
+
+def get_process_registry() -> Optional[ProcessRegistry]:
+    """
+    Get the global process registry
+
+    :return: the process registry or None if processes do not register themselves
+    """
+    return PROCESS_REGISTRY
+
+
+def set_process_registry(registry: Optional[ProcessRegistry]) -> None:
+    """
+    Set the global process registry, in which all processes that are created from then on register themselves, or
+    disable the registration by passing None
+
+    :param registry: a process registry or None
+    """
+    global PROCESS_REGISTRY  # noqa: PLW0603
+    PROCESS_REGISTRY = registry
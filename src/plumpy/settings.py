@@ -1,3 +1,9 @@
 # -*- coding: utf-8 -*-
 check_protected: bool = False
 check_override: bool = False
+# The policy for the broadcasts that processes send on state changes, see `process_comms.StateChangedBroadcast`
+state_changed_broadcast: str = 'all'
+# The number of seconds over which state changes are collected when the policy is `coalesced`
+state_changed_window: float = 0.1
+# The maximum number of coroutine validators of ports that are awaited concurrently when validating process inputs
+validator_concurrency: int = 8
@@ -11,6 +11,7 @@ from typing import (
     Any,
     Awaitable,
     Callable,
+    Dict,
     Hashable,
     Iterator,
     List,
@@ -18,6 +19,7 @@ from typing import (
     Optional,
     Tuple,
     Type,
+    TypeVar,
 )
 
 from . import lang
@@ -33,6 +35,8 @@ _LOGGER = logging.getLogger(__name__)
 SAVED_STATE_TYPE = MutableMapping[str, Any]
 PID_TYPE = Hashable
 
+FrozendictType = TypeVar('FrozendictType', bound='Frozendict')
+
 
 class Frozendict(Mapping):
     """
@@ -46,6 +50,13 @@ class Frozendict(Mapping):
         self._dict = dict(*args, **kwargs)
         self._hash: Optional[int] = None
 
+    @classmethod
+    def _wrap(cls: Type[FrozendictType], dictionary: Dict[str, Any]) -> FrozendictType:
+        """Create an instance that takes ownership of the given dictionary instead of copying it."""
+        instance = cls()
+        instance._dict = dictionary
+        return instance
+
     def __getitem__(self, key: str) -> Any:
         return self._dict[key]
 
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""Watchdog of the lag of the event loop and of the steps of processes that block it."""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import inspect
+import logging
+import sys
+import threading
+import time
+import traceback
+import types
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from .processes import STEPPING_PROCESSES, Process, subscribe_stepping
+from .profiling import Histogram
+from .utils import PID_TYPE
+
+__all__ = ['LoopWatchdog', 'SlowStep']
+
+_LOGGER = logging.getLogger(__name__)
+
+# The upper bounds, in seconds, of the buckets of the histogram of the loop lag
+LAG_BUCKETS: Tuple[float, ...] = (1e-3, 1e-2, 5e-2, 1e-1, 5e-1, 1.0, 5.0, 10.0)
+
+
+class SlowStep(NamedTuple):
+    """A report of the event loop being blocked, by the step of a process if one was found on the stack."""
+
+    pid: Optional[PID_TYPE]
+    process_class: Optional[str]
+    step: Optional[str]
+    duration: float
+    stack: str
+
+
+class LoopWatchdog:
+    """
+    Watchdog that measures the lag of the event loop and reports the steps that block it for longer than a threshold.
+
+    A periodic timer on the loop records how late it is called into a histogram. A helper thread checks that the timer
+    keeps running and, once the loop has been blocked for longer than the threshold, samples the stack of the loop
+    thread through :func:`sys._current_frames` to find the process that is running and its current step. Since all
+    processes share the loop, a slow synchronous step otherwise only shows as delayed RPC replies and heartbeats.
+
+    The step is found by matching the code of the sampled frames against the step functions of the processes that the
+    loop thread publishes in :data:`plumpy.processes.STEPPING_PROCESSES` while their steps execute, as the local
+    variables of the frames of another thread cannot be read safely. The steps are only published while a watchdog runs.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 1.0,
+        interval: Optional[float] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        max_reports: int = 100,
+    ) -> None:
+        """
+        :param threshold: the number of seconds the loop can be blocked or lag before it is reported
+        :param interval: the number of seconds between ticks of the timer, defaults to a quarter of the threshold
+        :param loop: the event loop to watch
+        :param max_reports: the number of most recent slow steps that are kept
+        """
+        self._threshold = threshold
+        self._interval = threshold / 4 if interval is None else interval
+        self._loop = loop or asyncio.get_event_loop()
+        self._lag = Histogram(LAG_BUCKETS)
+        self._slow_steps: Deque[SlowStep] = collections.deque(maxlen=max_reports)
+        self._slow_step_count = 0
+
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._expected = 0.0
+        # The monotonic time of the last tick, which is read by the helper thread
+        self._heartbeat = 0.0
+        self._reported = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._thread_id: Optional[int] = None
+        self._stopped = threading.Event()
+
+    @property
+    def slow_steps(self) -> List[SlowStep]:
+        """Return the most recent reports of the loop being blocked, oldest first."""
+        return list(self._slow_steps)
+
+    def is_running(self) -> bool:
+        """Return whether the watchdog is running."""
+        return self._handle is not None
+
+    def start(self) -> None:
+        """Start watching the loop, which should be called from the thread that runs the loop."""
+        if self._handle is not None:
+            return
+
+        self._thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._schedule()
+        subscribe_stepping()
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._watch, name='plumpy-watchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching the loop."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+            subscribe_stepping(False)
+
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the metrics of the watchdog.
+
+        :return: the histogram snapshot of the loop lag in seconds, the total number of slow steps and the most recent
+            slow steps as dictionaries
+        """
+        return {
+            'lag': self._lag.snapshot(),
+            'slow_steps': self._slow_step_count,
+            'recent_slow_steps': [slow_step._asdict() for slow_step in self._slow_steps],
+        }
+
+    def sample(self) -> SlowStep:
+        """Sample the stack of the loop thread and return the process that is running in it, if any."""
+        thread_id = self._thread_id
+        frame = sys._current_frames().get(thread_id) if thread_id is not None else None
+        duration = max(0.0, time.monotonic() - self._heartbeat - self._interval)
+        if frame is None or thread_id is None:
+            return SlowStep(None, None, None, duration, '')
+
+        stack = ''.join(traceback.format_stack(frame))
+        process, step = _find_step(frame, thread_id)
+        if process is None:
+            return SlowStep(None, None, None, duration, stack)
+
+        return SlowStep(process.pid, process.__class__.__qualname__, step, duration, stack)
+
+    def _schedule(self) -> None:
+        self._expected = self._loop.time() + self._interval
+        self._handle = self._loop.call_later(self._interval, self._tick)
+
+    def _tick(self) -> None:
+        self._heartbeat = time.monotonic()
+        lag = max(0.0, self._loop.time() - self._expected)
+        self._lag.observe(lag)
+        if lag > self._threshold:
+            _LOGGER.warning('event loop lagged %.3fs behind', lag)
+
+        self._schedule()
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self._interval):
+            heartbeat = self._heartbeat
+            if heartbeat == self._reported or time.monotonic() - heartbeat - self._interval <= self._threshold:
+                continue
+
+            # Only report each stall of the loop once
+            self._reported = heartbeat
+            slow_step = self.sample()
+            self._slow_steps.append(slow_step)
+            self._slow_step_count += 1
+            _LOGGER.warning(
+                'event loop blocked for more than %.3fs by Process<%s> (%s) in step `%s`:\n%s',
+                slow_step.duration,
+                slow_step.pid,
+                slow_step.process_class,
+                slow_step.step,
+                slow_step.stack,
+            )
+
+
+def _find_step(frame: Optional[types.FrameType], thread_id: int) -> Tuple[Optional[Process], Optional[str]]:
+    """
+    Return the process whose step is running in the frame or its callers and the name of the function of the step.
+
+    Only the code of the frames is read. If no frame runs the step function of a process that is executing a step, for
+    example because the loop is blocked outside of a step, no process is returned. If several processes that are
+    executing a step run the same function, which can only be the case if one of them runs the others, the frame is
+    attributed to one of them.
+
+    :param frame: the innermost frame of the stack to search
+    :param thread_id: the identifier of the thread whose stack it is
+    """
+    # Copying the values is atomic, so it does not race with the thread adding or removing processes
+    processes = [process for ident, process in tuple(STEPPING_PROCESSES.values()) if ident == thread_id]
+
+    steps: Dict[types.CodeType, Process] = {}
+    for process in processes:
+        for function in process._get_step_functions():
+            # Skip the wrappers of decorators, such as the one that makes the function a coroutine, as they share code
+            code = getattr(inspect.unwrap(function), '__code__', None)
+            if code is not None:
+                steps[code] = process
+
+    while frame is not None:
+        stepping = steps.get(frame.f_code)
+        if stepping is not None:
+            return stepping, frame.f_code.co_name
+        frame = frame.f_back
+
+    return None, None
@@ -25,7 +25,7 @@ from typing import (
 
 import kiwipy
 
-from . import lang, mixins, persistence, process_states, processes
+from . import lang, mixins, persistence, process_states, processes, profiling
 from .utils import PID_TYPE, SAVED_STATE_TYPE
 
 __all__ = ['ToContext', 'WorkChain', 'WorkChainSpec', 'if_', 'return_', 'while_']
@@ -36,14 +36,17 @@ PREDICATE_TYPE = Callable[['WorkChain'], bool]
 WC_COMMAND_TYPE = Callable[['WorkChain'], Any]
 EXIT_CODE_TYPE = int
 
+# Newlines and the indentation that follows them, which are collapsed in the descriptions of outline steps
+_NEWLINE_INDENTATION = re.compile(r'\n\s*')
+
 
 class WorkChainSpec(processes.ProcessSpec):
     def __init__(self) -> None:
         super().__init__()
         self._outline: Optional[Union['_Instruction', '_FunctionCall']] = None
 
-    def get_description(self) -> Dict[str, str]:
-        description = super().get_description()
+    def _build_description(self) -> Dict[str, Any]:
+        description = super()._build_description()
 
         if self._outline:
             description['outline'] = self._outline.get_description()
@@ -63,6 +66,8 @@ class WorkChainSpec(processes.ProcessSpec):
             # There are multiple instructions
             self._outline = _Block(commands)
 
+        self._spec_changed()
+
     def get_outline(self) -> Union['_Instruction', '_FunctionCall']:
         assert self._outline is not None, 'outline not yet loaded'
         return self._outline
@@ -72,6 +77,8 @@ class WorkChainSpec(processes.ProcessSpec):
 class Waiting(process_states.Waiting):
     """Overwrite the waiting state"""
 
+    __slots__ = ('_awaiting',)
+
     def __init__(
         self,
         process: 'WorkChain',
@@ -95,6 +102,30 @@ class Waiting(process_states.Waiting):
         for awaitable in self._awaiting:
             awaitable.remove_done_callback(self._awaitable_done)
 
+    def detach_awaitables(self) -> Dict[asyncio.Future, str]:
+        """
+        Stop waiting on the awaitables, for example to checkpoint the state, since the awaitables cannot be persisted.
+
+        :return: the awaitables that were not yet done, mapped onto the context keys their results are assigned to
+        """
+        awaiting = self._awaiting
+        if self.in_state:
+            for awaitable in awaiting:
+                awaitable.remove_done_callback(self._awaitable_done)
+        self._awaiting = {}
+        self.data = None
+        return awaiting
+
+    def attach_awaitables(self, awaiting: Dict[asyncio.Future, str]) -> None:
+        """
+        Wait on the awaitables again, for example when continuing from a checkpoint made after `detach_awaitables`.
+
+        :param awaiting: the awaitables mapped onto the context keys their results are assigned to
+        """
+        self._awaiting.update(awaiting)
+        for awaitable in awaiting:
+            awaitable.add_done_callback(self._awaitable_done)
+
     def _awaitable_done(self, awaitable: asyncio.Future) -> None:
         key = self._awaiting.pop(awaitable)
         try:
@@ -104,6 +135,7 @@ class Waiting(process_states.Waiting):
         else:
             if not self._awaiting:
                 self._waiting_future.set_result(lang.NULL)
+                self.process._mark_step_ready()  # type: ignore[attr-defined]
 
 
 class WorkChain(mixins.ContextMixin, processes.Process):
@@ -116,6 +148,11 @@ class WorkChain(mixins.ContextMixin, processes.Process):
     _STEPPER_STATE = 'stepper_state'
     _CONTEXT = 'CONTEXT'
 
+    # The maximum number of consecutive outline steps that are run within a single RUNNING state. By default, each step
+    # is run in its own RUNNING state, but for outlines with many cheap steps the overhead of the state transitions
+    # in between can be avoided by increasing this number. See `should_checkpoint` to end a run of steps early.
+    MAX_FUSED_STEPS: int = 1
+
     @classmethod
     def get_state_classes(cls) -> Dict[Hashable, Type[process_states.State]]:
         states_map = super().get_state_classes()
@@ -174,25 +211,62 @@ class WorkChain(mixins.ContextMixin, processes.Process):
     async def run(self) -> Any:
         return self._do_step()
 
+    def should_checkpoint(self, steps: int) -> bool:
+        """
+        Return whether to end the current run of fused steps, such that the next step is run in a new RUNNING state.
+
+        This is only called when `MAX_FUSED_STEPS` is larger than one. The transition to the new RUNNING state fires
+        the state hooks and listeners, which can for example be used to persist the process after a particular step.
+
+        :param steps: the number of steps run so far within the current RUNNING state
+        :return: True to end the run of fused steps, False otherwise
+        """
+        return False
+
+    def _get_step_functions(self) -> List[Callable[..., Any]]:
+        functions = super()._get_step_functions()
+        # Follow the steppers of the outline down to the function that is being called, if any
+        stepper: Any = self._stepper
+        while stepper is not None:
+            if isinstance(stepper, _FunctionStepper):
+                functions.append(stepper._fn)
+                break
+            stepper = getattr(stepper, '_child_stepper', None)
+        return functions
+
+    def _get_profiled_step(self, state: process_states.State) -> Optional[str]:
+        # The functions of the outline that are run in the ``RUNNING`` state record their own times
+        if isinstance(state, process_states.Running):
+            return None
+        return super()._get_profiled_step(state)
+
     def _do_step(self) -> Any:
         assert self._stepper is not None
-        self._awaitables = {}
+        steps = 0
 
-        try:
-            finished, return_value = self._stepper.step()
-        except _PropagateReturn as exception:
-            finished, return_value = True, exception.exit_code
+        while True:
+            self._awaitables = {}
+
+            try:
+                finished, return_value = self._stepper.step()
+            except _PropagateReturn as exception:
+                finished, return_value = True, exception.exit_code
+
+            if finished or not (return_value is None or isinstance(return_value, ToContext)):
+                return return_value
 
-        if not finished and (return_value is None or isinstance(return_value, ToContext)):
             if isinstance(return_value, ToContext):
                 self.to_context(**return_value)
 
             if self._awaitables:
                 return process_states.Wait(self._do_step, 'Waiting before next step', self._awaitables)
 
-            return process_states.Continue(self._do_step)
+            steps += 1
 
-        return return_value
+            # Continue with the next step within this RUNNING state, unless the budget of steps is used up, the process
+            # was asked to pause or be killed by the step, or a checkpoint is required
+            if steps >= self.MAX_FUSED_STEPS or self._interrupt_action is not None or self.should_checkpoint(steps):
+                return process_states.Continue(self._do_step)
 
 
 class Stepper(persistence.Savable, metaclass=abc.ABCMeta):
@@ -255,7 +329,14 @@ class _FunctionStepper(Stepper):
         self._fn = getattr(self._workchain.__class__, saved_state['_fn'])
 
     def step(self) -> Tuple[bool, Any]:
-        return True, self._fn(self._workchain)
+        profiler = profiling.get_step_profiler()
+        if profiler is None:
+            return True, self._fn(self._workchain)
+
+        # Only the first function that is called in a step waited for the step to be scheduled
+        queue, self._workchain._step_queue = self._workchain._step_queue, None
+        with profiler.measure(self._workchain.__class__.__qualname__, self._fn.__name__, queue):
+            return True, self._fn(self._workchain)
 
     def __str__(self) -> str:
         return self._fn.__name__
@@ -271,6 +352,7 @@ class _FunctionCall(_Instruction):
             raise TypeError('Step must take one argument only: self')
 
         self._fn = func
+        self._description: Optional[str] = None
 
     def create_stepper(self, workchain: 'WorkChain') -> _FunctionStepper:
         return _FunctionStepper(workchain, self._fn)
@@ -280,12 +362,14 @@ class _FunctionCall(_Instruction):
         return cast(_FunctionStepper, _FunctionStepper.recreate_from(saved_state, load_context))
 
     def get_description(self) -> str:
-        desc = self._fn.__name__
-        if self._fn.__doc__:
-            doc = re.sub(r'\n\s*', ' ', self._fn.__doc__).strip()
-            desc += f'({doc})'
-
-        return desc
+        if self._description is None:
+            desc = self._fn.__name__
+            if self._fn.__doc__:
+                doc = _NEWLINE_INDENTATION.sub(' ', self._fn.__doc__).strip()
+                desc += f'({doc})'
+            self._description = desc
+
+        return self._description
 
 
 STEPPER_STATE = 'stepper_state'
@@ -0,0 +1,585 @@
+# -*- coding: utf-8 -*-
+"""Run processes on a pool of local worker processes that share a persister."""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from multiprocessing import connection
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from . import events, exceptions, loaders, persistence, process_comms
+from .utils import PID_TYPE
+
+if TYPE_CHECKING:
+    from .processes import Process
+
+__all__ = ['WorkerPool']
+
+_LOGGER = logging.getLogger(__name__)
+
+# Types of the reports that a worker sends back to the supervisor
+_REPORT_RESULT = 'result'
+_REPORT_OWNED = 'owned'
+_REPORT_RELEASED = 'released'
+
+# The identifier of the task that is currently being handled by a worker, used to map process ids onto tasks
+_CURRENT_TASK: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar('current worker task', default=None)
+
+
+class _ReportingPersister(persistence.Persister):
+    """
+    Persister that delegates to the persister shared by all workers and reports to the supervisor which processes are
+    owned by the worker, such that they can be continued from their checkpoint if the worker dies.
+    """
+
+    def __init__(self, persister: persistence.Persister, report: Callable[..., None]) -> None:
+        self._persister = persister
+        self._report = report
+        self._owned: Set[PID_TYPE] = set()
+
+    def save_checkpoint(self, process: 'Process', tag: Optional[str] = None) -> None:
+        self._persister.save_checkpoint(process, tag)
+
+        if process.pid not in self._owned and not process.has_terminated():
+            self._owned.add(process.pid)
+            self._report(_REPORT_OWNED, process.pid, _CURRENT_TASK.get())
+            process.future().add_done_callback(functools.partial(self._release, process.pid))
+
+    def _release(self, pid: PID_TYPE, _future: asyncio.Future) -> None:
+        self._owned.discard(pid)
+        self._report(_REPORT_RELEASED, pid)
+
+    def load_checkpoint(self, pid: PID_TYPE, tag: Optional[str] = None) -> persistence.Bundle:
+        return self._persister.load_checkpoint(pid, tag)
+
+    def get_checkpoints(self) -> List[persistence.PersistedCheckpoint]:
+        return self._persister.get_checkpoints()
+
+    def get_process_checkpoints(self, pid: PID_TYPE) -> List[persistence.PersistedCheckpoint]:
+        return self._persister.get_process_checkpoints(pid)
+
+    def delete_checkpoint(self, pid: PID_TYPE, tag: Optional[str] = None) -> None:
+        self._persister.delete_checkpoint(pid, tag)
+
+    def delete_process_checkpoints(self, pid: PID_TYPE) -> None:
+        self._persister.delete_process_checkpoints(pid)
+
+
+def _receive(conn: connection.Connection) -> Any:
+    """Receive the next message from a connection, returning ``None`` if the other end was closed."""
+    try:
+        return conn.recv()
+    except (EOFError, OSError):
+        return None
+
+
+def _run_worker(
+    index: int,
+    persister: Optional[persistence.Persister],
+    loader: loaders.ObjectLoader,
+    task_conn: connection.Connection,
+    report_conn: connection.Connection,
+    inherited: Sequence[connection.Connection] = (),
+) -> None:
+    """
+    The entry point of a worker process.
+
+    The worker runs a :class:`~plumpy.ProcessLauncher` on a fresh reentrant event loop and feeds it the tasks that it
+    receives from the supervisor, until it receives ``None``.
+
+    :param inherited: the supervisor ends of the pipes that were inherited when forking, which are closed such that the
+        supervisor remains the only owner of them
+    """
+    for conn in inherited:
+        conn.close()
+
+    # The event loop policy, and with it the loop, may have been inherited from the parent when forking, so install a
+    # new plumpy policy with a fresh loop, which is made reentrant like the loop that processes normally run on
+    policy = events.PlumpyEventLoopPolicy()
+    asyncio.set_event_loop_policy(policy)
+    policy.set_event_loop(policy.new_event_loop())
+    loop = policy.get_event_loop()
+
+    def report(kind: str, *payload: Any) -> None:
+        try:
+            report_conn.send((kind, index, *payload))
+        except Exception as exception:
+            # Most likely the payload could not be pickled, so report the failure to the supervisor instead
+            if kind != _REPORT_RESULT:
+                raise
+            task_id = payload[0]
+            failure = RuntimeError(f'failed to send the result of task {task_id}: {exception!r}')
+            report_conn.send((kind, index, task_id, False, failure))
+
+    if persister is not None:
+        persister = _ReportingPersister(persister, report)
+
+    launcher = process_comms.ProcessLauncher(loop=loop, persister=persister, loader=loader)
+
+    async def run_task(task_id: int, task: Dict[str, Any]) -> None:
+        _CURRENT_TASK.set(task_id)
+        try:
+            result = await launcher(None, task)
+        except Exception as exception:
+            report(_REPORT_RESULT, task_id, False, exception)
+        else:
+            report(_REPORT_RESULT, task_id, True, result)
+
+    async def serve() -> None:
+        pending: Set[asyncio.Task] = set()
+        while True:
+            message = await loop.run_in_executor(None, _receive, task_conn)
+            if message is None:
+                break
+            task = loop.create_task(run_task(*message))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.wait(pending)
+
+    try:
+        loop.run_until_complete(serve())
+    finally:
+        loop.close()
+
+
+class _TaskEntry:
+    """A task that has been dispatched to a worker and for which no result has been received yet."""
+
+    __slots__ = ('pid', 'task')
+
+    def __init__(self, task: Dict[str, Any], pid: Optional[PID_TYPE] = None) -> None:
+        self.task = task
+        self.pid = pid
+
+
+class _Worker:
+    """The supervisor side bookkeeping of a single worker process."""
+
+    def __init__(
+        self,
+        index: int,
+        process: multiprocessing.process.BaseProcess,
+        task_conn: connection.Connection,
+        report_conn: connection.Connection,
+    ) -> None:
+        self.index = index
+        self.process = process
+        self.task_conn = task_conn
+        self.report_conn = report_conn
+        self.tasks: Dict[int, _TaskEntry] = {}
+        self.owned: Dict[PID_TYPE, Optional[int]] = {}
+        # Serializes the messages sent over the task pipe, which are sent without holding the lock of the pool
+        self.send_lock = threading.Lock()
+
+
+class WorkerPool:
+    """
+    Supervise a fleet of local worker processes that each run a :class:`~plumpy.ProcessLauncher` on their own event
+    loop, which allows a population of CPU heavy processes to use all cores of a machine without needing a broker.
+
+    Tasks are the message bodies created by :func:`~plumpy.create_launch_body`, :func:`~plumpy.create_continue_body`
+    and :func:`~plumpy.process_comms.create_create_body`, which are sent to the least loaded worker over a pipe. The
+    workers share the persister, which therefore has to be usable from multiple processes, such as the
+    :class:`~plumpy.PicklePersister`.
+
+    If a worker dies, it is restarted and the processes that it was running are continued on the new worker from their
+    latest checkpoint. Tasks for which no checkpoint exists are sent to the new worker as is.
+    """
+
+    def __init__(
+        self,
+        persister: Optional[persistence.Persister] = None,
+        num_workers: Optional[int] = None,
+        loader: Optional[loaders.ObjectLoader] = None,
+        mp_context: Optional[Any] = None,
+        restart: bool = True,
+        poll_interval: float = 0.1,
+    ) -> None:
+        """
+        :param persister: the persister shared by the workers, required to launch persisted processes and to continue
+            processes
+        :param num_workers: the number of worker processes, defaults to the number of cores
+        :param loader: the object loader used to identify and load process classes
+        :param mp_context: the multiprocessing context used to create the workers, defaults to the default context
+        :param restart: restart workers that die and continue their processes, otherwise fail their tasks
+        :param poll_interval: the maximum time in seconds between checks of the health of the workers
+        """
+        if isinstance(persister, persistence.InMemoryPersister):
+            raise ValueError('an `InMemoryPersister` cannot be shared between worker processes')
+
+        self._persister = persister
+        self._num_workers = num_workers or os.cpu_count() or 1
+        self._loader = loader if loader is not None else loaders.get_object_loader()
+        self._context = mp_context if mp_context is not None else multiprocessing.get_context()
+        self._restart = restart
+        self._poll_interval = poll_interval
+
+        self._workers: List[_Worker] = []
+        self._futures: Dict[int, concurrent.futures.Future] = {}
+        self._task_ids = itertools.count()
+        self._lock = threading.RLock()
+        self._supervisor: Optional[threading.Thread] = None
+        self._closing = False
+        self._closed = False
+
+    def __enter__(self) -> 'WorkerPool':
+        self.start()
+        return self
+
+    def __exit__(self, *_exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def num_workers(self) -> int:
+        return self._num_workers
+
+    def is_running(self) -> bool:
+        """Return whether the pool has been started and not yet closed."""
+        return self._supervisor is not None and not self._closing
+
+    def start(self) -> None:
+        """Start the worker processes and the supervisor thread."""
+        if self._closing:
+            raise exceptions.ClosedError('the worker pool is closed')
+
+        if self._supervisor is not None:
+            return
+
+        with self._lock:
+            self._workers = []
+            for index in range(self._num_workers):
+                self._workers.append(self._spawn(index))
+
+        self._supervisor = threading.Thread(target=self._supervise, name='plumpy-worker-supervisor', daemon=True)
+        self._supervisor.start()
+
+    def submit(self, task: Dict[str, Any]) -> concurrent.futures.Future:
+        """
+        Send a task to the least loaded worker.
+
+        :param task: the task message, as created by one of the ``create_*_body`` functions
+        :return: a future that resolves to the result of the task
+        """
+        if not self.is_running():
+            raise exceptions.ClosedError('the worker pool is not running')
+
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        with self._lock:
+            task_id = next(self._task_ids)
+            self._futures[task_id] = future
+            worker = self._assign(task_id, task)
+
+        self._send(worker, (task_id, task))
+        return future
+
+    def launch_process(
+        self,
+        process_class: Any,
+        init_args: Optional[Sequence[Any]] = None,
+        init_kwargs: Optional[Dict[str, Any]] = None,
+        persist: bool = False,
+        nowait: bool = False,
+    ) -> concurrent.futures.Future:
+        """
+        Launch a process on one of the workers.
+
+        :param process_class: the process class to launch
+        :param init_args: positional arguments to the process constructor
+        :param init_kwargs: keyword arguments to the process constructor
+        :param persist: should the process be persisted
+        :param nowait: if True, resolve with the pid as soon as the process is created instead of its outputs
+        :return: a future that resolves to the outputs of the process, or its pid if ``nowait`` is True
+        """
+        body = process_comms.create_launch_body(process_class, init_args, init_kwargs, persist, self._loader, nowait)
+        return self.submit(body)
+
+    def continue_process(
+        self, pid: PID_TYPE, tag: Optional[str] = None, nowait: bool = False
+    ) -> concurrent.futures.Future:
+        """
+        Continue a persisted process on one of the workers.
+
+        :param pid: the pid of the process to continue
+        :param tag: the checkpoint tag to continue from
+        :param nowait: if True, resolve with the pid as soon as the process is loaded instead of its outputs
+        :return: a future that resolves to the outputs of the process, or its pid if ``nowait`` is True
+        """
+        return self.submit(process_comms.create_continue_body(pid, tag, nowait))
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """
+        Stop the workers, waiting for their pending tasks to complete, and cancel the futures of any remaining tasks.
+
+        Processes launched with ``nowait`` that are still running are stopped and can be continued from their latest
+        checkpoint. It is safe to call this method multiple times.
+
+        :param timeout: the time in seconds to wait for each worker to finish before it is terminated
+        """
+        if self._closing:
+            return
+
+        with self._lock:
+            self._closing = True
+            workers = list(self._workers)
+
+        for worker in workers:
+            self._send(worker, None)
+
+        # The supervisor keeps handling the reports of the workers while they complete their pending tasks
+        for worker in workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join()
+
+        with self._lock:
+            self._closed = True
+
+        if self._supervisor is not None:
+            self._supervisor.join()
+
+        with self._lock:
+            for worker in workers:
+                self._drain(worker)
+                self._close_task_conn(worker)
+                worker.report_conn.close()
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+            self._workers = []
+
+    def _spawn(self, index: int) -> _Worker:
+        """Start a new worker process with the given index."""
+        task_receiver, task_sender = self._context.Pipe(duplex=False)
+        report_receiver, report_sender = self._context.Pipe(duplex=False)
+
+        inherited: List[connection.Connection] = []
+        if self._context.get_start_method() == 'fork':
+            # A forked worker inherits the supervisor ends of its own pipes and of those of the other workers, which
+            # would otherwise keep the pipes open after the supervisor closes them
+            inherited = [task_sender, report_receiver]
+            for worker in self._workers:
+                inherited.extend((worker.task_conn, worker.report_conn))
+
+        process = self._context.Process(
+            target=_run_worker,
+            args=(index, self._persister, self._loader, task_receiver, report_sender, inherited),
+            name=f'plumpy-worker-{index}',
+            daemon=True,
+        )
+        process.start()
+        # Close the ends that are now owned by the child, such that reading from a dead worker raises ``EOFError``
+        task_receiver.close()
+        report_sender.close()
+        return _Worker(index, process, task_sender, report_receiver)
+
+    def _assign(self, task_id: int, task: Dict[str, Any], worker: Optional[_Worker] = None) -> _Worker:
+        """
+        Assign a task to the given worker, or the least loaded one, and return the worker. Should be called with the
+        lock held, after which the task should be sent with :meth:`_send` once the lock is released.
+        """
+        if worker is None:
+            worker = min(self._workers, key=lambda candidate: len(candidate.tasks))
+
+        pid = None
+        if task.get(process_comms.TASK_KEY) == process_comms.CONTINUE_TASK:
+            pid = task[process_comms.TASK_ARGS][process_comms.PID_KEY]
+
+        worker.tasks[task_id] = _TaskEntry(task, pid)
+        return worker
+
+    @staticmethod
+    def _send(worker: _Worker, message: Any) -> None:
+        """
+        Send a message to a worker. Should be called without holding the lock, as the send blocks while the pipe is
+        full, which happens when the worker is itself blocked sending reports that the supervisor drains with the lock.
+        """
+        with worker.send_lock:
+            try:
+                worker.task_conn.send(message)
+            except OSError:
+                # The worker died, its tasks are recovered by the supervisor
+                pass
+
+    @staticmethod
+    def _close_task_conn(worker: _Worker) -> None:
+        with worker.send_lock:
+            worker.task_conn.close()
+
+    def _send_all(self, messages: List[Tuple[_Worker, Any]]) -> None:
+        for worker, message in messages:
+            self._send(worker, message)
+
+    def _supervise(self) -> None:
+        """Handle the reports of the workers and recover from dead workers until the pool is closed."""
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                by_report: Dict[Any, _Worker] = {worker.report_conn: worker for worker in self._workers}
+                by_sentinel: Dict[Any, _Worker] = {worker.process.sentinel: worker for worker in self._workers}
+
+            ready = connection.wait([*by_report, *by_sentinel], timeout=self._poll_interval)
+
+            recovered: List[Tuple[_Worker, Any]] = []
+            with self._lock:
+                if self._closed:
+                    return
+                for obj in ready:
+                    if obj in by_report:
+                        self._drain(by_report[obj])
+                for obj in ready:
+                    if obj in by_sentinel:
+                        recovered.extend(self._handle_dead_worker(by_sentinel[obj]))
+
+            if recovered:
+                # Send the recovered tasks from another thread, such that the supervisor keeps draining the reports of
+                # the replacement workers if the tasks do not fit in their pipes
+                threading.Thread(
+                    target=self._send_all, args=(recovered,), name='plumpy-worker-recovery', daemon=True
+                ).start()
+
+    def _drain(self, worker: _Worker) -> None:
+        """Handle all the reports that are currently available from the worker. Should be called with the lock held."""
+        try:
+            while worker.report_conn.poll():
+                self._handle_report(worker, worker.report_conn.recv())
+        except (EOFError, OSError):
+            pass
+
+    def _handle_report(self, worker: _Worker, report: Tuple[Any, ...]) -> None:
+        kind, _index, *payload = report
+
+        if kind == _REPORT_OWNED:
+            pid, task_id = payload
+            worker.owned[pid] = task_id
+            if task_id in worker.tasks:
+                worker.tasks[task_id].pid = pid
+
+        elif kind == _REPORT_RELEASED:
+            (pid,) = payload
+            worker.owned.pop(pid, None)
+
+        elif kind == _REPORT_RESULT:
+            task_id, successful, value = payload
+            entry = worker.tasks.pop(task_id, None)
+            if (
+                entry is not None
+                and entry.pid is not None
+                and not entry.task[process_comms.TASK_ARGS].get(process_comms.NOWAIT_KEY)
+            ):
+                # The process ran until it terminated
+                worker.owned.pop(entry.pid, None)
+            self._resolve(task_id, successful, value)
+
+    def _resolve(self, task_id: int, successful: bool, value: Any) -> None:
+        future = self._futures.pop(task_id, None)
+        if future is None or future.done():
+            return
+        if successful:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+    def _handle_dead_worker(self, worker: _Worker) -> List[Tuple[_Worker, Any]]:
+        """
+        Replace a worker that died and recover its tasks and processes. Should be called with the lock held.
+
+        :return: the messages of the recovered tasks, which should be sent with :meth:`_send` once the lock is released
+        """
+        if worker not in self._workers:
+            return []
+
+        self._drain(worker)
+        worker.process.join()
+        self._close_task_conn(worker)
+        worker.report_conn.close()
+
+        if self._closing:
+            # The worker exited because the pool is being closed
+            self._workers.remove(worker)
+            return []
+
+        _LOGGER.warning(
+            'worker %d (pid %s) exited with code %s while running %d tasks',
+            worker.index,
+            worker.process.pid,
+            worker.process.exitcode,
+            len(worker.tasks),
+        )
+
+        if not self._restart:
+            self._workers.remove(worker)
+            failure = RuntimeError(f'worker {worker.index} exited with code {worker.process.exitcode}')
+            for task_id in worker.tasks:
+                self._resolve(task_id, False, failure)
+            if not self._workers:
+                self._closing = True
+            return []
+
+        replacement = self._spawn(worker.index)
+        self._workers[self._workers.index(worker)] = replacement
+        messages: List[Tuple[_Worker, Any]] = []
+
+        for task_id, entry in worker.tasks.items():
+            task = entry.task
+            task_type = task.get(process_comms.TASK_KEY)
+            task_args = task.get(process_comms.TASK_ARGS, {})
+
+            if entry.pid is not None and task_type == process_comms.LAUNCH_TASK and self._has_checkpoint(entry.pid):
+                # The process was created and checkpointed, so continue it instead of launching a new one
+                task = process_comms.create_continue_body(entry.pid, nowait=task_args.get(process_comms.NOWAIT_KEY))
+            elif entry.pid is not None and task_type == process_comms.CREATE_TASK:
+                self._resolve(task_id, True, entry.pid)
+                continue
+
+            messages.append((self._assign(task_id, task, replacement), (task_id, task)))
+
+        # Processes that were still running in the background of the worker after their task had completed
+        recovered = {entry.pid for entry in replacement.tasks.values()}
+        for pid, owning_task_id in worker.owned.items():
+            if owning_task_id in worker.tasks or pid in recovered or not self._is_resumable(pid):
+                continue
+            body = process_comms.create_continue_body(pid, nowait=True)
+            task_id = next(self._task_ids)
+            messages.append((self._assign(task_id, body, replacement), (task_id, body)))
+
+        return messages
+
+    def _has_checkpoint(self, pid: PID_TYPE) -> bool:
+        """Return whether the checkpoint that the process would be continued from can be loaded."""
+        if self._persister is None:
+            return False
+
+        # Only the checkpoint of this process is loaded, as other workers may be writing and deleting theirs meanwhile
+        try:
+            self._persister.load_checkpoint(pid)
+        except Exception:
+            return False
+
+        return True
+
+    def _is_resumable(self, pid: PID_TYPE) -> bool:
+        """Return whether the latest checkpoint of the process exists and is not in a terminal state."""
+        if self._persister is None:
+            return False
+
+        try:
+            bundle = self._persister.load_checkpoint(pid)
+            class_name = persistence.Savable._get_class_name(bundle['_state'])
+            state_class = self._loader.load_object(class_name)
+        except Exception:
+            return False
+
+        return not state_class.is_terminal()
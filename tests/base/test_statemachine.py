@@ -140,3 +140,31 @@ class TestStateMachine(unittest.TestCase):
         cd_player = CdPlayer()
         with self.assertRaises(AssertionError):
             cd_player.play()
+
+    def test_state_subclass(self):
+        """Events check the class of the current state and transitions check the ``ALLOWED`` of the current state.
+
+        This also holds for a subclass of a state that is not in ``STATES`` of the machine, but has the same label.
+        """
+
+        class StopOnlyPaused(Paused):
+            ALLOWED = {STOPPED}
+
+        cd_player = CdPlayer()
+        cd_player.play('Eminem - The Real Slim Shady')
+        cd_player.transition_to(StopOnlyPaused(cd_player, playing_state=cd_player._state))
+        self.assertEqual(cd_player.state, PAUSED)
+
+        with self.assertRaises(RuntimeError):
+            cd_player.transition_to(Playing(cd_player, track='Eminem - Stan'))
+
+        cd_player.stop()
+        self.assertEqual(cd_player.state, STOPPED)
+
+    def test_invalid_transition(self):
+        cd_player = CdPlayer()
+        with self.assertRaises(RuntimeError):
+            cd_player.transition_to(Stopped(cd_player))
+
+        with self.assertRaises(state_machine.EventError):
+            cd_player.pause()
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`plumpy.asyncio_comms` module."""
+
+import asyncio
+
+import kiwipy
+import pytest
+
+import plumpy
+from tests import utils
+
+
+@pytest.fixture
+def communicator():
+    communicator = plumpy.AsyncioCommunicator(asyncio.get_event_loop())
+    yield communicator
+    communicator.close()
+
+
+@pytest.mark.asyncio
+async def test_launch_process(communicator):
+    communicator.add_task_subscriber(plumpy.ProcessLauncher())
+    controller = plumpy.RemoteProcessController(communicator)
+
+    result = await controller.launch_process(utils.DummyProcessWithOutput)
+    assert result == utils.DummyProcessWithOutput.EXPECTED_OUTPUTS
+
+
+@pytest.mark.asyncio
+async def test_task_sent_before_subscriber(communicator):
+    task_future = communicator.task_send('task')
+    communicator.add_task_subscriber(lambda _comm, task: task.upper())
+
+    outcome = await task_future
+    assert await outcome == 'TASK'
+
+
+@pytest.mark.asyncio
+async def test_task_exception(communicator):
+    def subscriber(_comm, _task):
+        raise RuntimeError('Great scott!')
+
+    communicator.add_task_subscriber(subscriber)
+
+    with pytest.raises(RuntimeError, match='Great scott!'):
+        await communicator.task_send('task')
+
+
+@pytest.mark.asyncio
+async def test_task_rejected(communicator):
+    """A task rejected by one subscriber is offered to the next, and fails once all of them have rejected it."""
+    rejected = []
+
+    def reject(_comm, task):
+        rejected.append(task)
+        raise kiwipy.TaskRejected
+
+    communicator.add_task_subscriber(reject)
+    communicator.add_task_subscriber(lambda _comm, task: task if task == 'accepted' else reject(_comm, task))
+
+    outcome = await communicator.task_send('accepted')
+    assert await outcome == 'accepted'
+
+    with pytest.raises(kiwipy.TaskRejected):
+        await communicator.task_send('rejected')
+
+    assert rejected == ['accepted', 'rejected', 'rejected']
+
+
+@pytest.mark.asyncio
+async def test_task_queue_size():
+    communicator = plumpy.AsyncioCommunicator(queue_size=1)
+    communicator.task_send('first', no_reply=True)
+
+    with pytest.raises(kiwipy.DeliveryFailed):
+        communicator.task_send('second')
+
+    communicator.close()
+
+
+@pytest.mark.asyncio
+async def test_task_prefetch_count():
+    communicator = plumpy.AsyncioCommunicator(prefetch_count=2)
+    release = asyncio.Event()
+    running = []
+    max_running = 0
+
+    async def subscriber(_comm, task):
+        nonlocal max_running
+        running.append(task)
+        max_running = max(max_running, len(running))
+        await release.wait()
+        running.remove(task)
+        return task
+
+    communicator.add_task_subscriber(subscriber)
+    task_futures = [communicator.task_send(index) for index in range(5)]
+
+    await asyncio.sleep(0.01)
+    assert len(running) == 2
+
+    release.set()
+    outcomes = await asyncio.gather(*task_futures)
+    assert [await outcome for outcome in outcomes] == list(range(5))
+    assert max_running == 2
+
+    communicator.close()
+
+
+@pytest.mark.asyncio
+async def test_close_fails_queued_tasks():
+    communicator = plumpy.AsyncioCommunicator()
+    task_future = communicator.task_send('task')
+    communicator.close()
+
+    with pytest.raises(kiwipy.CommunicatorClosed):
+        await task_future
+
+    with pytest.raises(kiwipy.CommunicatorClosed):
+        communicator.task_send('task')
+
+
+@pytest.mark.asyncio
+async def test_rpc_control_process(communicator):
+    proc = utils.WaitForSignalProcess(communicator=communicator)
+    process_task = asyncio.ensure_future(proc.step_until_terminated())
+    await utils.run_until_waiting(proc)
+
+    controller = plumpy.RemoteProcessController(communicator)
+
+    status = await controller.get_status(proc.pid)
+    assert status['ctime'] == proc.creation_time
+
+    assert await controller.pause_process(proc.pid)
+    assert proc.paused
+
+    assert await controller.play_process(proc.pid)
+    assert not proc.paused
+
+    assert await controller.kill_process(proc.pid)
+    await process_task
+    assert proc.killed()
+
+
+@pytest.mark.asyncio
+async def test_rpc_coroutine_subscriber(communicator):
+    async def subscriber(_comm, msg):
+        await asyncio.sleep(0)
+        return msg * 2
+
+    communicator.add_rpc_subscriber(subscriber, 'recipient')
+    assert await communicator.rpc_send('recipient', 21) == 42
+
+
+@pytest.mark.asyncio
+async def test_rpc_unknown_recipient(communicator):
+    with pytest.raises(kiwipy.UnroutableError):
+        communicator.rpc_send('unknown', {})
+
+
+@pytest.mark.asyncio
+async def test_broadcast_subjects(communicator):
+    received = []
+
+    def subscriber(_comm, body, _sender, subject, _correlation_id):
+        received.append((subject, body))
+
+    identifier = communicator.add_broadcast_subscriber(subscriber, subjects=['pause', 'state_changed'])
+    communicator.broadcast_send('paused', subject='pause')
+    communicator.broadcast_send('played', subject='play')
+    communicator.broadcast_send('changed', subject='state_changed.running.waiting')
+    await asyncio.sleep(0)
+
+    assert received == [('pause', 'paused'), ('state_changed.running.waiting', 'changed')]
+
+    communicator.remove_broadcast_subscriber(identifier)
+    communicator.broadcast_send('paused', subject='pause')
+    await asyncio.sleep(0)
+    assert len(received) == 2
+
+
+@pytest.mark.asyncio
+async def test_broadcast_subject_and_topic(communicator):
+    """A subscriber of both a subject and its topic receives a broadcast with that subject once."""
+    received = []
+
+    def subscriber(_comm, body, _sender, _subject, _correlation_id):
+        received.append(body)
+
+    communicator.add_broadcast_subscriber(subscriber, subjects=['state_changed', 'state_changed.running'])
+    communicator.broadcast_send('exact', subject='state_changed.running')
+    communicator.broadcast_send('topic', subject='state_changed.waiting')
+    await asyncio.sleep(0)
+
+    assert received == ['exact', 'topic']
+
+
+@pytest.mark.asyncio
+async def test_broadcast_filter(communicator):
+    received = []
+
+    def subscriber(_comm, body, _sender, _subject, _correlation_id):
+        received.append(body)
+
+    communicator.add_broadcast_subscriber(kiwipy.BroadcastFilter(subscriber, subject='state_changed.*', sender='me'))
+
+    for _ in range(2):
+        communicator.broadcast_send('mine', sender='me', subject='state_changed.running.waiting')
+        communicator.broadcast_send('theirs', sender='them', subject='state_changed.running.waiting')
+        communicator.broadcast_send('other', sender='me', subject='pause')
+    await asyncio.sleep(0)
+
+    assert received == ['mine', 'mine']
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""Smoke tests that run the scripts in the ``benchmarks`` directory with a small number of iterations."""
+
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+BENCHMARKS = sorted((pathlib.Path(__file__).parent.parent / 'benchmarks').glob('*.py'))
+
+
+@pytest.mark.parametrize('script', BENCHMARKS, ids=[script.stem for script in BENCHMARKS])
+def test_benchmark(script):
+    result = subprocess.run(
+        [sys.executable, str(script), '--number', '10'], capture_output=True, text=True, check=False, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
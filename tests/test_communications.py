@@ -1,10 +1,21 @@
 # -*- coding: utf-8 -*-
 """Tests for the :mod:`plumpy.communications` module."""
 
+import asyncio
+
+import kiwipy
 import pytest
-from kiwipy import CommunicatorHelper
+from kiwipy import CommunicatorHelper, LocalCommunicator
 
-from plumpy.communications import LoopCommunicator
+from plumpy.communications import (
+    LoopCommunicator,
+    RoutedBroadcastFilter,
+    WorkerCommunicator,
+    create_routed_body,
+    create_routed_broadcast_body,
+)
+from plumpy.process_comms import Intent, MessageBuilder, RemoteProcessController
+from tests import utils
 
 
 class Subscriber:
@@ -74,3 +85,176 @@ def test_remove_task_subscriber(loop_communicator, subscriber):
     """Test the `LoopCommunicator.remove_task_subscriber` method."""
     identifier = loop_communicator.add_task_subscriber(subscriber)
     loop_communicator.remove_task_subscriber(identifier)
+
+
+@pytest.fixture
+def local_communicator():
+    """Return an instance of `kiwipy.LocalCommunicator`."""
+    communicator = LocalCommunicator()
+    yield communicator
+    communicator.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_communicator_single_subscription(local_communicator):
+    """Processes on a `WorkerCommunicator` should not subscribe with the underlying communicator."""
+    worker = WorkerCommunicator(local_communicator)
+    procs = [utils.WaitForSignalProcess(communicator=worker) for _ in range(3)]
+
+    assert list(local_communicator._rpc_subscribers) == [worker.identifier]
+    assert all(worker.is_local(proc.pid) for proc in procs)
+
+    for proc in procs:
+        proc.kill()
+    assert not any(worker.is_local(proc.pid) for proc in procs)
+
+
+@pytest.mark.asyncio
+async def test_worker_communicator_rpc(local_communicator):
+    """RPC messages should reach the local process both directly and when routed through the worker identifier."""
+    worker = WorkerCommunicator(local_communicator)
+    proc = utils.WaitForSignalProcess(communicator=worker)
+
+    future = await asyncio.wrap_future(worker.rpc_send(proc.pid, MessageBuilder.status()))
+    status = await asyncio.wrap_future(future)
+    assert status['ctime'] == proc.creation_time
+
+    body = create_routed_body(proc.pid, MessageBuilder.status())
+    future = await asyncio.wrap_future(local_communicator.rpc_send(worker.identifier, body))
+    status = await asyncio.wrap_future(future)
+    assert status['ctime'] == proc.creation_time
+
+
+@pytest.mark.asyncio
+async def test_worker_communicator_fallback(local_communicator):
+    """RPC messages for recipients that are not on the worker should be passed to the fallback."""
+    calls = []
+
+    def fallback(recipient_id, msg):
+        calls.append((recipient_id, msg))
+        return local_communicator.rpc_send(recipient_id, msg)
+
+    worker = WorkerCommunicator(local_communicator, fallback=fallback)
+    local_communicator.add_rpc_subscriber(lambda _comm, msg: msg, 'elsewhere')
+
+    assert worker.rpc_send('elsewhere', 'direct').result() == 'direct'
+    routed = local_communicator.rpc_send(worker.identifier, create_routed_body('elsewhere', 'routed'))
+    assert routed.result().result() == 'routed'
+    assert calls == [('elsewhere', 'direct'), ('elsewhere', 'routed')]
+
+    with pytest.raises(kiwipy.UnroutableError):
+        worker.rpc_send('unknown', 'message')
+
+
+@pytest.mark.asyncio
+async def test_worker_communicator_controller(local_communicator):
+    """A controller given the identifier of the worker should route its messages to the local processes."""
+    worker = WorkerCommunicator(local_communicator)
+    proc = utils.WaitForSignalProcess(communicator=worker)
+    controller = RemoteProcessController(local_communicator, worker_id=worker.identifier)
+
+    assert await controller.pause_process(proc.pid)
+    assert proc.paused
+    assert await controller.play_process(proc.pid)
+    assert not proc.paused
+    assert await controller.kill_process(proc.pid)
+    assert proc.killed()
+
+
+@pytest.mark.asyncio
+async def test_worker_communicator_unrouted(local_communicator):
+    """Messages sent to the worker that were not created with `create_routed_body` should be rejected."""
+    worker = WorkerCommunicator(local_communicator)
+
+    with pytest.raises(kiwipy.RemoteException, match='create_routed_body'):
+        await asyncio.wrap_future(local_communicator.rpc_send(worker.identifier, MessageBuilder.status()))
+
+
+@pytest.mark.asyncio
+async def test_worker_communicator_subscribe_recipients(local_communicator):
+    """With `subscribe_recipients` the local processes should also be reachable through their own pid."""
+    worker = WorkerCommunicator(local_communicator, subscribe_recipients=True)
+    proc = utils.WaitForSignalProcess(communicator=worker)
+    controller = RemoteProcessController(local_communicator)
+
+    assert set(local_communicator._rpc_subscribers) == {worker.identifier, str(proc.pid)}
+    assert await controller.pause_process(str(proc.pid))
+    assert proc.paused
+
+    assert await controller.kill_process(str(proc.pid))
+    assert list(local_communicator._rpc_subscribers) == [worker.identifier]
+
+
+def test_routed_broadcast_filter():
+    """The `RoutedBroadcastFilter` should only pass its subjects and unwrap broadcasts routed to its recipient."""
+    received = []
+
+    def subscriber(_comm, body, _sender, subject, _correlation_id):
+        received.append((subject, body))
+
+    routed = RoutedBroadcastFilter(subscriber, subjects=['pause'], recipient_id='me')
+    routed(None, 'all', subject='pause')
+    routed(None, 'ignored', subject='state_changed.running.waiting')
+    routed(None, create_routed_broadcast_body(['me', 'other'], 'mine'), subject='pause')
+    routed(None, create_routed_broadcast_body(['other'], 'theirs'), subject='pause')
+
+    assert received == [('pause', 'all'), ('pause', 'mine')]
+
+
+@pytest.mark.asyncio
+async def test_worker_communicator_broadcast(local_communicator):
+    """Intent broadcasts should be routed to all local processes, or only to the listed ones."""
+    worker = WorkerCommunicator(local_communicator)
+    procs = [utils.WaitForSignalProcess(communicator=worker) for _ in range(3)]
+
+    assert list(local_communicator._broadcast_subscribers) == [worker.identifier]
+
+    local_communicator.broadcast_send(MessageBuilder.pause(), subject=Intent.PAUSE)
+    await asyncio.sleep(0.1)
+    assert all(proc.paused for proc in procs)
+
+    local_communicator.broadcast_send(create_routed_broadcast_body([procs[0].pid], None), subject=Intent.PLAY)
+    await asyncio.sleep(0.1)
+    assert [proc.paused for proc in procs] == [False, True, True]
+
+
+@pytest.mark.asyncio
+async def test_worker_communicator_broadcast_same_recipient(local_communicator):
+    """Routed broadcast filters with the same recipient are kept apart and can be removed independently."""
+    worker = WorkerCommunicator(local_communicator)
+    received = []
+
+    def subscriber(name):
+        return lambda _comm, body, _sender, _subject, _correlation_id: received.append((name, body))
+
+    old = worker.add_broadcast_subscriber(RoutedBroadcastFilter(subscriber('old'), ['pause'], recipient_id='pid'))
+    worker.add_broadcast_subscriber(RoutedBroadcastFilter(subscriber('new'), ['pause'], recipient_id='pid'))
+
+    local_communicator.broadcast_send(create_routed_broadcast_body(['pid'], 'first'), subject='pause')
+    await asyncio.sleep(0.1)
+    assert sorted(received) == [('new', 'first'), ('old', 'first')]
+
+    worker.remove_broadcast_subscriber(old)
+    local_communicator.broadcast_send('second', subject='pause')
+    await asyncio.sleep(0.1)
+    assert received[2:] == [('new', 'second')]
+
+
+@pytest.mark.asyncio
+async def test_worker_communicator_broadcast_filters(local_communicator):
+    """Routed broadcasts are delivered through the filters, such that their sender filters apply."""
+    worker = WorkerCommunicator(local_communicator)
+    received = []
+
+    routed = RoutedBroadcastFilter(
+        lambda _comm, body, _sender, _subject, _correlation_id: received.append(body), ['pause'], recipient_id='pid'
+    )
+    routed.add_sender_filter('supervisor')
+    worker.add_broadcast_subscriber(routed)
+
+    local_communicator.broadcast_send('ignored', sender='other', subject='pause')
+    local_communicator.broadcast_send(create_routed_broadcast_body(['pid'], 'routed'), sender='other', subject='pause')
+    local_communicator.broadcast_send('passed', sender='supervisor', subject='pause')
+    await asyncio.sleep(0.1)
+
+    assert received == ['passed']
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
+import copy
 import unittest
+from unittest.mock import patch
 
 from plumpy.ports import PortNamespace
 from plumpy.process_spec import ProcessSpec
@@ -62,11 +64,105 @@ class TestExposeProcess(unittest.TestCase):
         port_namespace_left = process_left.spec().inputs.get_port(namespace_left)
         port_namespace_right = process_right.spec().inputs.get_port(namespace_right)
 
-        left_dict = {k: v for k, v in port_namespace_left.__dict__.items() if k != '_ports'}
-        right_dict = {k: v for k, v in port_namespace_right.__dict__.items() if k != '_ports'}
+        left_dict = {k: v for k, v in port_namespace_left.__dict__.items() if k not in ('_ports', '_shared_ports')}
+        right_dict = {k: v for k, v in port_namespace_right.__dict__.items() if k not in ('_ports', '_shared_ports')}
 
         self.assertEqual(left_dict, right_dict)
 
+    def test_expose_shares_ports(self):
+        """Exposed ports are shared with the exposed process and are only copied when accessed."""
+
+        class Lower(Process):
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.input('a', valid_type=int)
+                spec.input('b', valid_type=int)
+
+        class Upper(Process):
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.expose_inputs(Lower, namespace='lower')
+
+        lower_inputs = Lower.spec().inputs
+        upper_inputs = Upper.spec().inputs['lower']
+
+        self.assertIs(upper_inputs._ports['a'], lower_inputs._ports['a'])
+
+        upper_inputs['a'].required = False
+        self.assertTrue(lower_inputs['a'].required)
+        self.assertFalse(upper_inputs['a'].required)
+
+        lower_inputs['b'].valid_type = str
+        self.assertIs(upper_inputs['b'].valid_type, int)
+
+    def test_expose_hierarchy_does_not_copy_ports(self):
+        """Building the specs of a deep hierarchy of processes that expose each other does not copy any port."""
+        num_levels = 20
+        num_inputs = 50
+
+        class Base(Process):
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                for index in range(num_inputs):
+                    spec.input(f'input_{index}', valid_type=int, default=index)
+
+        process_classes = [Base]
+        for level in range(num_levels):
+
+            class Exposing(Process):
+                _exposed = process_classes[-1]
+
+                @classmethod
+                def define(cls, spec):
+                    super().define(spec)
+                    spec.expose_inputs(cls._exposed, namespace='exposed')
+
+            process_classes.append(Exposing)
+
+        with patch.object(copy, 'deepcopy', wraps=copy.deepcopy) as deepcopy:
+            spec = process_classes[-1].spec()
+
+        self.assertEqual(deepcopy.call_count, 0)
+
+        port_namespace = spec.inputs
+        for _ in range(num_levels):
+            port_namespace = port_namespace['exposed']
+        self.assertEqual(len(port_namespace), num_inputs)
+
+    def test_read_shared_ports_does_not_copy(self):
+        """Reading shared ports through the mapping interface or using the namespace does not copy them."""
+
+        class Lower(Process):
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.input('a', valid_type=int, default=1)
+                spec.input('b', valid_type=int, required=False)
+
+        class Upper(Process):
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.expose_inputs(Lower, namespace='lower')
+
+        Lower.spec()
+        upper_inputs = Upper.spec().inputs['lower']
+
+        with patch.object(copy, 'deepcopy', wraps=copy.deepcopy) as deepcopy:
+            self.assertIn('a', upper_inputs)
+            self.assertEqual(list(upper_inputs.keys()), ['a', 'b'])
+            self.assertEqual([name for name, _ in upper_inputs.items()], ['a', 'b'])
+            self.assertEqual(len(list(upper_inputs.values())), 2)
+            self.assertEqual(dict(upper_inputs.pre_process({})), {'a': 1})
+            self.assertEqual(upper_inputs.project({'a': 2, 'c': 3}), {'a': 2})
+            upper_inputs.create_port_namespace('nested')
+
+        self.assertEqual(deepcopy.call_count, 0)
+        self.assertEqual(upper_inputs._shared_ports, {'a', 'b'})
+
     def test_expose_dynamic(self):
         """Test that exposing a dynamic namespace remains dynamic."""
 
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`plumpy.hibernation` module."""
+
+import asyncio
+import gc
+import weakref
+
+import pytest
+
+import plumpy
+from plumpy.hibernation import HibernationManager
+from tests import utils
+
+
+class AwaitingWorkChain(plumpy.WorkChain):
+    """Work chain that waits on the future passed as the ``FUTURE`` class attribute."""
+
+    FUTURE = None
+
+    @classmethod
+    def define(cls, spec):
+        super().define(spec)
+        spec.outline(cls.wait, cls.result)
+        spec.output('value')
+
+    def wait(self):
+        return plumpy.ToContext(value=self.FUTURE)
+
+    def result(self):
+        self.out('value', self.ctx.value)
+
+
+@pytest.fixture
+def persister():
+    return plumpy.InMemoryPersister()
+
+
+@pytest.fixture
+def communicator():
+    communicator = plumpy.AsyncioCommunicator(asyncio.get_event_loop())
+    yield communicator
+    communicator.close()
+
+
+async def launch_until_waiting(process):
+    task = asyncio.ensure_future(process.step_until_terminated())
+    await utils.run_until_waiting(process)
+    return task
+
+
+@pytest.mark.asyncio
+async def test_hibernate_awaitable(persister):
+    """A work chain waiting on an awaitable is released from memory and continued once the awaitable is done."""
+    AwaitingWorkChain.FUTURE = asyncio.Future()
+    manager = HibernationManager(persister, threshold=0)
+
+    workchain = AwaitingWorkChain()
+    manager.track(workchain)
+    task = await launch_until_waiting(workchain)
+    future = workchain.future()
+    pid = workchain.pid
+
+    assert manager.check() == 1
+    await task
+    assert manager.is_hibernated(pid)
+    assert workchain.hibernated
+
+    reference = weakref.ref(workchain)
+    del workchain, task
+    gc.collect()
+    assert reference() is None
+
+    AwaitingWorkChain.FUTURE.set_result(5)
+    assert await asyncio.wait_for(future, timeout=5) == {'value': 5}
+    assert not manager.is_hibernated(pid)
+
+
+@pytest.mark.asyncio
+async def test_hibernate_threshold(persister):
+    """Processes are only hibernated once they have been waiting for longer than the threshold."""
+    manager = HibernationManager(persister, threshold=60)
+
+    process = utils.WaitForSignalProcess()
+    manager.track(process)
+    task = await launch_until_waiting(process)
+
+    assert manager.check() == 0
+    assert not manager.is_hibernated(process.pid)
+
+    process.kill()
+    await task
+
+
+@pytest.mark.asyncio
+async def test_hibernate_high_water_mark(persister):
+    """All waiting processes are hibernated while the memory usage exceeds the high-water mark."""
+    usage = iter([2, 2, 0])
+    manager = HibernationManager(persister, threshold=60, high_water_mark=1, memory_usage=lambda: next(usage))
+
+    processes = [utils.WaitForSignalProcess() for _ in range(3)]
+    tasks = []
+    for process in processes:
+        manager.track(process)
+        tasks.append(await launch_until_waiting(process))
+
+    assert manager.check() == 2
+    assert [manager.is_hibernated(process.pid) for process in processes] == [True, True, False]
+
+    processes[-1].kill()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_hibernate_rpc(persister, communicator):
+    """A hibernated process is continued when it is sent an RPC or a broadcast through the communicator."""
+    manager = HibernationManager(persister, threshold=0, communicator=communicator)
+    controller = plumpy.RemoteProcessController(communicator)
+
+    process = utils.WaitForSignalProcess(communicator=communicator)
+    manager.track(process)
+    task = await launch_until_waiting(process)
+    future = process.future()
+
+    assert manager.check() == 1
+    await task
+    assert manager.is_hibernated(process.pid)
+
+    status = await controller.get_status(process.pid)
+    assert status['ctime'] == process.creation_time
+    assert not manager.is_hibernated(process.pid)
+
+    assert await controller.kill_process(process.pid)
+    with pytest.raises(plumpy.KilledError):
+        await asyncio.wait_for(future, timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_hibernate_cancel_future(persister):
+    """Cancelling the future of a hibernated process kills the continued process."""
+    manager = HibernationManager(persister, threshold=0)
+
+    process = utils.WaitForSignalProcess()
+    manager.track(process)
+    task = await launch_until_waiting(process)
+    future = process.future()
+
+    assert manager.check() == 1
+    await task
+
+    future.cancel()
+    await asyncio.sleep(0.01)
+    assert not manager.is_hibernated(process.pid)
+    assert not manager._tasks
+
+
+@pytest.mark.asyncio
+async def test_hibernate_cancel_future_continued(persister):
+    """Cancelling the future of a process that was hibernated twice kills the process continued last."""
+    manager = HibernationManager(persister, threshold=0)
+
+    process = utils.WaitForSignalProcess()
+    manager.track(process)
+    task = await launch_until_waiting(process)
+    future = process.future()
+    pid = process.pid
+
+    assert manager.check() == 1
+    await task
+    continued = manager.wake(pid)
+    await utils.run_until_waiting(continued)
+
+    assert manager.check() == 1
+    await asyncio.sleep(0.01)
+    assert manager.is_hibernated(pid)
+    continued = manager.wake(pid)
+    await utils.run_until_waiting(continued)
+
+    future.cancel()
+    await asyncio.sleep(0.01)
+    assert continued.killed()
+    assert not manager._tasks
+
+
+@pytest.mark.asyncio
+async def test_hibernate_paused(persister):
+    """Paused processes are not hibernated."""
+    manager = HibernationManager(persister, threshold=0)
+
+    process = utils.WaitForSignalProcess()
+    manager.track(process)
+    task = await launch_until_waiting(process)
+    process.pause()
+    await utils.run_until_paused(process)
+
+    assert manager.check() == 0
+
+    process.play()
+    process.kill()
+    await task
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Tests for the lazy imports of the :mod:`plumpy` package."""
+
+import importlib
+import re
+import subprocess
+import sys
+
+import plumpy
+
+# Modules that should not be imported by ``import plumpy``
+LAZY_MODULES = ('aio_pika', 'plumpy.asyncio_comms', 'plumpy.hibernation', 'plumpy.watchdog', 'plumpy.workers')
+
+# Budget for the cumulative time of ``import plumpy`` in microseconds, as reported by ``python -X importtime``. This is
+# several times the time it takes on a typical machine, such that it only fails on a significant regression.
+IMPORT_TIME_BUDGET = 1_500_000
+
+
+def test_import_time():
+    """Importing plumpy does not import the lazily loaded modules and stays within the import time budget."""
+    code = f'import sys, plumpy; print([name for name in {LAZY_MODULES!r} if name in sys.modules])'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == '[]'
+
+    match = re.search(r'^import time:\s+\d+ \|\s+(\d+) \| plumpy$', result.stderr, re.MULTILINE)
+    assert match is not None
+    assert int(match.group(1)) < IMPORT_TIME_BUDGET
+
+
+def test_lazy_attributes():
+    """The lazily loaded attributes are exported and loaded on first access."""
+    for module_name, attributes in plumpy._LAZY_MODULES.items():
+        module = importlib.import_module(f'plumpy.{module_name}')
+        assert sorted(attributes) == sorted(module.__all__)
+        assert getattr(plumpy, module_name) is module
+
+        for attribute in attributes:
+            assert attribute in plumpy.__all__
+            assert attribute in dir(plumpy)
+            assert getattr(plumpy, attribute) is getattr(module, attribute)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`plumpy.metrics` module."""
+
+import asyncio
+
+import pytest
+
+import plumpy
+from tests import utils
+
+
+@pytest.fixture
+def metrics():
+    metrics = plumpy.Metrics(registry=plumpy.ProcessRegistry())
+    plumpy.set_metrics(metrics)
+    yield metrics
+    plumpy.set_metrics(None)
+
+
+def test_render():
+    counter = plumpy.CounterMetric('requests_total', 'Number of "requests".', ('path',))
+    counter.inc('/a"b')
+    counter.inc('/a"b', amount=2)
+    gauge = plumpy.GaugeMetric('temperature', 'Temperature.', function=lambda: {(): 21.5})
+    histogram = plumpy.HistogramMetric('latency_seconds', 'Latency.', buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+
+    lines = counter.render() + gauge.render() + histogram.render()
+    assert lines == [
+        '# HELP requests_total Number of "requests".',
+        '# TYPE requests_total counter',
+        'requests_total{path="/a\\"b"} 3',
+        '# HELP temperature Temperature.',
+        '# TYPE temperature gauge',
+        'temperature 21.5',
+        '# HELP latency_seconds Latency.',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 2',
+        'latency_seconds_sum 0.55',
+        'latency_seconds_count 2',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_process_population(metrics):
+    process = utils.DummyProcess()
+    await process.step_until_terminated()
+    killed = utils.WaitForSignalProcess()
+    killed.kill()
+
+    assert metrics.processes_created.value('DummyProcess') == 1
+    assert metrics.processes_terminated.value('DummyProcess', 'finished') == 1
+    assert metrics.processes_terminated.value('WaitForSignalProcess', 'killed') == 1
+    assert metrics.transitions.value('running') == 1
+    assert metrics.transitions.value('created') == 2
+
+    registry = plumpy.ProcessRegistry()
+    registry.register(process)
+    registry.register(killed)
+    assert plumpy.Metrics(registry=registry).live_processes.value('finished') == 1
+
+
+@pytest.mark.asyncio
+async def test_checkpoint(metrics, tmp_path):
+    process = utils.DummyProcess()
+    plumpy.PicklePersister(str(tmp_path)).save_checkpoint(process)
+    plumpy.InMemoryPersister().save_checkpoint(process)
+
+    assert metrics.checkpoint_seconds.histogram().count == 2
+    assert metrics.checkpoint_bytes.histogram().count == 1
+    assert metrics.checkpoint_bytes.histogram().total > 0
+
+
+@pytest.mark.asyncio
+async def test_rpc_and_launcher(metrics):
+    communicator = plumpy.AsyncioCommunicator()
+    launcher = plumpy.ProcessLauncher()
+    depths = []
+
+    async def subscriber(comm, task):
+        depths.append(metrics.launcher_tasks.value())
+        return await launcher(comm, task)
+
+    communicator.add_task_subscriber(subscriber)
+    controller = plumpy.RemoteProcessController(communicator)
+    await controller.launch_process(utils.DummyProcess)
+    assert metrics.launcher_tasks.value() == 0
+
+    process = utils.WaitForSignalProcess(communicator=communicator)
+    task = asyncio.ensure_future(process.step_until_terminated())
+    await utils.run_until_waiting(process)
+    await controller.get_status(process.pid)
+    assert await controller.kill_process(process.pid)
+    await task
+    communicator.close()
+
+    assert depths == [0]
+    assert metrics.rpc_seconds.histogram('status').count == 1
+    assert metrics.rpc_seconds.histogram('kill').count == 1
+
+
+@pytest.mark.asyncio
+async def test_launcher_tasks_running(metrics):
+    """Tasks are no longer counted once their process is launched, also if the launcher waits for it to terminate."""
+    registry = plumpy.ProcessRegistry()
+    plumpy.set_process_registry(registry)
+    communicator = plumpy.AsyncioCommunicator()
+    communicator.add_task_subscriber(plumpy.ProcessLauncher())
+    controller = plumpy.RemoteProcessController(communicator)
+
+    try:
+        future = asyncio.ensure_future(controller.launch_process(utils.WaitForSignalProcess, nowait=False))
+        while not len(registry):
+            await asyncio.sleep(0.01)
+        (process,) = registry.processes()
+        await utils.run_until_waiting(process)
+        assert metrics.launcher_tasks.value() == 0
+
+        process.resume()
+        await future
+        assert metrics.launcher_tasks.value() == 0
+    finally:
+        plumpy.set_process_registry(None)
+        communicator.close()
+
+
+@pytest.mark.asyncio
+async def test_export(metrics, tmp_path):
+    await utils.DummyProcess().step_until_terminated()
+
+    path = tmp_path / 'plumpy.prom'
+    metrics.write(str(path))
+    text = path.read_text()
+    assert 'plumpy_processes_created_total{process_class="DummyProcess"} 1' in text
+    assert text == metrics.render()
+
+    server = await metrics.serve()
+    host, port = server.sockets[0].getsockname()[:2]
+    try:
+        for path, status in (('/metrics', b'200'), ('/other', b'404')):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+            response = await reader.read()
+            writer.close()
+
+            assert response.split()[1] == status
+            if status == b'200':
+                assert response.split(b'\r\n\r\n', 1)[1].decode() == metrics.render()
+    finally:
+        server.close()
+        await server.wait_closed()
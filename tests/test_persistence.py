@@ -41,6 +41,35 @@ class TestSavable(unittest.TestCase):
         self._save_round_trip(Save())
         self._save_round_trip_with_loader(Save())
 
+    def test_slotted_savable(self):
+        """The states and commands of processes are slotted and can be saved and loaded."""
+        process = utils.DummyProcess()
+        command = plumpy.Stop(result={'a': 1}, successful=True)
+        state = plumpy.Waiting(process, process.run, msg='waiting', data='data')
+
+        for savable in (command, state):
+            self.assertFalse(hasattr(savable, '__dict__'))
+
+        self._save_round_trip(command)
+        load_context = plumpy.LoadSaveContext(process=process)
+        loaded = plumpy.Savable.load(state.save(), load_context)
+        self.assertEqual(loaded.save(), state.save())
+        self.assertIs(loaded.process, process)
+
+    def test_slotted_futures(self):
+        """The futures of processes and their interrupt actions are slotted and the futures can be saved and loaded."""
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        future = plumpy.SavableFuture(loop=loop)
+        action = plumpy.futures.CancellableAction(lambda: None, cookie='cookie')
+
+        for instance in (future, action):
+            self.assertFalse(hasattr(instance, '__dict__'))
+
+        future.set_result({'a': 1})
+        loaded = plumpy.Savable.load(future.save(), plumpy.LoadSaveContext(loop=loop))
+        self.assertEqual(loaded.result(), {'a': 1})
+
     def _save_round_trip(self, savable):
         """
         Do a round trip:
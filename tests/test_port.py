@@ -1,7 +1,21 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import inspect
 import types
+from unittest.mock import patch
 
-from plumpy.ports import UNSPECIFIED, InputPort, OutputPort, Port, PortNamespace
+import pytest
+
+from plumpy.ports import (
+    UNSPECIFIED,
+    CombinedPortValidationError,
+    InputPort,
+    OutputPort,
+    Port,
+    PortNamespace,
+    copy_nested_dicts,
+)
+from plumpy.utils import AttributesFrozendict
 
 from .utils import TestCase
 
@@ -41,6 +55,33 @@ class TestPort(TestCase):
 
         self.assertIsNone(spec.validate(UNSPECIFIED))
 
+    def test_validator_signature_inspected_once(self):
+        """Verify that the signature of a validator is only inspected the first time it is called."""
+
+        def validate(value, port):
+            return None
+
+        spec = Port('valid_with_validator', validator=validate)
+
+        with patch('inspect.getfullargspec', wraps=inspect.getfullargspec) as getfullargspec:
+            for _ in range(3):
+                self.assertIsNone(spec.validate(5))
+
+        self.assertEqual(getfullargspec.call_count, 1)
+
+    def test_async_validator(self):
+        """Synchronous validation runs a validator that is a coroutine function to completion."""
+
+        async def validate(value, port):
+            await asyncio.sleep(0)
+            if value < 0:
+                return 'negative'
+
+        port = Port('value', validator=validate)
+
+        self.assertIsNone(port.validate(1))
+        self.assertEqual(port.validate(-1).message, 'negative')
+
 
 class TestInputPort(TestCase):
     def test_default(self):
@@ -227,6 +268,14 @@ class TestPortNamespace(TestCase):
         assert sub_namespace.dynamic
         assert sub_namespace.name == 'undefined'
 
+        # The dynamically created namespaces are added to the host namespace
+        assert port_namespace['nested']['undefined'] is sub_namespace
+
+        # Unless they are created as a transient namespace
+        assert 'transient' not in port_namespace.ports
+        assert port_namespace.dynamic_namespace('transient').dynamic
+        assert 'transient' not in port_namespace.ports
+
     def test_port_namespace_create_port_namespace(self):
         """
         Test the create_port_namespace function of the PortNamespace class
@@ -300,6 +349,49 @@ class TestPortNamespace(TestCase):
             self.port_namespace.NAMESPACE_SEPARATOR.join((self.BASE_PORT_NAMESPACE_NAME, 'sub', 'space', 'output')),
         )
 
+    def test_port_namespace_validate_dynamic_ports(self):
+        """Test the breadcrumbs of nested dynamic values, deep nesting and collecting all errors."""
+        port_namespace = PortNamespace('results', valid_type=int)
+
+        self.assertIsNone(port_namespace.validate_dynamic_ports({'a': 1, 'b': {'c': 2, 'd': {}}}))
+
+        validation_error = port_namespace.validate_dynamic_ports({'a': 1, 'b': {'c': 2, 'd': {'e': '3'}}})
+        self.assertEqual(validation_error.port, 'results.b.d.e')
+
+        # Nesting deeper than the recursion limit
+        nested = value = {}
+        for _ in range(5000):
+            value['sub'] = {}
+            value = value['sub']
+        value['leaf'] = 'invalid'
+
+        validation_error = port_namespace.validate_dynamic_ports(nested)
+        self.assertEqual(validation_error.port.count('sub'), 5000)
+
+        # Collect all errors instead of stopping at the first
+        port_values = {'a': 'one', 'b': {'c': 2, 'd': 'three'}, 'e': 'four'}
+        validation_error = port_namespace.validate_dynamic_ports(port_values, collect_all=True)
+        self.assertIsInstance(validation_error, CombinedPortValidationError)
+        self.assertEqual([error.port for error in validation_error.errors], ['results.a', 'results.b.d', 'results.e'])
+        self.assertEqual(validation_error.port, 'results.a')
+
+    def test_port_namespace_validator(self):
+        """Verify that the validator of a namespace receives all its values, including those of dynamic ports."""
+        received = []
+
+        def validator(value, port):
+            received.append(value)
+
+        port_namespace = PortNamespace('base', validator=validator, dynamic=True)
+        port_namespace['explicit'] = InputPort('explicit', valid_type=int)
+
+        self.assertIsNone(port_namespace.validate({'explicit': 1, 'implicit': 2}))
+        self.assertEqual(received, [{'explicit': 1, 'implicit': 2}])
+
+        port_namespace.dynamic = False
+        validation_error = port_namespace.validate({'explicit': 1, 'implicit': 2})
+        self.assertIn('Unexpected ports', validation_error.message)
+
     def test_port_namespace_required(self):
         """Verify that validation will fail if required port is not specified."""
         port_namespace_sub = self.port_namespace.create_port_namespace('sub.space')
@@ -375,3 +467,98 @@ class TestPortNamespace(TestCase):
         inputs = port_namespace.pre_process({'lambda_default': some_lambda})
         self.assertEqual(inputs['lambda_default'], some_lambda)
         self.assertIsNone(port_namespace.validate(inputs))
+
+    def test_port_namespace_parse_inputs(self):
+        """Verify that `parse_inputs` is equivalent to `pre_process` followed by `validate`."""
+        port_namespace = PortNamespace('base')
+        port_namespace['lambda_default'] = InputPort('lambda_default', default=lambda: 1, valid_type=int)
+        port_namespace_lazy = port_namespace.create_port_namespace('lazy', populate_defaults=False, required=False)
+        port_namespace_lazy['with_default'] = InputPort('with_default', default=1, valid_type=int)
+        port_namespace_dynamic = port_namespace.create_port_namespace('dynamic', valid_type=int)
+
+        for index in range(1000):
+            port_namespace[f'port_{index}'] = InputPort(f'port_{index}', valid_type=int, default=index)
+            port_namespace_dynamic[f'port_{index}'] = InputPort(f'port_{index}', valid_type=int, required=False)
+
+        for inputs in (
+            {},
+            {'port_0': 5, 'dynamic': {'port_1': 1, 'implicit': 2}},
+            {'lazy': {}},
+            {'dynamic': {'implicit': 'invalid'}},
+            {'port_999': 'invalid'},
+        ):
+            parsed, validation_error = port_namespace.parse_inputs(inputs)
+            expected = port_namespace.pre_process(copy_nested_dicts(inputs))
+            expected_error = port_namespace.validate(expected)
+
+            if expected_error is None:
+                self.assertIsNone(validation_error)
+                self.assertEqual(parsed, expected)
+                self.assertIsInstance(parsed, AttributesFrozendict)
+            else:
+                self.assertEqual(str(validation_error), str(expected_error))
+
+        # Contrary to ``pre_process``, a value that is not a mapping for a namespace is a validation error
+        _, validation_error = port_namespace.parse_inputs({'lazy': 5})
+        self.assertEqual(validation_error.port, 'base.lazy')
+
+    def test_port_namespace_parse_inputs_not_modified(self):
+        """Verify that `parse_inputs` does not modify the port values and evaluates callable defaults only once."""
+        calls = []
+
+        def default():
+            calls.append(None)
+            return 1
+
+        port_namespace = PortNamespace('base')
+        port_namespace.create_port_namespace('sub')['default'] = InputPort('default', default=default)
+
+        inputs = {'sub': {}}
+        parsed, validation_error = port_namespace.parse_inputs(inputs)
+
+        self.assertIsNone(validation_error)
+        self.assertEqual(inputs, {'sub': {}})
+        self.assertEqual(parsed.sub.default, 1)
+        self.assertEqual(len(calls), 1)
+
+
+@pytest.mark.asyncio
+async def test_port_namespace_async_validate():
+    """Verify that `async_validate` awaits the validators concurrently and returns the first error in port order."""
+    running = 0
+    max_running = 0
+
+    async def validator(value, port):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if value < 0:
+            return 'negative'
+
+    def namespace_validator(value, port):
+        if sum(value['sub'].values()) > 10:
+            return 'too large'
+
+    port_namespace = PortNamespace('base', validator=namespace_validator)
+    port_namespace.create_port_namespace('sub')
+    for name in ('a', 'b', 'c'):
+        port_namespace['sub'][name] = InputPort(name, valid_type=int, validator=validator)
+    port_namespace['d'] = InputPort('d', validator=validator)
+
+    assert port_namespace.has_async_validators()
+    assert not PortNamespace('empty').has_async_validators()
+
+    inputs = {'sub': {'a': 1, 'b': 2, 'c': 3}, 'd': 4}
+    assert await port_namespace.async_validate(inputs, max_concurrency=3) is None
+    assert max_running == 3
+
+    validation_error = await port_namespace.async_validate({'sub': {'a': 1, 'b': -2, 'c': -3}, 'd': -4})
+    assert validation_error.port == 'base.sub.b'
+
+    validation_error = await port_namespace.async_validate({'sub': {'a': 1, 'b': 'two', 'c': 3}, 'd': 4})
+    assert validation_error.port == 'base.sub.b'
+
+    validation_error = await port_namespace.async_validate({'sub': {'a': 9, 'b': 2, 'c': 3}, 'd': 4})
+    assert validation_error.message == 'too large'
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
-from plumpy import ProcessSpec
-from plumpy.ports import InputPort, PortNamespace
+from unittest.mock import patch
+
+from plumpy import Process, ProcessSpec
+from plumpy.ports import InputPort, PortNamespace, ValidationCache
 
 from .utils import TestCase
 
@@ -55,6 +57,30 @@ class TestProcessSpec(TestCase):
         description = spec.get_description()
         self.assertNotEqual(description, {})
 
+    def test_get_description_cached(self):
+        """The description is only cached once the spec is sealed, and is rebuilt when ports are added before."""
+        self.spec.input('a')
+        description = self.spec.get_description()
+        self.spec.input('b')
+        self.assertNotEqual(self.spec.get_description(), description)
+
+        # Modifying a port directly is reflected as long as the spec is not sealed
+        self.spec.inputs['a'].help = 'help'
+        self.assertIn('help', str(self.spec))
+
+        self.spec.seal()
+        description = self.spec.get_description()
+        self.assertEqual(description, self.spec.get_description())
+        self.assertIs(str(self.spec), str(self.spec))
+
+        # The description is a copy of the nested dictionaries, so it can be modified without affecting the cache
+        description['extra'] = True
+        description['inputs']['a']['help'] = 'modified'
+        del description['inputs']['_attrs']
+        self.assertNotIn('extra', self.spec.get_description())
+        self.assertEqual(self.spec.get_description()['inputs']['a']['help'], 'help')
+        self.assertIn('_attrs', self.spec.get_description()['inputs'])
+
     def test_input_namespaced(self):
         """
         Test the creation of a namespaced input port
@@ -112,3 +138,143 @@ class TestProcessSpec(TestCase):
 
         self.assertIsNotNone(self.spec.inputs.validate({}))
         self.assertIsNotNone(self.spec.inputs.validate({'a': 'a', 'b': 'b'}))
+
+    def test_validation_cache(self):
+        """Verify that the validation cache memoizes successful results per namespace and is invalidated."""
+        calls = []
+
+        def validator(value, port):
+            calls.append(value)
+
+        self.spec.input('a', validator=validator)
+        self.spec.input_namespace('sub')
+        self.spec.input('sub.b', valid_type=int, validator=validator)
+        self.spec.enable_validation_cache(maxsize=2)
+        cache = self.spec.validation_cache
+
+        parsed, validation_error = self.spec.parse_inputs({'a': 1, 'sub': {'b': 2}})
+        self.assertIsNone(validation_error)
+        self.assertEqual(parsed, {'a': 1, 'sub': {'b': 2}})
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(cache), 2)
+
+        # Structurally equal inputs are not validated again, and the shared sub namespace is validated only once
+        self.assertEqual(self.spec.parse_inputs({'a': 1, 'sub': {'b': 2}}), (parsed, None))
+        self.assertIsNone(self.spec.parse_inputs({'a': 3, 'sub': {'b': 2}})[1])
+        self.assertEqual(calls, [1, 2, 3])
+
+        # Failures are not cached
+        for _ in range(2):
+            self.assertIsNotNone(self.spec.parse_inputs({'a': 1, 'sub': {'b': 'two'}})[1])
+        self.assertLessEqual(len(cache), 2)
+
+        self.spec.input('c', required=False)
+        self.assertEqual(len(cache), 0)
+
+        self.spec.inputs['a'].required = False
+        self.spec.invalidate_validation_cache()
+        self.assertEqual(len(cache), 0)
+
+    def test_validation_cache_isolation(self):
+        """Verify that processes that get the same cached inputs do not share the dictionaries of dynamic inputs."""
+
+        class Proc(Process):
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.input('a', valid_type=int)
+                spec.input_namespace('dynamic', dynamic=True)
+
+        Proc.spec().enable_validation_cache()
+        self.addCleanup(Proc.spec().disable_validation_cache)
+
+        first = Proc({'a': 1, 'dynamic': {'nested': {'b': 2}}})
+        second = Proc({'a': 1, 'dynamic': {'nested': {'b': 2}}})
+        self.assertEqual(Proc.spec().validation_cache.hits, 1)
+
+        first.inputs.dynamic['nested']['b'] = 3
+        self.assertEqual(second.inputs.dynamic['nested'], {'b': 2})
+        self.assertIsNot(first.inputs.dynamic, second.inputs.dynamic)
+
+    def test_validation_cache_fingerprint(self):
+        """Verify that only values that are immutable or of a registered type can be fingerprinted."""
+
+        class Registered:
+            pass
+
+        cache = ValidationCache()
+        registered = Registered()
+
+        self.assertEqual(cache.fingerprint({'a': 1, 'b': (2, 'c')}), cache.fingerprint({'b': (2, 'c'), 'a': 1}))
+        self.assertNotEqual(cache.fingerprint({'a': 1}), cache.fingerprint({'a': True}))
+        self.assertIsNone(cache.fingerprint({'a': [1]}))
+        self.assertIsNone(cache.fingerprint({'a': registered}))
+
+        self.addCleanup(setattr, ValidationCache, 'identity_types', ValidationCache.identity_types)
+        ValidationCache.register_identity_type(Registered)
+        self.assertEqual(cache.fingerprint({'a': registered}), cache.fingerprint({'a': registered}))
+        self.assertNotEqual(cache.fingerprint({'a': registered}), cache.fingerprint({'a': Registered()}))
+
+    def test_validation_cache_callable_default(self):
+        """Verify that namespaces with a callable default are not cached, so the default is evaluated every time."""
+        self.spec.input('a', default=lambda: [])
+        self.spec.enable_validation_cache()
+
+        first, _ = self.spec.parse_inputs({})
+        second, _ = self.spec.parse_inputs({})
+        self.assertIsNot(first.a, second.a)
+        self.assertEqual(len(self.spec.validation_cache), 0)
+
+    def test_get_output_namespace(self):
+        """Verify that output namespaces are resolved once and the cache is discarded when ports are added."""
+        self.spec.output_namespace('sub', dynamic=True)
+        self.spec.output('port')
+
+        self.assertIs(self.spec.get_output_namespace(''), self.spec.outputs)
+        sub = self.spec.get_output_namespace('sub')
+        self.assertIs(self.spec.get_output_namespace('sub'), sub)
+
+        # Dynamic namespaces are created on the fly and cached per path, but are not added to the spec
+        dynamic = self.spec.get_output_namespace('sub.dynamic.nested')
+        self.assertEqual(dynamic.name, 'nested')
+        self.assertTrue(dynamic.dynamic)
+        self.assertIs(self.spec.get_output_namespace('sub.dynamic.nested'), dynamic)
+        self.assertNotIn('dynamic', self.spec.outputs['sub'])
+
+        with patch.object(ProcessSpec, 'DYNAMIC_OUTPUT_NAMESPACES_MAXSIZE', 2):
+            self.spec.get_output_namespace('sub.other')
+            self.spec.get_output_namespace('sub.another')
+            self.assertIsNot(self.spec.get_output_namespace('sub.dynamic.nested'), dynamic)
+
+        with self.assertRaises(ValueError):
+            self.spec.get_output_namespace('port')
+
+        with self.assertRaises(ValueError):
+            self.spec.get_output_namespace('missing')
+
+        self.spec.output_namespace('sub', dynamic=False)
+        self.assertIsNot(self.spec.get_output_namespace('sub'), sub)
+
+    def test_get_output_namespace_modified(self):
+        """Verify that the cached output namespaces are discarded when the namespaces are modified directly."""
+        self.spec.output_namespace('sub', dynamic=True)
+        sub = self.spec.get_output_namespace('sub')
+        dynamic = self.spec.get_output_namespace('sub.dynamic')
+
+        self.spec.outputs['sub'] = PortNamespace('sub')
+        self.assertIsNot(self.spec.get_output_namespace('sub'), sub)
+        with self.assertRaises(ValueError):
+            self.spec.get_output_namespace('sub.dynamic')
+
+        self.spec.outputs['sub'].dynamic = True
+        self.assertIsNot(self.spec.get_output_namespace('sub.dynamic'), dynamic)
+        self.spec.outputs['sub'].dynamic = False
+        with self.assertRaises(ValueError):
+            self.spec.get_output_namespace('sub.dynamic')
+
+        self.spec.outputs.create_port_namespace('sub.nested')
+        self.assertIs(self.spec.get_output_namespace('sub.nested'), self.spec.outputs['sub']['nested'])
+
+        del self.spec.outputs['sub']
+        with self.assertRaises(ValueError):
+            self.spec.get_output_namespace('sub')
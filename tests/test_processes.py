@@ -3,14 +3,17 @@
 
 import asyncio
 import enum
+import gc
+import tracemalloc
 import unittest
+from unittest.mock import patch
 
 import kiwipy
 import pytest
 
 import plumpy
-from plumpy import BundleKeys, Process, ProcessState
-from plumpy.process_comms import MESSAGE_TEXT_KEY, MessageBuilder
+from plumpy import BundleKeys, Process, ProcessState, process_comms, settings
+from plumpy.process_comms import MESSAGE_TEXT_KEY, MessageBuilder, StateChangedBroadcast
 from plumpy.utils import AttributesFrozendict
 from tests import utils
 
@@ -62,6 +65,86 @@ async def test_process_scope():
     await p1task, p2task
 
 
+@pytest.mark.asyncio
+async def test_process_scope_nested():
+    """Nested process scopes restore the scope of the calling process when they are left."""
+    processes = [utils.DummyProcess() for _ in range(50)]
+    current = []
+
+    async def run(depth: int):
+        current.append(plumpy.Process.current())
+        if depth < len(processes):
+            await processes[depth]._run_task(run, depth + 1)
+        current.append(plumpy.Process.current())
+
+    await run(0)
+
+    expected = [None, *processes]
+    assert current == expected + expected[::-1]
+    assert plumpy.Process.current() is None
+
+
+async def non_negative(value, port):
+    await asyncio.sleep(0)
+    if value < 0:
+        return f'{port.name} should not be negative'
+
+
+class AsyncValidatorProcess(Process):
+    @classmethod
+    def define(cls, spec):
+        super().define(spec)
+        spec.input('a', valid_type=int, validator=non_negative)
+        spec.input('b', valid_type=int, default=1)
+
+
+@pytest.mark.asyncio
+async def test_async_validators_running_loop():
+    """Async validators of a process created on a running loop are awaited before its first step."""
+    process = AsyncValidatorProcess(inputs={'a': 1})
+    assert process.inputs == {'a': 1, 'b': 1}
+    await process.step_until_terminated()
+    assert process.is_successful
+
+    process = AsyncValidatorProcess(inputs={'a': -1})
+    await process.step_until_terminated()
+    assert process.is_excepted
+    assert 'a should not be negative' in str(process.exception())
+
+    # Running the async validators to completion synchronously would block or fail on the running loop
+    with pytest.raises(RuntimeError, match='event loop is running'):
+        AsyncValidatorProcess.spec().parse_inputs({'a': 1})
+
+    with pytest.raises(RuntimeError, match='event loop is running'):
+        AsyncValidatorProcess.spec().inputs['a'].validate(1)
+
+
+@pytest.mark.asyncio
+async def test_async_validators_checkpoint():
+    """The async validators that were deferred are still awaited by a process that is loaded from a checkpoint."""
+    process = AsyncValidatorProcess(inputs={'a': -1})
+    bundle = plumpy.Bundle(process)
+    assert bundle[BundleKeys.VALIDATE_INPUTS_PENDING]
+
+    loaded = bundle.unbundle()
+    await loaded.step_until_terminated()
+    assert loaded.is_excepted
+    assert 'a should not be negative' in str(loaded.exception())
+
+
+def test_async_validators_outputs():
+    """Async validators of output ports are rejected when the spec is sealed, as outputs are validated synchronously."""
+
+    class AsyncOutputValidatorProcess(Process):
+        @classmethod
+        def define(cls, spec):
+            super().define(spec)
+            spec.output('a', validator=non_negative)
+
+    with pytest.raises(ValueError, match='outputs cannot have async validators'):
+        AsyncOutputValidatorProcess()
+
+
 class TestProcess(unittest.TestCase):
     def test_spec(self):
         """
@@ -130,6 +213,20 @@ class TestProcess(unittest.TestCase):
         # the default value of the ``nested.b`` port.
         self.assertDictEqual(dict(process.raw_inputs), {'a': 5, 'nested': {'a': 'value'}})
 
+    def test_raw_inputs_nested_dynamic(self):
+        """Test that mutating a nested dictionary of a dynamic input does not change the ``raw_inputs``."""
+
+        class Proc(Process):
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.input_namespace('dynamic', dynamic=True)
+
+        process = Proc({'dynamic': {'nested': {'a': 1}}})
+        process.inputs.dynamic['nested']['a'] = 2
+
+        self.assertEqual(process.raw_inputs.dynamic['nested'], {'a': 1})
+
     def test_inputs_default(self):
         class Proc(utils.DummyProcess):
             @classmethod
@@ -214,6 +311,39 @@ class TestProcess(unittest.TestCase):
         self.assertIn('sub', process.inputs.namespace)
         self.assertEqual(process.inputs.namespace.sub, True)
 
+    def test_async_validators(self):
+        """Validators that are coroutine functions are awaited concurrently when the process is created."""
+        running = []
+        max_running = 0
+
+        async def validator(value, port):
+            nonlocal max_running
+            running.append(port.name)
+            max_running = max(max_running, len(running))
+            await asyncio.sleep(0.01)
+            running.remove(port.name)
+            if value < 0:
+                return f'{port.name} should not be negative'
+
+        class AsyncValidatorProcess(Process):
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.input('a', valid_type=int, validator=validator)
+                spec.input('b', valid_type=int, validator=validator)
+                spec.input('c', valid_type=int, default=1, validator=validator)
+
+        self.assertTrue(AsyncValidatorProcess.spec().has_async_validators())
+
+        with patch.object(settings, 'validator_concurrency', 2):
+            process = AsyncValidatorProcess(inputs={'a': 1, 'b': 2})
+
+        self.assertEqual(process.inputs, {'a': 1, 'b': 2, 'c': 1})
+        self.assertEqual(max_running, 2)
+
+        with self.assertRaisesRegex(ValueError, 'b should not be negative'):
+            AsyncValidatorProcess(inputs={'a': 1, 'b': -2})
+
     def test_raise_in_define(self):
         """Process which raises in its 'define' method. Check that the spec is not set."""
 
@@ -428,6 +558,7 @@ class TestProcess(unittest.TestCase):
     def test_kill_in_run(self):
         for force_kill in [False, True]:
             with self.subTest(force_kill):
+
                 class KillProcess(Process):
                     after_kill = False
 
@@ -1022,6 +1153,104 @@ class TestProcessNamespace(unittest.TestCase):
         self.assertEqual(process.outputs[namespace]['nested']['one'], 1)
         self.assertEqual(process.outputs[namespace]['nested']['two'], 2)
 
+    def test_out_many(self):
+        """Test that `out_many` validates all outputs before recording any and fires a single batch event."""
+
+        class BatchListener(plumpy.ProcessListener):
+            def __init__(self):
+                super().__init__()
+                self.batches = []
+
+            def on_outputs_emitted(self, process, outputs):
+                self.batches.append(list(outputs))
+
+        class OutManyProcess(Process):
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.input('valid', valid_type=bool, default=True)
+                spec.output('single', valid_type=bool)
+                spec.output_namespace('results', valid_type=int, dynamic=True)
+
+            def run(self):
+                self.out_many({'single': True, 'results.a.one': 1})
+                self.out_many({'two': 2, 'three': 3 if self.inputs.valid else 'three'}, namespace='results.a')
+
+        listener = BatchListener()
+        process = OutManyProcess()
+        process.add_process_listener(listener)
+        process.execute()
+
+        self.assertTrue(process.is_successful)
+        self.assertEqual(process.outputs, {'single': True, 'results': {'a': {'one': 1, 'two': 2, 'three': 3}}})
+        self.assertEqual(
+            listener.batches,
+            [
+                [('single', True, False), ('results.a.one', 1, True)],
+                [('results.a.two', 2, True), ('results.a.three', 3, True)],
+            ],
+        )
+
+        process = OutManyProcess(inputs={'valid': False})
+        with self.assertRaises(ValueError):
+            process.execute()
+        self.assertEqual(process.outputs, {'single': True, 'results': {'a': {'one': 1}}})
+
+    def test_out_many_on_output_emitted(self):
+        """Test that `out_many` calls `on_output_emitted` for each output if a subclass overrides it."""
+        emitted = []
+
+        class EmittingProcess(Process):
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.outputs.dynamic = True
+
+            def run(self):
+                self.out_many({'a': 1, 'b': 2})
+
+            def on_output_emitted(self, output_port, value, dynamic):
+                super().on_output_emitted(output_port, value, dynamic)
+                emitted.append(output_port)
+
+        EmittingProcess().execute()
+        self.assertEqual(emitted, ['a', 'b'])
+
+    def test_dynamic_outputs_do_not_grow_spec(self):
+        """Emitting outputs in distinct dynamic namespaces should not leave anything behind in the class spec.
+
+        This is a scaled down version of emitting a million distinct dynamic output paths.
+        """
+        num_outputs = 20_000
+
+        class ManyOutputsProcess(Process):
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.output_namespace('results', valid_type=int, dynamic=True)
+
+            def run(self):
+                for index in range(num_outputs):
+                    self.out(f'results.structure_{index}.energy', index)
+
+        spec = ManyOutputsProcess.spec()
+        tracemalloc.start()
+        try:
+            process = ManyOutputsProcess()
+            process.execute()
+            self.assertEqual(len(process.outputs['results']), num_outputs)
+
+            gc.collect()
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        # Only consider the memory that is still allocated by the ports module, since the outputs themselves are kept
+        retained = snapshot.filter_traces([tracemalloc.Filter(True, plumpy.ports.__file__)]).statistics('filename')
+        self.assertEqual(len(spec.outputs['results']), 0)
+        self.assertEqual(len(spec._dynamic_output_namespaces), spec.DYNAMIC_OUTPUT_NAMESPACES_MAXSIZE)
+        self.assertLess(sum(statistic.size for statistic in retained), 100_000)
+
 
 class TestProcessEvents(unittest.TestCase):
     def test_basic_events(self):
@@ -1087,6 +1316,63 @@ class TestProcessEvents(unittest.TestCase):
         for i, message in enumerate(messages):
             self.assertEqual(message['subject'], expected_subjects[i])
 
+    def test_broadcast_terminal(self):
+        communicator = kiwipy.LocalCommunicator()
+
+        subjects = []
+
+        def on_broadcast_receive(_comm, body, sender, subject, correlation_id):
+            subjects.append(subject)
+
+        communicator.add_broadcast_subscriber(on_broadcast_receive)
+
+        with patch.object(settings, 'state_changed_broadcast', StateChangedBroadcast.TERMINAL):
+            utils.DummyProcess(communicator=communicator).execute()
+
+        self.assertListEqual(subjects, ['state_changed.running.finished'])
+
+    def test_broadcast_none(self):
+        communicator = kiwipy.LocalCommunicator()
+
+        subjects = []
+
+        def on_broadcast_receive(_comm, body, sender, subject, correlation_id):
+            subjects.append(subject)
+
+        communicator.add_broadcast_subscriber(on_broadcast_receive)
+
+        with patch.object(settings, 'state_changed_broadcast', StateChangedBroadcast.NONE):
+            utils.DummyProcess(communicator=communicator).execute()
+
+        self.assertListEqual(subjects, [])
+
+    def test_broadcast_coalesced(self):
+        communicator = kiwipy.LocalCommunicator()
+
+        messages = []
+
+        def on_broadcast_receive(_comm, body, sender, subject, correlation_id):
+            messages.append((subject, body))
+
+        communicator.add_broadcast_subscriber(on_broadcast_receive)
+
+        with patch.object(settings, 'state_changed_broadcast', StateChangedBroadcast.COALESCED):
+            procs = []
+            for _ in range(2):
+                procs.append(utils.DummyProcess(communicator=communicator))
+                procs[-1].execute()
+
+        # Nothing is sent until the window has passed
+        self.assertListEqual(messages, [])
+        process_comms.get_state_change_coalescer(communicator).flush()
+
+        expected = []
+        for proc in procs:
+            states = [None] + [state.value for state in utils.DummyProcess.EXPECTED_STATE_SEQUENCE]
+            expected.extend([proc.pid, from_state, to_state] for from_state, to_state in zip(states, states[1:]))
+
+        self.assertListEqual(messages, [('state_changes', expected)])
+
 
 class _RestartProcess(utils.WaitForSignalProcess):
     @classmethod
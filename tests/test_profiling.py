@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`plumpy.profiling` module."""
+
+import asyncio
+
+import pytest
+
+import plumpy
+from tests import utils
+
+
+class SleepProcess(plumpy.Process):
+    """Process that sleeps in its run step."""
+
+    async def run(self):
+        await asyncio.sleep(0.05)
+
+
+class TwoStepsWorkChain(plumpy.WorkChain):
+    @classmethod
+    def define(cls, spec):
+        super().define(spec)
+        spec.outline(cls.first, cls.second)
+
+    def first(self):
+        pass
+
+    def second(self):
+        pass
+
+
+class WaitingWorkChain(plumpy.WorkChain):
+    """Work chain that waits for a future between the steps of its outline."""
+
+    FUTURE = None
+
+    @classmethod
+    def define(cls, spec):
+        super().define(spec)
+        spec.outline(cls.first, cls.second, cls.third)
+
+    def first(self):
+        self.to_context(result=WaitingWorkChain.FUTURE)
+
+    def second(self):
+        pass
+
+    def third(self):
+        pass
+
+
+@pytest.fixture
+def profiler():
+    profiler = plumpy.StepProfiler()
+    plumpy.set_step_profiler(profiler)
+    yield profiler
+    plumpy.set_step_profiler(None)
+
+
+def test_histogram():
+    histogram = plumpy.Histogram(buckets=(1.0, 2.0))
+    for value in (0.5, 1.0, 1.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.snapshot() == {'buckets': (1.0, 2.0), 'counts': [2, 1, 1], 'count': 4, 'sum': 6.0, 'max': 3.0}
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(0.75) == 2.0
+    assert histogram.quantile(1.0) == 3.0
+    assert plumpy.Histogram().quantile(0.5) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_process_steps(profiler):
+    process = utils.DummyProcess()
+    await process.step_until_terminated()
+
+    snapshot = profiler.snapshot()
+    assert set(snapshot) == {('DummyProcess', 'created'), ('DummyProcess', 'run')}
+    for histograms in snapshot.values():
+        assert histograms['wall']['count'] == 1
+        assert histograms['cpu']['count'] == 1
+
+    # Only the first step waited to be scheduled, the second one directly followed it
+    assert snapshot[('DummyProcess', 'created')]['queue']['count'] == 1
+    assert snapshot[('DummyProcess', 'run')]['queue']['count'] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_time_from_wake_up(profiler):
+    """The queue time of a step is measured from the moment the process is played or resumed, not from before."""
+    process = utils.WaitForSignalProcess()
+    process.pause()
+    task = asyncio.ensure_future(process.step_until_terminated())
+    await asyncio.sleep(0.05)
+    process.play()
+    await utils.run_until_waiting(process)
+    await asyncio.sleep(0.05)
+    process.resume()
+    await task
+
+    snapshot = profiler.snapshot()
+    for step in ('created', 'last_step'):
+        queue = snapshot[('WaitForSignalProcess', step)]['queue']
+        assert queue['count'] == 1
+        assert queue['max'] < 0.05
+
+    # The waiting step lasts until the process is resumed, which is not time spent on the loop
+    assert ('WaitForSignalProcess', 'waiting') not in snapshot
+
+
+@pytest.mark.asyncio
+async def test_cpu_time_excludes_suspension(profiler):
+    """The CPU time of a step does not count the time the step is suspended, but the wall time does."""
+    process = SleepProcess()
+    await process.step_until_terminated()
+
+    histograms = profiler.snapshot()[('SleepProcess', 'run')]
+    assert histograms['wall']['sum'] >= 0.05
+    assert histograms['cpu']['sum'] < 0.05
+
+
+@pytest.mark.asyncio
+async def test_workchain_steps(profiler):
+    workchain = TwoStepsWorkChain()
+    await workchain.step_until_terminated()
+
+    snapshot = profiler.snapshot()
+    for step in ('first', 'second'):
+        histograms = snapshot[('TwoStepsWorkChain', step)]
+        assert histograms['wall']['count'] == 1
+        assert histograms['queue']['count'] == 0
+
+    # The ``RUNNING`` states that run the steps of the outline are not recorded as well
+    assert set(snapshot) == {('TwoStepsWorkChain', step) for step in ('created', 'first', 'second')}
+
+    report = profiler.report()
+    assert report.splitlines()[0].split()[:3] == ['process', 'step', 'count']
+    assert 'TwoStepsWorkChain  first' in report
+
+
+@pytest.mark.asyncio
+async def test_workchain_queue_time(profiler):
+    """The first function of the outline that runs after the work chain is resumed records the queue time."""
+    WaitingWorkChain.FUTURE = asyncio.get_event_loop().create_future()
+    workchain = WaitingWorkChain()
+    task = asyncio.ensure_future(workchain.step_until_terminated())
+    await utils.run_until_waiting(workchain)
+    WaitingWorkChain.FUTURE.set_result(1)
+    await task
+
+    snapshot = profiler.snapshot()
+    assert snapshot[('WaitingWorkChain', 'first')]['queue']['count'] == 0
+    assert snapshot[('WaitingWorkChain', 'second')]['queue']['count'] == 1
+    assert snapshot[('WaitingWorkChain', 'third')]['queue']['count'] == 0
+    assert ('WaitingWorkChain', 'waiting') not in snapshot
+
+
+@pytest.mark.asyncio
+async def test_disabled():
+    profiler = plumpy.StepProfiler()
+    plumpy.set_step_profiler(profiler)
+    plumpy.set_step_profiler(None)
+
+    await utils.DummyProcess().step_until_terminated()
+    assert profiler.snapshot() == {}
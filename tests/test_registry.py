@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`plumpy.registry` module."""
+
+import gc
+
+import pytest
+
+import plumpy
+from plumpy.process_states import ProcessState
+from tests import utils
+
+
+class ParentProcess(plumpy.Process):
+    """Process that creates a child process in its run step."""
+
+    def run(self):
+        self.child = utils.DummyProcess()
+
+
+@pytest.fixture
+def process_registry():
+    process_registry = plumpy.ProcessRegistry()
+    plumpy.set_process_registry(process_registry)
+    yield process_registry
+    plumpy.set_process_registry(None)
+
+
+def test_registered_on_creation(process_registry):
+    process = utils.DummyProcess()
+
+    assert process.pid in process_registry
+    assert process_registry.get(process.pid) is process
+    assert process in list(process_registry.processes(process_class=utils.DummyProcess))
+
+
+def test_disabled():
+    """Processes do not register themselves unless a registry is set."""
+    process_registry = plumpy.ProcessRegistry()
+    plumpy.set_process_registry(process_registry)
+    plumpy.set_process_registry(None)
+
+    utils.DummyProcess()
+    assert plumpy.get_process_registry() is None
+    assert len(process_registry) == 0
+
+
+def test_weak_reference():
+    """The registry does not keep processes alive and drops them from all indexes once they are collected."""
+    process_registry = plumpy.ProcessRegistry()
+    process = utils.DummyProcess()
+    process_registry.register(process)
+    assert len(process_registry) == 1
+
+    del process
+    gc.collect()
+
+    assert len(process_registry) == 0
+    assert process_registry.count(state=ProcessState.CREATED) == 0
+    assert process_registry.counts_by_state() == {}
+    assert process_registry.counts_by_class() == {}
+
+
+def test_collected_while_iterating():
+    """Processes that are collected while the registry is iterated are removed afterwards."""
+    process_registry = plumpy.ProcessRegistry()
+    processes = [utils.DummyProcess() for _ in range(10)]
+    for process in processes:
+        process_registry.register(process)
+
+    iterated = 0
+    for process in process_registry.processes(state=ProcessState.CREATED):
+        iterated += 1
+        processes.clear()
+        del process
+        gc.collect()
+        assert process_registry.counts_by_class() == {utils.DummyProcess: 1}
+
+    assert iterated == 1
+    gc.collect()
+    assert len(process_registry) == 0
+
+
+@pytest.mark.asyncio
+async def test_state_index():
+    process_registry = plumpy.ProcessRegistry()
+    process = utils.DummyProcess()
+    other = utils.WaitForSignalProcess()
+    process_registry.register(process)
+    process_registry.register(other)
+
+    assert process_registry.count(state=ProcessState.CREATED) == 2
+    assert process_registry.counts_by_class() == {utils.DummyProcess: 1, utils.WaitForSignalProcess: 1}
+
+    await process.step_until_terminated()
+
+    assert process_registry.counts_by_state() == {ProcessState.CREATED: 1, ProcessState.FINISHED: 1}
+    assert list(process_registry.processes(state=ProcessState.FINISHED)) == [process]
+    assert process_registry.count(state=ProcessState.FINISHED, process_class=utils.WaitForSignalProcess) == 0
+
+
+@pytest.mark.asyncio
+async def test_parent_index(process_registry):
+    parent = ParentProcess()
+    await parent.step_until_terminated()
+
+    assert process_registry.count(parent=parent.pid) == 1
+    assert list(process_registry.processes(parent=parent.pid)) == [parent.child]
+    assert process_registry.count(parent=parent.child.pid) == 0
+
+
+def test_replace_same_pid():
+    """Registering a process with the pid of another replaces it, and collecting the old one leaves the new one."""
+    process_registry = plumpy.ProcessRegistry()
+    process = utils.DummyProcess()
+    process_registry.register(process)
+    replacement = utils.WaitForSignalProcess(pid=process.pid)
+    process_registry.register(replacement)
+
+    del process
+    gc.collect()
+
+    assert process_registry.get(replacement.pid) is replacement
+    assert process_registry.counts_by_class() == {utils.WaitForSignalProcess: 1}
+
+
+@pytest.mark.asyncio
+async def test_closed():
+    """Processes that were closed but are still referenced are reported as possibly leaked."""
+    process_registry = plumpy.ProcessRegistry()
+    process = utils.DummyProcess()
+    process_registry.register(process)
+    assert process_registry.closed() == []
+
+    await process.step_until_terminated()
+    process.close()
+    assert process_registry.closed() == [process]
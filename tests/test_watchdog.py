@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`plumpy.watchdog` module."""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+import plumpy
+from plumpy import processes
+from tests import utils
+
+
+class BlockingProcess(plumpy.Process):
+    """Process that blocks the event loop in its run step."""
+
+    def run(self):
+        time.sleep(0.3)
+
+
+def block(_value, _port):
+    time.sleep(0.3)
+
+
+class BlockingOutputProcess(plumpy.Process):
+    """Process that blocks the event loop in the validator of an output that it records in its run step."""
+
+    @classmethod
+    def define(cls, spec):
+        super().define(spec)
+        spec.output('result', validator=block)
+
+    def run(self):
+        self.out('result', 1)
+
+
+class BlockingWorkChain(plumpy.WorkChain):
+    """Work chain that blocks the event loop in the second step of its outline."""
+
+    @classmethod
+    def define(cls, spec):
+        super().define(spec)
+        spec.outline(cls.first, cls.second)
+
+    def first(self):
+        pass
+
+    def second(self):
+        time.sleep(0.3)
+
+
+async def watch(process):
+    """Run the process to completion while it is watched and return the reports of the watchdog."""
+    watchdog = plumpy.LoopWatchdog(threshold=0.1, interval=0.02)
+    watchdog.start()
+    try:
+        await process.step_until_terminated()
+        await asyncio.sleep(0.05)
+    finally:
+        watchdog.stop()
+    return watchdog.slow_steps
+
+
+@pytest.mark.asyncio
+async def test_loop_lag():
+    watchdog = plumpy.LoopWatchdog(threshold=1.0, interval=0.01)
+    watchdog.start()
+    assert watchdog.is_running()
+
+    await asyncio.sleep(0.05)
+    watchdog.stop()
+    assert not watchdog.is_running()
+
+    snapshot = watchdog.snapshot()
+    assert snapshot['lag']['count'] >= 1
+    assert snapshot['slow_steps'] == 0
+    assert watchdog.slow_steps == []
+
+
+@pytest.mark.asyncio
+async def test_slow_step(caplog):
+    """A step that blocks the loop for longer than the threshold is reported with its process and stack."""
+    watchdog = plumpy.LoopWatchdog(threshold=0.1, interval=0.02)
+    watchdog.start()
+
+    process = BlockingProcess()
+    with caplog.at_level(logging.WARNING, logger='plumpy.watchdog'):
+        await process.step_until_terminated()
+        await asyncio.sleep(0.05)
+    watchdog.stop()
+
+    assert len(watchdog.slow_steps) == 1
+    slow_step = watchdog.slow_steps[0]
+    assert slow_step.pid == process.pid
+    assert slow_step.process_class == 'BlockingProcess'
+    assert slow_step.step == 'run'
+    assert slow_step.duration > 0.1
+    assert 'time.sleep(0.3)' in slow_step.stack
+
+    snapshot = watchdog.snapshot()
+    assert snapshot['slow_steps'] == 1
+    assert snapshot['recent_slow_steps'][0]['pid'] == process.pid
+    assert snapshot['lag']['max'] > 0.1
+    assert any('blocked' in record.message for record in caplog.records)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'process_class, step', ((BlockingOutputProcess, 'run'), (BlockingWorkChain, 'second')), ids=('process', 'workchain')
+)
+async def test_slow_step_function(process_class, step):
+    """The step is reported as the function of the step, not the innermost method of the process on the stack."""
+    process = process_class()
+    slow_steps = await watch(process)
+
+    assert len(slow_steps) == 1
+    assert slow_steps[0].pid == process.pid
+    assert slow_steps[0].process_class == process_class.__name__
+    assert slow_steps[0].step == step
+
+
+@pytest.mark.asyncio
+async def test_idle_process():
+    """A process that is waiting is not blamed for blocking the loop outside of its steps."""
+    watchdog = plumpy.LoopWatchdog(threshold=0.1, interval=0.02)
+    watchdog.start()
+    try:
+        process = utils.WaitForSignalProcess()
+        task = asyncio.ensure_future(process.step_until_terminated())
+        await utils.run_until_waiting(process)
+
+        time.sleep(0.3)
+        await asyncio.sleep(0.05)
+
+        process.kill()
+        await task
+    finally:
+        watchdog.stop()
+
+    assert len(watchdog.slow_steps) == 1
+    assert watchdog.slow_steps[0].pid is None
+    assert watchdog.slow_steps[0].step is None
+
+
+@pytest.mark.asyncio
+async def test_stepping_published():
+    """Steps are only published while they execute and while a watchdog is running."""
+    published = []
+
+    class AwaitingProcess(plumpy.Process):
+        async def run(self):
+            published.append(len(processes.STEPPING_PROCESSES))
+            await asyncio.sleep(0.01)
+            published.append(len(processes.STEPPING_PROCESSES))
+
+    async def observe():
+        while not task.done():
+            published.append(len(processes.STEPPING_PROCESSES))
+            await asyncio.sleep(0)
+
+    task = asyncio.ensure_future(AwaitingProcess().step_until_terminated())
+    await asyncio.gather(task, observe())
+    assert not any(published)
+
+    watchdog = plumpy.LoopWatchdog(threshold=1.0)
+    watchdog.start()
+    try:
+        published.clear()
+        process = AwaitingProcess()
+        task = asyncio.ensure_future(process.step_until_terminated())
+        await asyncio.gather(task, observe())
+    finally:
+        watchdog.stop()
+
+    # The steps of the process are only published while they execute, not while the other task observes them
+    assert set(published) == {0, 1}
+    assert published.count(1) == 2
+    assert processes.STEPPING_PROCESSES == {}
@@ -242,6 +242,12 @@ class TestWorkchain(unittest.TestCase):
     def test_str(self):
         self.assertIsInstance(str(Wf.spec()), str)
 
+    def test_get_description(self):
+        """The description of a sealed spec includes the outline and is cached."""
+        description = Wf.spec().get_description()
+        self.assertEqual(description['outline'], Wf.spec().get_outline().get_description())
+        self.assertIs(description['outline'], Wf.spec().get_description()['outline'])
+
     def test_malformed_outline(self):
         """
         Test some malformed outlines
@@ -577,6 +583,141 @@ class TestWorkchain(unittest.TestCase):
         ]
         self.assertListEqual(collector.stepper_strings, stepper_strings)
 
+    def test_fused_steps(self):
+        """Consecutive steps are run within a single RUNNING state up to the budget of fused steps."""
+
+        class FusedWorkChain(WorkChain):
+            MAX_FUSED_STEPS = 4
+
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.outline(cls.setup, while_(cls.not_done)(cls.increment), cls.result)
+                spec.output('count', valid_type=int)
+
+            def setup(self):
+                self.ctx.count = 0
+
+            def not_done(self):
+                return self.ctx.count < 10
+
+            def increment(self):
+                self.ctx.count += 1
+
+            def result(self):
+                self.out('count', self.ctx.count)
+
+        running = []
+
+        class RunningCounter(ProcessListener):
+            def on_process_running(self, process):
+                running.append(getattr(process.ctx, 'count', None))
+
+        workchain = FusedWorkChain()
+        workchain.add_process_listener(RunningCounter())
+        self.assertEqual(workchain.execute(), {'count': 10})
+        self.assertEqual(running, [None, 3, 7, 10])
+
+    def test_fused_steps_should_checkpoint(self):
+        """The checkpoint policy can end a run of fused steps early."""
+
+        class CheckpointWorkChain(WorkChain):
+            MAX_FUSED_STEPS = 100
+
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.outline(cls.step1, cls.step2, cls.step3, cls.step4)
+
+            def should_checkpoint(self, steps):
+                return self.ctx.checkpoint
+
+            def step1(self):
+                self.ctx.checkpoint = False
+
+            def step2(self):
+                self.ctx.checkpoint = True
+
+            def step3(self):
+                self.ctx.checkpoint = False
+
+            def step4(self):
+                pass
+
+        steppers = []
+
+        class StepperCollector(ProcessListener):
+            def on_process_running(self, process):
+                steppers.append(str(process._stepper))
+
+        workchain = CheckpointWorkChain()
+        workchain.add_process_listener(StepperCollector())
+        workchain.execute()
+        self.assertEqual(steppers, ['0:step1', '2:step3'])
+
+    def test_fused_steps_wait(self):
+        """A step that returns awaitables ends the run of fused steps."""
+
+        class WaitingWorkChain(WorkChain):
+            MAX_FUSED_STEPS = 100
+
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.outline(cls.step1, cls.step2, cls.step3)
+
+            def step1(self):
+                future = asyncio.Future()
+                future.set_result(5)
+                return ToContext(value=future)
+
+            def step2(self):
+                pass
+
+            def step3(self):
+                self.ctx.value += 1
+
+        waiting = []
+
+        class WaitingCounter(ProcessListener):
+            def on_process_waiting(self, process):
+                waiting.append(str(process._stepper))
+
+        workchain = WaitingWorkChain()
+        workchain.add_process_listener(WaitingCounter())
+        workchain.execute()
+        self.assertEqual(waiting, ['1:step2'])
+        self.assertEqual(workchain.ctx.value, 6)
+
+    def test_fused_steps_pause(self):
+        """A step that pauses the process ends the run of fused steps."""
+
+        class PausingWorkChain(WorkChain):
+            MAX_FUSED_STEPS = 100
+
+            @classmethod
+            def define(cls, spec):
+                super().define(spec)
+                spec.outline(cls.step1, cls.step2)
+
+            def step1(self):
+                self.pause()
+
+            def step2(self):
+                self.ctx.done = True
+
+        async def run():
+            workchain = PausingWorkChain()
+            task = asyncio.ensure_future(workchain.step_until_terminated())
+            await utils.run_until_paused(workchain)
+            self.assertFalse(hasattr(workchain.ctx, 'done'))
+            workchain.play()
+            await task
+            self.assertTrue(workchain.ctx.done)
+
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(run())
+
 
 class TestImmutableInputWorkchain(unittest.TestCase):
     """
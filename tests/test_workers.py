@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`plumpy.workers` module."""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+import plumpy
+from tests import utils
+
+
+class CrashOnceProcess(plumpy.Process):
+    """Process that kills the worker it runs on, unless the marker file exists."""
+
+    @classmethod
+    def define(cls, spec):
+        super().define(spec)
+        spec.input('marker', valid_type=str)
+        spec.outputs.dynamic = True
+
+    def run(self):
+        if not os.path.exists(self.inputs.marker):
+            with open(self.inputs.marker, 'w'):
+                pass
+            os._exit(1)
+
+        self.out('recovered', True)
+
+
+class LoopProcess(plumpy.Process):
+    """Process that outputs the type of the event loop policy and whether the loop is reentrant."""
+
+    @classmethod
+    def define(cls, spec):
+        super().define(spec)
+        spec.outputs.dynamic = True
+
+    def run(self):
+        self.out('policy', type(asyncio.get_event_loop_policy()).__name__)
+        self.out('reentrant', getattr(type(asyncio.get_event_loop()), '_nest_patched', False))
+
+
+class EchoProcess(plumpy.Process):
+    """Process that outputs its payload."""
+
+    @classmethod
+    def define(cls, spec):
+        super().define(spec)
+        spec.input('payload', valid_type=str)
+        spec.output('payload', valid_type=str)
+
+    def run(self):
+        self.out('payload', self.inputs.payload)
+
+
+@pytest.fixture
+def persister(tmp_path):
+    return plumpy.PicklePersister(str(tmp_path / 'checkpoints'))
+
+
+@pytest.fixture
+def mp_context():
+    return multiprocessing.get_context('spawn')
+
+
+def test_launch(mp_context):
+    with plumpy.WorkerPool(num_workers=2, mp_context=mp_context) as pool:
+        futures = [pool.launch_process(utils.DummyProcessWithOutput) for _ in range(4)]
+        for future in futures:
+            assert future.result(timeout=30) == utils.DummyProcessWithOutput.EXPECTED_OUTPUTS
+
+
+@pytest.mark.parametrize(
+    'start_method',
+    [
+        'spawn',
+        pytest.param('fork', marks=pytest.mark.skipif(sys.platform != 'linux', reason='fork is only safe on linux')),
+    ],
+)
+def test_reentrant_loop(start_method):
+    """Workers run their processes on a reentrant plumpy event loop, also when forked from a parent with a pool."""
+    with plumpy.WorkerPool(num_workers=2, mp_context=multiprocessing.get_context(start_method)) as pool:
+        futures = [pool.launch_process(LoopProcess) for _ in range(2)]
+        for future in futures:
+            assert future.result(timeout=30) == {'policy': 'PlumpyEventLoopPolicy', 'reentrant': True}
+
+
+def test_large_tasks(mp_context):
+    """Tasks and results that do not fit in the pipes should not deadlock the supervisor and the worker."""
+    payload = 'x' * 2**20
+    with plumpy.WorkerPool(num_workers=1, mp_context=mp_context) as pool:
+        futures = [pool.launch_process(EchoProcess, init_kwargs={'inputs': {'payload': payload}}) for _ in range(8)]
+        for future in futures:
+            assert future.result(timeout=60) == {'payload': payload}
+
+
+def test_launch_exception(mp_context):
+    with plumpy.WorkerPool(num_workers=1, mp_context=mp_context) as pool:
+        future = pool.launch_process(utils.ExceptionProcess)
+        with pytest.raises(RuntimeError, match='Great scott!'):
+            future.result(timeout=30)
+
+
+def test_continue(persister, mp_context):
+    process = utils.DummyProcessWithOutput()
+    persister.save_checkpoint(process)
+
+    with plumpy.WorkerPool(persister, num_workers=1, mp_context=mp_context) as pool:
+        future = pool.continue_process(process.pid)
+        assert future.result(timeout=30) == utils.DummyProcessWithOutput.EXPECTED_OUTPUTS
+
+
+def test_persist_requires_persister(mp_context):
+    with plumpy.WorkerPool(num_workers=1, mp_context=mp_context) as pool:
+        future = pool.launch_process(utils.DummyProcess, persist=True)
+        with pytest.raises(plumpy.TaskRejected):
+            future.result(timeout=30)
+
+
+def test_restart_crashed_worker(persister, mp_context, tmp_path):
+    """A process that takes down its worker should be continued from its checkpoint on the restarted worker."""
+    inputs = {'marker': str(tmp_path / 'marker')}
+
+    with plumpy.WorkerPool(persister, num_workers=1, mp_context=mp_context) as pool:
+        future = pool.launch_process(CrashOnceProcess, init_kwargs={'inputs': inputs}, persist=True)
+        assert future.result(timeout=30) == {'recovered': True}
+
+
+def test_has_checkpoint(persister, tmp_path):
+    """Checking for the checkpoint of a process should not load, or fail on, the checkpoints of other processes."""
+    process = utils.DummyProcess()
+    persister.save_checkpoint(process)
+    (tmp_path / 'checkpoints' / 'corrupt.pickle').write_bytes(b'corrupt')
+
+    pool = plumpy.WorkerPool(persister, num_workers=1)
+    assert pool._has_checkpoint(process.pid)
+    assert not pool._has_checkpoint(utils.DummyProcess().pid)
+
+
+def test_no_restart(persister, mp_context, tmp_path):
+    inputs = {'marker': str(tmp_path / 'marker')}
+
+    with plumpy.WorkerPool(persister, num_workers=1, mp_context=mp_context, restart=False) as pool:
+        future = pool.launch_process(CrashOnceProcess, init_kwargs={'inputs': inputs}, persist=True)
+        with pytest.raises(RuntimeError, match='exited with code'):
+            future.result(timeout=30)
+
+
+def test_in_memory_persister():
+    with pytest.raises(ValueError):
+        plumpy.WorkerPool(plumpy.InMemoryPersister())
+
+
+def test_submit_after_close(mp_context):
+    pool = plumpy.WorkerPool(num_workers=1, mp_context=mp_context)
+    pool.start()
+    pool.close()
+
+    with pytest.raises(plumpy.ClosedError):
+        pool.launch_process(utils.DummyProcess)